@@ -1,30 +1,35 @@
-import os
-import glob
 from pathlib import Path
 from PIL import Image
 import io
 import subprocess
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from src.archive import SvgArchive
 
 EVOLUTION_DIR = "monkey_evolution"
 OUTPUT_FILE = "monkey_evolution/evolution.gif"
 DURATION = 500  # ms between frames
 
 def create_animation():
-    svg_files = sorted(glob.glob(os.path.join(EVOLUTION_DIR, "*_monkey*.svg")))
+    # Loose files and packed snapshots, oldest first (the pack is read through one mmap)
+    snapshots = list(SvgArchive(Path(EVOLUTION_DIR)).iter_svgs())
     
-    if not svg_files:
+    if not snapshots:
         print("No SVG files found in monkey_evolution/")
         return
 
-    print(f"Found {len(svg_files)} evolution steps.")
+    print(f"Found {len(snapshots)} evolution steps.")
     
     frames = []
-    for svg_path in svg_files:
-        print(f"Processing {os.path.basename(svg_path)}...")
+    for timestamp, svg in snapshots:
+        print(f"Processing {timestamp}...")
         try:
-            # Use rsvg-convert CLI to convert SVG to PNG
+            # Use rsvg-convert CLI to convert SVG (on stdin) to PNG
             result = subprocess.run(
-                ["rsvg-convert", svg_path], 
+                ["rsvg-convert"], 
+                input=svg.encode("utf-8"),
                 capture_output=True, 
                 check=True
             )
@@ -32,9 +37,9 @@ def create_animation():
             img = Image.open(io.BytesIO(png_data))
             frames.append(img)
         except subprocess.CalledProcessError as e:
-            print(f"rsvg-convert failed for {svg_path}: {e}")
+            print(f"rsvg-convert failed for {timestamp}: {e}")
         except Exception as e:
-            print(f"Error processing {svg_path}: {e}")
+            print(f"Error processing {timestamp}: {e}")
 
     if frames:
         print(f"Generating GIF with {len(frames)} frames...")
@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """
-Regenerate missing SVG files from history.json entries.
+Regenerate missing SVG files from history entries (history.jsonl or legacy history.json).
 Uses stored trait data to recreate the visual appearance.
 """
 
 import json
+from datetime import datetime
 from pathlib import Path
 import sys
 
@@ -12,6 +13,8 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent))
 
 from src.genetics import MonkeyDNA, Trait, TraitCategory, Rarity, GeneticsEngine
+from src.archive import LEGACY_PATTERN, SvgArchive
+from src.history_log import HistoryLog
 from src.visualizer import MonkeyVisualizer
 
 
@@ -62,27 +65,30 @@ def create_dna_from_traits(traits_dict: dict, entry: dict) -> MonkeyDNA:
 
 
 def main():
+    history_log = HistoryLog(Path("monkey_data/history.jsonl"))
     history_file = Path("monkey_data/history.json")
-    evolution_dir = Path("monkey_evolution")
-    evolution_dir.mkdir(exist_ok=True)
+    archive = SvgArchive()
     
-    with open(history_file) as f:
-        history = json.load(f)
+    if history_log.exists():
+        entries = history_log.read_all()
+    else:
+        with open(history_file) as f:
+            entries = json.load(f)["entries"]
     
     regenerated = 0
     skipped = 0
     
-    for entry in history["entries"]:
+    for entry in entries:
         svg_filename = entry.get("svg_filename")
         if not svg_filename:
             print(f"⚠️  Entry {entry['timestamp']}: No svg_filename, skipping")
             skipped += 1
             continue
         
-        svg_path = evolution_dir / svg_filename
+        svg_path = archive.resolve(svg_filename)
         
-        # Skip if already exists
-        if svg_path.exists():
+        # Skip if already exists (as a loose file or in the snapshot pack)
+        if archive.has(svg_filename):
             print(f"✓ {svg_filename} already exists")
             skipped += 1
             continue
@@ -98,7 +104,14 @@ def main():
         try:
             dna = create_dna_from_traits(traits, entry)
             svg = MonkeyVisualizer.generate_svg(dna)
-            svg_path.write_text(svg)
+            legacy = LEGACY_PATTERN.match(svg_filename)
+            if legacy:
+                archive.store(svg, legacy.group(1))
+            elif archive.pack.exists():
+                archive.store(svg, datetime.fromisoformat(entry["timestamp"]).strftime("%Y-%m-%d_%H-%M"))
+            else:
+                svg_path.parent.mkdir(parents=True, exist_ok=True)
+                svg_path.write_text(svg)
             print(f"✅ Regenerated {svg_filename}")
             regenerated += 1
         except Exception as e:
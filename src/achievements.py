@@ -9,6 +9,8 @@ from datetime import datetime
 import json
 from pathlib import Path
 
+from src.fileio import atomic_write_json, file_lock
+
 
 # Achievement Definitions
 ACHIEVEMENTS = {
@@ -255,12 +257,11 @@ def get_achievement_progress(stats: Dict[str, Any], dna: Dict[str, Any]) -> Dict
 
 def save_achievements(achievements: List[Dict], path: str = "monkey_data/achievements.json"):
     """Save unlocked achievements to file."""
-    Path(path).parent.mkdir(parents=True, exist_ok=True)
-    with open(path, 'w') as f:
-        json.dump({
+    with file_lock(Path(path).parent):
+        atomic_write_json(path, {
             "unlocked": achievements,
             "updated_at": datetime.utcnow().isoformat()
-        }, f, indent=2)
+        })
 
 
 def load_achievements(path: str = "monkey_data/achievements.json") -> List[Dict]:
@@ -0,0 +1,350 @@
+"""
+ForkMonkey SVG Archive
+
+Content-addressed storage for the evolution snapshots in
+``monkey_evolution/``.
+
+Each distinct SVG is stored once as ``objects/<hash>.svg``; a small
+``manifest.json`` maps snapshot timestamps to hashes; a second, different
+snapshot in the same minute is keyed ``<timestamp>.1`` (then ``.2``...)
+so it does not replace the first. Evolutions that do
+not change anything visible (or an ``update-readme`` right after
+``evolve``) no longer add a new file, so the repository stops growing by
+one full SVG per run.
+
+History entries reference snapshots by their path relative to the archive
+(``objects/<hash>.svg``), which the web timeline fetches directly.
+
+Once a snapshot pack exists (``pack_all``), new snapshots are appended to
+``snapshots.pack`` instead of being written as loose objects; see
+src/snapshot_pack.py.
+
+Snapshots dropped from history by compaction are moved to a separate
+``retired.pack`` (see ``retire``), out of the live archive and the web
+timeline but still recoverable.
+"""
+
+import re
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.fileio import atomic_write_json, atomic_write_text, file_lock
+from src.snapshot_pack import SnapshotPack, content_hash
+
+
+ARCHIVE_DIR = Path("monkey_evolution")
+OBJECTS_DIR = "objects"
+MANIFEST_NAME = "manifest.json"
+RETIRED_PACK = "retired"
+
+# Legacy snapshots: <YYYY-MM-DD_HH-MM>_monkey.svg
+LEGACY_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2}_\d{2}-\d{2})_monkey\.svg$")
+
+
+def snapshot_timestamp() -> str:
+    """Timestamp key for a new snapshot (UTC, minute resolution)"""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
+
+
+def _snapshot_key(iso_timestamp: Optional[str]) -> str:
+    """Snapshot timestamp key for a history entry's ISO timestamp"""
+    try:
+        return datetime.fromisoformat(iso_timestamp).strftime("%Y-%m-%d_%H-%M")
+    except (TypeError, ValueError):
+        return snapshot_timestamp()
+
+
+class SvgArchive:
+    """Deduplicated, content-addressed archive of monkey SVG snapshots"""
+
+    def __init__(self, root: Path = ARCHIVE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / OBJECTS_DIR
+        self.manifest_path = self.root / MANIFEST_NAME
+        self.pack = SnapshotPack(self.root)
+        self.retired = SnapshotPack(self.root, name=RETIRED_PACK)
+
+    def load_manifest(self) -> Dict[str, str]:
+        """Timestamp → hash mapping, oldest first"""
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("snapshots", {})
+
+    def _save_manifest(self, snapshots: Dict[str, str]) -> None:
+        atomic_write_json(self.manifest_path, {
+            "snapshots": dict(sorted(snapshots.items())),
+            "objects": len(set(snapshots.values())),
+        })
+
+    @staticmethod
+    def object_name(digest: str) -> str:
+        """Archive-relative path of an object, as stored in history entries"""
+        return f"{OBJECTS_DIR}/{digest}.svg"
+
+    def _write_object(self, svg: str) -> str:
+        digest = content_hash(svg)
+        path = self.objects_dir / f"{digest}.svg"
+        if not path.exists():
+            atomic_write_text(path, svg)
+        return digest
+
+    @staticmethod
+    def _entry_key(snapshots: Dict[str, str], timestamp: str, digest: str) -> str:
+        """Manifest key for ``digest`` at ``timestamp``, without replacing another snapshot"""
+        key, n = timestamp, 0
+        while snapshots.get(key, digest) != digest:
+            n += 1
+            key = f"{timestamp}.{n}"
+        return key
+
+    def store(self, svg: str, timestamp: Optional[str] = None) -> str:
+        """
+        Archive a snapshot and return its archive-relative filename
+
+        Identical content is written only once; the manifest records the
+        timestamp either way.
+        """
+        timestamp = timestamp or snapshot_timestamp()
+        digest = content_hash(svg)
+
+        with file_lock(self.root):
+            snapshots = self.load_manifest()
+            key = self._entry_key(snapshots, timestamp, digest)
+            if self.pack.exists():
+                self.pack.append(svg, key, digest)
+            else:
+                self._write_object(svg)
+            if key not in snapshots:
+                snapshots[key] = digest
+                self._save_manifest(snapshots)
+
+        return self.object_name(digest)
+
+    def resolve(self, filename: str) -> Path:
+        """
+        Path on disk for a history ``svg_filename``
+
+        Accepts both new ``objects/<hash>.svg`` names and legacy
+        ``<timestamp>_monkey.svg`` names (mapped through the manifest once
+        migrated).
+        """
+        path = self.root / filename
+        if path.exists():
+            return path
+
+        match = LEGACY_PATTERN.match(filename)
+        if match:
+            digest = self.load_manifest().get(match.group(1))
+            if digest:
+                return self.objects_dir / f"{digest}.svg"
+        return path
+
+    def _digest_for(self, filename: str) -> Optional[str]:
+        if filename.startswith(f"{OBJECTS_DIR}/"):
+            return Path(filename).stem
+        match = LEGACY_PATTERN.match(filename)
+        if match:
+            return self.load_manifest().get(match.group(1))
+        return None
+
+    def read(self, filename: str) -> Optional[str]:
+        """SVG content for a history ``svg_filename``, loose or packed"""
+        path = self.resolve(filename)
+        if path.exists():
+            return path.read_text(encoding="utf-8")
+
+        if self.pack.exists():
+            digest = self._digest_for(filename)
+            if digest:
+                return self.pack.read_hash(digest)
+            match = LEGACY_PATTERN.match(filename)
+            if match:
+                return self.pack.read(match.group(1))
+        return None
+
+    def has(self, filename: str) -> bool:
+        """True if the snapshot is available, loose or packed"""
+        if self.resolve(filename).exists():
+            return True
+        if not self.pack.exists():
+            return False
+        digest = self._digest_for(filename)
+        if digest:
+            return any(entry["hash"] == digest for entry in self.pack.entries())
+        match = LEGACY_PATTERN.match(filename)
+        return bool(match) and match.group(1) in self.pack.timestamps()
+
+    def iter_svgs(self) -> Iterator[Tuple[str, str]]:
+        """(timestamp, svg) for every snapshot, oldest first, loose or packed"""
+        loose = dict(self.snapshots())
+        packed = set(self.pack.timestamps()) if self.pack.exists() else set()
+        if self.manifest_path.exists():
+            # The manifest is authoritative: retired snapshots are not listed
+            packed &= set(self.load_manifest())
+        for timestamp in sorted(set(loose) | packed):
+            path = loose.get(timestamp)
+            if path is not None and path.exists():
+                yield timestamp, path.read_text(encoding="utf-8")
+            elif timestamp in packed:
+                yield timestamp, self.pack.read(timestamp)
+
+    def pack_all(self, prune: bool = False) -> int:
+        """
+        Move every loose snapshot into the snapshot pack
+
+        Creates the pack if needed; after this, ``store`` appends to the
+        pack. With ``prune``, loose files are deleted once packed.
+        Returns the number of snapshots added.
+        """
+        added = 0
+        with file_lock(self.root):
+            self.root.mkdir(parents=True, exist_ok=True)
+            snapshots = self.load_manifest()
+            packed = set(self.pack.timestamps())
+            loose = [(ts, path) for ts, path in self.snapshots() if path.exists()]
+
+            for timestamp, path in loose:
+                if timestamp not in packed:
+                    entry = self.pack.append(path.read_text(encoding="utf-8"), timestamp)
+                    snapshots[timestamp] = entry["hash"]
+                    added += 1
+
+            if not self.pack.exists():
+                # Nothing to pack yet: create an empty pack so new snapshots go there
+                self.pack.index_path.touch()
+                self.pack.pack_path.touch()
+
+            self._save_manifest(snapshots)
+
+            if prune:
+                for _, path in loose:
+                    path.unlink(missing_ok=True)
+
+        return added
+
+    def snapshots(self) -> List[Tuple[str, Path]]:
+        """All snapshots as (timestamp, path), oldest first, including unmigrated files"""
+        result = {
+            timestamp: self.objects_dir / f"{digest}.svg"
+            for timestamp, digest in self.load_manifest().items()
+        }
+        for path in self.root.glob("*_monkey.svg"):
+            match = LEGACY_PATTERN.match(path.name)
+            if match and match.group(1) not in result:
+                result[match.group(1)] = path
+        return sorted(result.items())
+
+    def migrate(self) -> Dict[str, str]:
+        """
+        Move legacy ``<timestamp>_monkey.svg`` files into the object store
+
+        Returns a mapping of legacy filename → new archive-relative name,
+        for rewriting history references. Safe to re-run.
+        """
+        mapping = {}
+        with file_lock(self.root):
+            snapshots = self.load_manifest()
+            for path in sorted(self.root.glob("*_monkey.svg")):
+                match = LEGACY_PATTERN.match(path.name)
+                if not match:
+                    continue
+                digest = self._write_object(path.read_text(encoding="utf-8"))
+                snapshots[match.group(1)] = digest
+                mapping[path.name] = self.object_name(digest)
+
+            if mapping:
+                self._save_manifest(snapshots)
+                for name in mapping:
+                    (self.root / name).unlink()
+
+        return mapping
+
+    def retire(self, filenames: Iterable[str], keep: Iterable[str] = (),
+               timestamps: Optional[Dict[str, str]] = None) -> int:
+        """
+        Move snapshots out of the live archive into the retired pack
+
+        ``filenames`` are history ``svg_filename`` values that are no
+        longer referenced; anything whose content is still used by a
+        filename in ``keep`` stays. Each snapshot is packed under its
+        manifest timestamps, or, if the manifest no longer lists it, under
+        its history entry's timestamp from ``timestamps`` (filename →
+        ISO timestamp). Loose objects are deleted, and the snapshot pack
+        is rewritten without the blobs, only once they are in the retired
+        pack. Returns the number of snapshots retired.
+        """
+        timestamps = timestamps or {}
+        retired = 0
+        with file_lock(self.root):
+            keep = set(keep)
+            keep_digests = {digest for digest in map(self._digest_for, keep) if digest}
+            snapshots = self.load_manifest()
+            dropped = set()
+            unlisted = False
+
+            for filename in sorted(set(filenames) - keep):
+                # Unmigrated legacy file: pack it under its own timestamp
+                match = LEGACY_PATTERN.match(filename)
+                legacy = self.root / filename
+                if match and legacy.exists() and match.group(1) not in snapshots:
+                    self.retired.append(legacy.read_text(encoding="utf-8"), match.group(1))
+                    legacy.unlink()
+                    retired += 1
+                    continue
+
+                digest = self._digest_for(filename)
+                if not digest or digest in keep_digests or digest in dropped:
+                    continue
+                path = self.objects_dir / f"{digest}.svg"
+                if path.exists():
+                    svg = path.read_text(encoding="utf-8")
+                else:
+                    svg = self.pack.read_hash(digest) if self.pack.exists() else None
+                listed = [ts for ts, d in snapshots.items() if d == digest]
+                if svg is not None:
+                    for timestamp in listed or [_snapshot_key(timestamps.get(filename))]:
+                        self.retired.append(svg, timestamp, digest)
+                    dropped.add(digest)
+                    retired += 1
+                for timestamp in listed:
+                    del snapshots[timestamp]
+                    unlisted = True
+
+            if dropped or unlisted:
+                self._save_manifest(snapshots)
+                live = set(snapshots.values())
+                for digest in dropped - live:
+                    (self.objects_dir / f"{digest}.svg").unlink(missing_ok=True)
+                if self.pack.exists():
+                    self.pack.drop(dropped - live)
+
+        self.retired.close()
+        return retired
+
+    def prune(self, keep: Iterable[str] = ()) -> int:
+        """
+        Delete objects referenced neither by the manifest nor by ``keep``
+
+        ``keep`` is the history's ``svg_filename`` values; an object history
+        points at is never deleted, whatever the manifest says.
+        """
+        with file_lock(self.root):
+            referenced = set(self.load_manifest().values())
+            referenced |= {digest for digest in map(self._digest_for, keep) if digest}
+            removed = 0
+            for path in self.objects_dir.glob("*.svg"):
+                if path.stem not in referenced:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+
+def rewrite_svg_references(entry: dict, mapping: Dict[str, str]) -> dict:
+    """History transform: point legacy svg_filename values at archive objects"""
+    filename = entry.get("svg_filename")
+    if filename in mapping:
+        entry["svg_filename"] = mapping[filename]
+    return entry
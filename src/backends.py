@@ -0,0 +1,649 @@
+"""
+ForkMonkey Storage Backends
+
+Pluggable persistence for monkey data. A backend stores a handful of JSON
+documents (``dna``, ``stats``, ``achievements``) plus the evolution
+history. Two implementations ship here:
+
+- FileBackend: the classic ``monkey_data/*.json`` files + ``history.jsonl``
+- SQLiteBackend: a single ``monkey.db`` with indexed history, for hosts
+  running many monkeys that need atomic updates and indexed queries
+- MemoryBackend: everything in process memory, for tests and benchmarks
+  (FORKMONKEY_STORAGE=memory)
+
+Both can export the plain JSON files that GitHub Pages serves.
+"""
+
+import abc
+import os
+import json
+import sqlite3
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from src.fileio import atomic_write_json, file_lock, fsync_dir, write_temp
+from src.history_log import (
+    DEFAULT_PAGE_SIZE,
+    HistoryLog,
+    export_history_json,
+    export_history_pages,
+    migrate_history_json,
+)
+
+
+DOCUMENTS = ("dna", "stats", "achievements", "summary")
+
+
+class StorageBackend(abc.ABC):
+    """Abstract base class for storage backends"""
+
+    name = "abstract"
+    # False if nothing is written to disk (no data directory needed)
+    persistent = True
+
+    @abc.abstractmethod
+    def read_document(self, name: str) -> Optional[dict]:
+        """Read a JSON document, or None if it does not exist"""
+        pass
+
+    @abc.abstractmethod
+    def write_document(self, name: str, data: dict) -> None:
+        """Create or replace a JSON document"""
+        pass
+
+    @abc.abstractmethod
+    def append_history(self, entry: dict) -> None:
+        """Append one entry to the evolution history"""
+        pass
+
+    @abc.abstractmethod
+    def read_history(self) -> List[dict]:
+        """Read the full evolution history, oldest first"""
+        pass
+
+    @abc.abstractmethod
+    def replace_history(self, entries: List[dict]) -> None:
+        """
+        Atomically replace the whole history with ``entries``
+
+        For maintenance (compaction) only; history is otherwise append-only.
+        """
+        pass
+
+    @abc.abstractmethod
+    def rewrite_history(self, transform: Callable[[dict], dict]) -> int:
+        """
+        Apply ``transform`` to every history entry in place
+
+        For maintenance migrations only (history is otherwise append-only).
+        Returns the number of entries that changed.
+        """
+        pass
+
+    def iter_history(self) -> Iterator[dict]:
+        """Stream history entries, oldest first"""
+        return iter(self.read_history())
+
+    def history_range(self, start: int, end: Optional[int] = None) -> List[dict]:
+        """History entries with index start <= i < end"""
+        start = max(start, 0)
+        if end is not None and end <= start:
+            return []
+        return list(islice(self.iter_history(), start, end))
+
+    def tail_history(self, n: int) -> List[dict]:
+        """Read the last n history entries, oldest first"""
+        return self.read_history()[-n:] if n > 0 else []
+
+    def head_history(self, n: int) -> List[dict]:
+        """Read the first n history entries"""
+        return self.read_history()[:n] if n > 0 else []
+
+    def history_count(self) -> int:
+        """Number of history entries"""
+        return len(self.read_history())
+
+    def history_between(self, start: str, end: str) -> List[dict]:
+        """History entries with start <= timestamp < end (ISO strings)"""
+        return [e for e in self.read_history() if start <= e.get("timestamp", "") < end]
+
+    def history_for_generation(self, generation: int) -> List[dict]:
+        """History entries recorded at a given generation"""
+        return [e for e in self.read_history() if e.get("generation") == generation]
+
+    @contextmanager
+    def transaction(self) -> Iterator["StorageBackend"]:
+        """Group several writes so they are applied together"""
+        yield self
+
+    def describe(self, name: str) -> str:
+        """Human-readable location of a document, for log messages"""
+        return f"{self.name}:{name}"
+
+    def export_history_json(self, path: Path) -> int:
+        """Write the history as a legacy ``{"entries": [...]}`` document"""
+        entries = self.read_history()
+        atomic_write_json(path, {"entries": entries})
+        return len(entries)
+
+    def export_json(self, output_dir: Path) -> List[Path]:
+        """
+        Write every document and the history as plain JSON files
+
+        This produces the layout GitHub Pages serves (``dna.json``,
+        ``stats.json``, ``achievements.json``, ``history.json``).
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        written = []
+
+        for name in DOCUMENTS:
+            data = self.read_document(name)
+            if data is None:
+                continue
+            path = output_dir / f"{name}.json"
+            atomic_write_json(path, data)
+            written.append(path)
+
+        path = output_dir / "history.json"
+        self.export_history_json(path)
+        written.append(path)
+
+        return written
+
+
+class FileBackend(StorageBackend):
+    """JSON files in a data directory, history as append-only JSONL"""
+
+    name = "file"
+
+    def __init__(self, data_dir: Path):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.history_log = HistoryLog(self.data_dir / "history.jsonl", history_keyframe_interval())
+
+        # Buffered writes while inside transaction()
+        self._pending_documents: Optional[Dict[str, dict]] = None
+        self._pending_history: List[dict] = []
+        self._pending_replace: Optional[List[dict]] = None
+
+    def _path(self, name: str) -> Path:
+        return self.data_dir / f"{name}.json"
+
+    def describe(self, name: str) -> str:
+        return str(self._path(name))
+
+    @contextmanager
+    def transaction(self) -> Iterator["FileBackend"]:
+        """
+        Buffer writes and apply them together on exit
+
+        Under the monkey's directory lock, every changed document is first
+        written to a fsynced temp file; only once all of them are on disk
+        are they renamed into place, then history is replaced (if
+        replace_history was called) and appended. Documents therefore
+        always land before the history they describe is thinned. An
+        exception inside the block discards everything.
+        """
+        if self._pending_documents is not None:
+            yield self
+            return
+
+        self._pending_documents = {}
+        self._pending_history = []
+        self._pending_replace = None
+        try:
+            yield self
+            documents, history, replace = self._pending_documents, self._pending_history, self._pending_replace
+        finally:
+            self._pending_documents = None
+            self._pending_history = []
+            self._pending_replace = None
+
+        self._commit(documents, history, replace)
+
+    def _commit(self, documents: Dict[str, dict], history: List[dict],
+                replace: Optional[List[dict]] = None) -> None:
+        with file_lock(self.data_dir):
+            staged = []
+            try:
+                for name, data in documents.items():
+                    path = self._path(name)
+                    staged.append((write_temp(path, json.dumps(data, indent=2).encode("utf-8")), path))
+            except BaseException:
+                for tmp, _ in staged:
+                    tmp.unlink(missing_ok=True)
+                raise
+
+            for tmp, path in staged:
+                os.replace(tmp, path)
+            fsync_dir(self.data_dir)
+
+            if replace is not None:
+                self.ensure_history_log()
+                self.history_log.rewrite(replace + history)
+            elif history:
+                self.ensure_history_log()
+                self.history_log.append_many(history)
+
+    def read_document(self, name: str) -> Optional[dict]:
+        if self._pending_documents is not None and name in self._pending_documents:
+            return self._pending_documents[name]
+
+        path = self._path(name)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def write_document(self, name: str, data: dict) -> None:
+        if self._pending_documents is not None:
+            self._pending_documents[name] = data
+            return
+
+        with file_lock(self.data_dir):
+            atomic_write_json(self._path(name), data)
+
+    def append_history(self, entry: dict) -> None:
+        if self._pending_documents is not None:
+            self._pending_history.append(entry)
+            return
+
+        self.ensure_history_log()
+        self.history_log.append(entry)
+
+    def read_history(self) -> List[dict]:
+        if self.history_log.exists():
+            return self.history_log.read_all()
+
+        legacy = self.data_dir / "history.json"
+        if not legacy.exists():
+            return []
+        with open(legacy, "r", encoding="utf-8") as f:
+            return json.load(f).get("entries", [])
+
+    def iter_history(self) -> Iterator[dict]:
+        if self.history_log.exists():
+            return self.history_log.iter()
+        return super().iter_history()
+
+    def history_range(self, start: int, end: Optional[int] = None) -> List[dict]:
+        if self.history_log.exists():
+            return self.history_log.range(start, end)
+        return super().history_range(start, end)
+
+    def tail_history(self, n: int) -> List[dict]:
+        if self.history_log.exists():
+            return self.history_log.tail(n)
+        return super().tail_history(n)
+
+    def head_history(self, n: int) -> List[dict]:
+        if self.history_log.exists():
+            return self.history_log.head(n)
+        return super().head_history(n)
+
+    def history_count(self) -> int:
+        if self.history_log.exists():
+            return self.history_log.count()
+        return super().history_count()
+
+    def export_history_json(self, path: Path) -> int:
+        self.ensure_history_log()
+        return export_history_json(self.history_log.path, path)
+
+    def replace_history(self, entries: List[dict]) -> None:
+        if self._pending_documents is not None:
+            # Supersedes anything appended earlier in the transaction
+            self._pending_replace = list(entries)
+            self._pending_history = []
+            return
+
+        with file_lock(self.data_dir):
+            self.ensure_history_log()
+            self.history_log.rewrite(entries)
+
+    def rewrite_history(self, transform: Callable[[dict], dict]) -> int:
+        with file_lock(self.data_dir):
+            self.ensure_history_log()
+            entries = self.history_log.read_all()
+            rewritten = [transform(dict(entry)) for entry in entries]
+            changed = sum(1 for old, new in zip(entries, rewritten) if old != new)
+            if changed:
+                self.history_log.rewrite(rewritten)
+        return changed
+
+    def ensure_history_log(self) -> int:
+        """Migrate a legacy history.json to history.jsonl on first use"""
+        if self.history_log.exists():
+            return 0
+
+        count = migrate_history_json(self.data_dir / "history.json", self.history_log.path)
+        if count:
+            print(f"📦 Migrated {count} history entries to {self.history_log.path}")
+        return count
+
+
+class SQLiteBackend(StorageBackend):
+    """SQLite database with indexed history and transactional updates"""
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS documents (
+            name TEXT PRIMARY KEY,
+            body TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            generation INTEGER,
+            dna_hash TEXT,
+            body TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history(timestamp);
+        CREATE INDEX IF NOT EXISTS idx_history_generation ON history(generation);
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        if str(self.path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Autocommit mode; transaction() issues BEGIN/COMMIT explicitly
+        self.conn = sqlite3.connect(str(self.path), isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+        self._depth = 0
+
+    def describe(self, name: str) -> str:
+        return f"{self.path} ({name})"
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator["SQLiteBackend"]:
+        if self._depth:
+            # Nested: the outermost transaction commits
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._depth = 1
+        try:
+            yield self
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        else:
+            self.conn.execute("COMMIT")
+        finally:
+            self._depth = 0
+
+    def read_document(self, name: str) -> Optional[dict]:
+        row = self.conn.execute("SELECT body FROM documents WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write_document(self, name: str, data: dict) -> None:
+        self.conn.execute(
+            "INSERT INTO documents (name, body, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET body = excluded.body, updated_at = excluded.updated_at",
+            (name, json.dumps(data), datetime.now().isoformat()),
+        )
+
+    def append_history(self, entry: dict) -> None:
+        self.conn.execute(
+            "INSERT INTO history (timestamp, generation, dna_hash, body) VALUES (?, ?, ?, ?)",
+            (entry.get("timestamp", ""), entry.get("generation"), entry.get("dna_hash"), json.dumps(entry)),
+        )
+
+    def replace_history(self, entries: List[dict]) -> None:
+        with self.transaction():
+            self.conn.execute("DELETE FROM history")
+            for entry in entries:
+                self.append_history(entry)
+
+    def rewrite_history(self, transform: Callable[[dict], dict]) -> int:
+        changed = 0
+        with self.transaction():
+            rows = self.conn.execute("SELECT id, body FROM history ORDER BY id").fetchall()
+            for row_id, body in rows:
+                entry = json.loads(body)
+                new = transform(dict(entry))
+                if new != entry:
+                    self.conn.execute("UPDATE history SET body = ? WHERE id = ?", (json.dumps(new), row_id))
+                    changed += 1
+        return changed
+
+    def _entries(self, sql: str, params: tuple = ()) -> List[dict]:
+        return [json.loads(row[0]) for row in self.conn.execute(sql, params)]
+
+    def read_history(self) -> List[dict]:
+        return self._entries("SELECT body FROM history ORDER BY id")
+
+    def iter_history(self) -> Iterator[dict]:
+        cursor = self.conn.execute("SELECT body FROM history ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for row in rows:
+                yield json.loads(row[0])
+
+    def history_range(self, start: int, end: Optional[int] = None) -> List[dict]:
+        start = max(start, 0)
+        if end is not None and end <= start:
+            return []
+        limit = -1 if end is None else end - start
+        return self._entries("SELECT body FROM history ORDER BY id LIMIT ? OFFSET ?", (limit, start))
+
+    def tail_history(self, n: int) -> List[dict]:
+        if n <= 0:
+            return []
+        entries = self._entries("SELECT body FROM history ORDER BY id DESC LIMIT ?", (n,))
+        return entries[::-1]
+
+    def head_history(self, n: int) -> List[dict]:
+        if n <= 0:
+            return []
+        return self._entries("SELECT body FROM history ORDER BY id LIMIT ?", (n,))
+
+    def history_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    def history_between(self, start: str, end: str) -> List[dict]:
+        return self._entries(
+            "SELECT body FROM history WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, id",
+            (start, end),
+        )
+
+    def history_for_generation(self, generation: int) -> List[dict]:
+        return self._entries("SELECT body FROM history WHERE generation = ? ORDER BY id", (generation,))
+
+
+class MemoryBackend(StorageBackend):
+    """
+    Documents and history held in process memory
+
+    Values are kept JSON-encoded, exactly as the other backends persist
+    them: callers get fresh copies, and non-serializable data fails the
+    same way. Nothing touches the disk, so tests and benchmarks measure
+    the code rather than the filesystem.
+    """
+
+    name = "memory"
+    persistent = False
+
+    def __init__(self):
+        self.documents: Dict[str, str] = {}
+        self.history: List[str] = []
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self) -> Iterator["MemoryBackend"]:
+        if self._depth:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+
+        # Appends only extend the list and rewrites replace it, so the
+        # old list truncated to its old length is the rollback state
+        documents, history, length = dict(self.documents), self.history, len(self.history)
+        self._depth = 1
+        try:
+            yield self
+        except BaseException:
+            del history[length:]
+            self.documents, self.history = documents, history
+            raise
+        finally:
+            self._depth = 0
+
+    def read_document(self, name: str) -> Optional[dict]:
+        body = self.documents.get(name)
+        return json.loads(body) if body is not None else None
+
+    def write_document(self, name: str, data: dict) -> None:
+        self.documents[name] = json.dumps(data)
+
+    def append_history(self, entry: dict) -> None:
+        self.history.append(json.dumps(entry))
+
+    def _decode(self, lines: List[str]) -> List[dict]:
+        return [json.loads(line) for line in lines]
+
+    def read_history(self) -> List[dict]:
+        return self._decode(self.history)
+
+    def iter_history(self) -> Iterator[dict]:
+        return (json.loads(line) for line in list(self.history))
+
+    def history_range(self, start: int, end: Optional[int] = None) -> List[dict]:
+        start = max(start, 0)
+        if end is not None and end <= start:
+            return []
+        return self._decode(self.history[start:end])
+
+    def tail_history(self, n: int) -> List[dict]:
+        return self._decode(self.history[-n:]) if n > 0 else []
+
+    def head_history(self, n: int) -> List[dict]:
+        return self._decode(self.history[:n]) if n > 0 else []
+
+    def history_count(self) -> int:
+        return len(self.history)
+
+    def replace_history(self, entries: List[dict]) -> None:
+        self.history = [json.dumps(entry) for entry in entries]
+
+    def rewrite_history(self, transform: Callable[[dict], dict]) -> int:
+        changed = 0
+        rewritten = []
+        for line in self.history:
+            entry = json.loads(line)
+            new = transform(dict(entry))
+            if new != entry:
+                line = json.dumps(new)
+                changed += 1
+            rewritten.append(line)
+        self.history = rewritten
+        return changed
+
+
+class HistoryReader:
+    """
+    Read-only, streaming view over a backend's history
+
+    tail(n), range(start, end) and iter() never build the full history
+    list unless the backend has no cheaper way to answer.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter()
+
+    def __len__(self) -> int:
+        return self.backend.history_count()
+
+    def iter(self) -> Iterator[dict]:
+        return self.backend.iter_history()
+
+    def tail(self, n: int) -> List[dict]:
+        return self.backend.tail_history(n)
+
+    def head(self, n: int) -> List[dict]:
+        return self.backend.head_history(n)
+
+    def range(self, start: int, end: Optional[int] = None) -> List[dict]:
+        return self.backend.history_range(start, end)
+
+    def export_pages(self, output_dir: Path, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+        """Write fixed-size history pages + manifest.json for the web"""
+        return export_history_pages(self.iter(), output_dir, page_size)
+
+
+BACKENDS = {
+    "file": lambda data_dir: FileBackend(data_dir),
+    "sqlite": lambda data_dir: SQLiteBackend(Path(data_dir) / "monkey.db"),
+    "memory": lambda data_dir: MemoryBackend(),
+}
+
+
+def history_keyframe_interval() -> Optional[int]:
+    """FORKMONKEY_HISTORY_KEYFRAMES: delta-encode history.jsonl with a keyframe every K entries"""
+    value = os.getenv("FORKMONKEY_HISTORY_KEYFRAMES")
+    return int(value) if value else None
+
+
+def detect_backend_kind(data_dir: Path) -> str:
+    """Pick a backend: FORKMONKEY_STORAGE if set, else sqlite when monkey.db exists"""
+    kind = os.getenv("FORKMONKEY_STORAGE")
+    if kind:
+        return kind
+    return "sqlite" if (Path(data_dir) / "monkey.db").exists() else "file"
+
+
+def create_backend(kind: Optional[str], data_dir: Path) -> StorageBackend:
+    """Create a backend by name ("file", "sqlite" or "memory"), auto-detected if None"""
+    kind = kind or detect_backend_kind(data_dir)
+    try:
+        factory = BACKENDS[kind.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown storage backend: {kind} (choose from {', '.join(BACKENDS)})")
+    return factory(data_dir)
+
+
+def copy_backend(source: StorageBackend, target: StorageBackend) -> Dict[str, int]:
+    """
+    Copy all documents and history from one backend into another
+
+    Runs in a single target transaction. Returns counts of what was copied.
+    """
+    copied = {"documents": 0, "history": 0}
+
+    with target.transaction():
+        for name in DOCUMENTS:
+            data = source.read_document(name)
+            if data is not None:
+                target.write_document(name, data)
+                copied["documents"] += 1
+
+        for entry in source.read_history():
+            target.append_history(entry)
+            copied["history"] += 1
+
+    return copied
@@ -4,9 +4,13 @@ ForkMonkey CLI
 Command-line interface for managing your monkey.
 """
 
+import io
 import os
 import sys
+import contextlib
+import functools
 from pathlib import Path
+from typing import List
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -20,14 +24,97 @@ from src.genetics import GeneticsEngine, MonkeyDNA, TraitCategory
 from src.storage import MonkeyStorage
 from src.visualizer import MonkeyVisualizer
 from src.evolution import EvolutionAgent
+from src.fileio import atomic_write_text, file_lock
+from src.archive import rewrite_svg_references
+from src.workspace import Workspace, discover_workspaces, run_across
 
 console = Console()
 
 
-@click.group()
-def cli():
+def write_locked(path: Path, text: str):
+    """Atomically replace a file while holding its directory's lock"""
+    with file_lock(path.parent):
+        atomic_write_text(path, text)
+
+
+def workspace() -> Workspace:
+    """The monkey selected with --workspace (default: current directory)"""
+    ctx = click.get_current_context(silent=True)
+    selected = ctx.find_root().obj if ctx else None
+    return selected if isinstance(selected, Workspace) else Workspace.from_env()
+
+
+def run_cli_in_workspace(args: List[str], root: str) -> str:
+    """Worker for --all: run one CLI command in a workspace, return its last output line"""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        try:
+            cli.main(args=["--workspace", root, *args], standalone_mode=False)
+        except SystemExit as e:
+            if e.code:
+                raise RuntimeError(f"exit code {e.code}") from None
+    lines = [line.strip() for line in output.getvalue().splitlines() if line.strip()]
+    if any(line.startswith("❌") for line in lines):
+        raise RuntimeError(next(line for line in lines if line.startswith("❌")))
+    return lines[-1] if lines else ""
+
+
+class WorkspaceGroup(click.Group):
+    """Command group that can fan a command out over every monkey in a zoo (--all)"""
+    
+    def invoke(self, ctx):
+        zoo = ctx.params.get("all_root")
+        if not zoo:
+            return super().invoke(ctx)
+        
+        protected = ctx._protected_args if hasattr(ctx, "_protected_args") else ctx.protected_args
+        args = [*protected, *ctx.args]
+        if not args:
+            ctx.fail("Missing command.")
+        
+        # Apply group options (e.g. --offline) before forking workers
+        click.Command.invoke(self, ctx)
+        
+        workspaces = discover_workspaces(Path(zoo))
+        workers = ctx.params.get("workers")
+        console.print(f"\n🐒 [bold cyan]Running '{' '.join(args)}' in {len(workspaces)} monkeys...[/bold cyan]\n")
+        
+        results = run_across(workspaces, functools.partial(run_cli_in_workspace, args), workers)
+        
+        table = Table(title=f"{args[0]} across {zoo}")
+        table.add_column("Monkey", style="cyan")
+        table.add_column("Status")
+        table.add_column("Time", justify="right")
+        table.add_column("Result", style="dim")
+        failed = [r for r in results if not r.ok]
+        # Failures first; for large zoos only they are listed individually
+        shown = failed + ([r for r in results if r.ok] if len(results) <= 50 else [])
+        for r in shown:
+            table.add_row(Path(r.workspace).name, "✅" if r.ok else "❌", f"{r.seconds:.2f}s", r.message[:80])
+        if shown:
+            console.print(table)
+        
+        total = sum(r.seconds for r in results)
+        console.print(f"\n[bold]{len(results) - len(failed)} succeeded, {len(failed)} failed[/bold] "
+                      f"[dim]({total:.1f}s of work)[/dim]")
+        if failed:
+            sys.exit(1)
+
+
+@click.group(cls=WorkspaceGroup)
+@click.option('--offline', is_flag=True, help='Never contact the GitHub API (same as FORKMONKEY_OFFLINE=1)')
+@click.option('--workspace', 'workspace_root', type=click.Path(file_okay=False), envvar='FORKMONKEY_WORKSPACE',
+              default=None, help='Monkey directory to operate on (default: current directory)')
+@click.option('--all', 'all_root', type=click.Path(exists=True, file_okay=False), default=None,
+              help='Run the command in every monkey directory under this path')
+@click.option('--workers', type=int, default=None, help='Worker processes for --all (default: CPU count)')
+@click.pass_context
+def cli(ctx, offline, workspace_root, all_root, workers):
     """🐵 ForkMonkey - Your AI-powered digital pet on GitHub"""
-    pass
+    if offline:
+        os.environ["FORKMONKEY_OFFLINE"] = "1"
+    if workspace_root:
+        ctx.obj = Workspace(Path(workspace_root))
 
 
 @cli.command()
@@ -37,55 +124,49 @@ def init(from_fork, force):
     """Initialize a new monkey"""
     console.print("\n🐵 [bold cyan]Initializing ForkMonkey...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    
-    # Check if monkey already exists
-    existing_dna = storage.load_dna()
-    if existing_dna:
-        console.print("[yellow]⚠️  Monkey already exists![/yellow]")
-        console.print(f"   DNA Hash: {existing_dna.dna_hash}")
-        console.print(f"   Generation: {existing_dna.generation}")
+    storage = workspace().storage()
+    
+    with storage.session() as session:
+        # Check if monkey already exists
+        existing_dna = session.load_dna()
+        if existing_dna:
+            console.print("[yellow]⚠️  Monkey already exists![/yellow]")
+            console.print(f"   DNA Hash: {existing_dna.dna_hash}")
+            console.print(f"   Generation: {existing_dna.generation}")
+            
+            # In fork mode or with --force, auto-confirm to allow CI to proceed
+            if not force and not from_fork:
+                if not click.confirm("\nOverwrite existing monkey?"):
+                    console.print("[red]Cancelled.[/red]")
+                    return
+            else:
+                console.print("[cyan]   Auto-confirming for fork/CI mode...[/cyan]")
         
-        # In fork mode or with --force, auto-confirm to allow CI to proceed
-        if not force and not from_fork:
-            if not click.confirm("\nOverwrite existing monkey?"):
-                console.print("[red]Cancelled.[/red]")
-                return
+        # Initialize DNA
+        if from_fork:
+            console.print("[cyan]🍴 Checking for parent repository...[/cyan]")
+            dna = storage.initialize_from_parent()
+            
+            if not dna:
+                console.print("[yellow]⚠️  Not a fork or parent DNA not found[/yellow]")
+                console.print("[cyan]   Generating new monkey instead...[/cyan]")
+                dna = GeneticsEngine.generate_random_dna()
         else:
-            console.print("[cyan]   Auto-confirming for fork/CI mode...[/cyan]")
-    
-    # Initialize DNA
-    if from_fork:
-        console.print("[cyan]🍴 Checking for parent repository...[/cyan]")
-        dna = storage.initialize_from_parent()
-        
-        if not dna:
-            console.print("[yellow]⚠️  Not a fork or parent DNA not found[/yellow]")
-            console.print("[cyan]   Generating new monkey instead...[/cyan]")
+            console.print("[cyan]🎲 Generating random monkey...[/cyan]")
             dna = GeneticsEngine.generate_random_dna()
-    else:
-        console.print("[cyan]🎲 Generating random monkey...[/cyan]")
-        dna = GeneticsEngine.generate_random_dna()
-    
-    # Save DNA
-    storage.save_dna_locally(dna)
-    storage.save_stats(dna, age_days=0)
-    
-    # Generate initial visualization
-    svg = MonkeyVisualizer.generate_svg(dna)
-    svg_file = Path("monkey_data/monkey.svg")
-    svg_file.write_text(svg)
-    
-    # Archive with timestamp
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    svg_filename = f"{timestamp}_monkey.svg"
-    archive_file = Path(f"monkey_evolution/{svg_filename}")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
-    
-    # Save history with SVG filename
-    storage.save_history_entry(dna, "🎉 Your monkey was born!", svg_filename=svg_filename)
+        
+        # Generate initial visualization
+        svg = MonkeyVisualizer.generate_svg(dna)
+        svg_file = workspace().svg_path
+        write_locked(svg_file, svg)
+        
+        # Archive snapshot (deduplicated by content)
+        svg_filename = workspace().archive().store(svg)
+        
+        # Save DNA, stats and history (flushed together when the session closes)
+        session.save_dna(dna)
+        session.save_stats(dna, age_days=0)
+        session.add_history_entry(dna, "🎉 Your monkey was born!", svg_filename=svg_filename)
     
     # Display info
     console.print("\n[bold green]✅ Monkey initialized![/bold green]\n")
@@ -114,72 +195,65 @@ def evolve(ai, strength):
     """Evolve your monkey"""
     console.print("\n🧬 [bold cyan]Evolving monkey...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = workspace().storage()
     
-    # Load current DNA
-    dna = storage.load_dna()
-    if not dna:
-        console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
-        return
-    
-    console.print(f"Current DNA: {dna.dna_hash}")
-    console.print(f"Mutations so far: {dna.mutation_count}")
-    
-    # Evolve
-    # Evolve
-    if ai:
-        provider = os.getenv("AI_PROVIDER", "github")
-        console.print(f"\n[cyan]🤖 Using AI-powered evolution ({provider})...[/cyan]")
+    with storage.session() as session:
+        # Load current DNA
+        dna = session.load_dna()
+        if not dna:
+            console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
+            return
         
-        try:
-            agent = EvolutionAgent(provider_type=provider)
-            evolved_dna = agent.evolve_with_ai(dna, days_passed=1)
-            story = agent.generate_evolution_story(dna, evolved_dna)
-        except Exception as e:
-            console.print(f"[yellow]⚠️  AI evolution failed: {e}[/yellow]")
-            console.print("[cyan]🎲 Falling back to random evolution...[/cyan]")
+        console.print(f"Current DNA: {dna.dna_hash}")
+        console.print(f"Mutations so far: {dna.mutation_count}")
+        
+        # Evolve
+        if ai:
+            provider = os.getenv("AI_PROVIDER", "github")
+            console.print(f"\n[cyan]🤖 Using AI-powered evolution ({provider})...[/cyan]")
+            
+            try:
+                agent = EvolutionAgent(provider_type=provider)
+                evolved_dna = agent.evolve_with_ai(dna, days_passed=1)
+                story = agent.generate_evolution_story(dna, evolved_dna)
+            except Exception as e:
+                console.print(f"[yellow]⚠️  AI evolution failed: {e}[/yellow]")
+                console.print("[cyan]🎲 Falling back to random evolution...[/cyan]")
+                evolved_dna = GeneticsEngine.evolve(dna, evolution_strength=strength)
+                story = "Your monkey evolved randomly!"
+        else:
+            console.print(f"\n[cyan]🎲 Using random evolution (strength: {strength})...[/cyan]")
             evolved_dna = GeneticsEngine.evolve(dna, evolution_strength=strength)
             story = "Your monkey evolved randomly!"
-    else:
-        console.print(f"\n[cyan]🎲 Using random evolution (strength: {strength})...[/cyan]")
-        evolved_dna = GeneticsEngine.evolve(dna, evolution_strength=strength)
-        story = "Your monkey evolved randomly!"
-    
-    # Show changes
-    console.print("\n[bold]Changes:[/bold]")
-    changes = []
-    for cat in dna.traits.keys():
-        old_trait = dna.traits[cat]
-        new_trait = evolved_dna.traits[cat]
         
-        if old_trait.value != new_trait.value:
-            console.print(f"  • {cat.value}: [red]{old_trait.value}[/red] → [green]{new_trait.value}[/green]")
-            changes.append(cat.value)
-        else:
-            console.print(f"  • {cat.value}: {old_trait.value} (unchanged)")
-    
-    if not changes:
-        console.print("  [dim]No changes today[/dim]")
-    
-    # Save
-    storage.save_dna_locally(evolved_dna)
-    storage.save_stats(evolved_dna, age_days=0)  # TODO: calculate actual age
-    
-    # Generate new visualization
-    svg = MonkeyVisualizer.generate_svg(evolved_dna)
-    svg_file = Path("monkey_data/monkey.svg")
-    svg_file.write_text(svg)
-    
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    svg_filename = f"{timestamp}_monkey.svg"
-    archive_file = Path(f"monkey_evolution/{svg_filename}")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
-    
-    # Save history with SVG filename
-    storage.save_history_entry(evolved_dna, story, svg_filename=svg_filename)
+        # Show changes
+        console.print("\n[bold]Changes:[/bold]")
+        changes = []
+        for cat in dna.traits.keys():
+            old_trait = dna.traits[cat]
+            new_trait = evolved_dna.traits[cat]
+            
+            if old_trait.value != new_trait.value:
+                console.print(f"  • {cat.value}: [red]{old_trait.value}[/red] → [green]{new_trait.value}[/green]")
+                changes.append(cat.value)
+            else:
+                console.print(f"  • {cat.value}: {old_trait.value} (unchanged)")
+        
+        if not changes:
+            console.print("  [dim]No changes today[/dim]")
+        
+        # Generate new visualization
+        svg = MonkeyVisualizer.generate_svg(evolved_dna)
+        svg_file = workspace().svg_path
+        write_locked(svg_file, svg)
+        
+        # Archive snapshot (deduplicated by content)
+        svg_filename = workspace().archive().store(svg)
+        
+        # Save DNA, history and stats (flushed together when the session closes)
+        session.save_dna(evolved_dna)
+        session.add_history_entry(evolved_dna, story, svg_filename=svg_filename)
+        session.save_stats(evolved_dna)
     
     console.print(f"\n[bold green]✅ Evolution complete![/bold green]")
     console.print(f"New DNA: {evolved_dna.dna_hash}")
@@ -192,16 +266,14 @@ def show():
     """Show current monkey stats"""
     console.print("\n🐵 [bold cyan]Your Monkey[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    dna = storage.load_dna()
+    session = workspace().storage().session()
+    dna = session.load_dna()
     
     if not dna:
         console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
         return
     
-    # Get history for age
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = session.metadata.age_days
     rarity = dna.get_rarity_score()
     
     # Calculate rarity percentile (simulated based on score distribution)
@@ -247,7 +319,7 @@ def show():
     table.add_row("Percentile", f"Rarer than {percentile}% of monkeys")
     
     # Get streak info
-    streak_data = storage.get_streak()
+    streak_data = session.get_streak()
     current_streak = streak_data.get("current", 0)
     table.add_row("🔥 Streak", f"{current_streak} days")
     
@@ -320,15 +392,15 @@ def history(limit):
     """Show evolution history"""
     console.print("\n📜 [bold cyan]Evolution History[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    entries = storage.get_history()
+    storage = workspace().storage()
+    entries = storage.get_recent_history(limit)
     
     if not entries:
         console.print("[yellow]No history yet.[/yellow]")
         return
     
     # Show recent entries
-    for entry in entries[-limit:]:
+    for entry in entries:
         timestamp = entry.get("timestamp", "Unknown")
         story = entry.get("story", "")
         mutations = entry.get("mutation_count", 0)
@@ -344,12 +416,101 @@ def history(limit):
         console.print()
 
 
+@cli.command()
+@click.option('--output', '-o', type=click.Path(), default=None, help='Output path (default: monkey_data/history.json)')
+@click.option('--pages', type=click.Path(), default=None, help='Also write fixed-size history pages + manifest.json to this directory')
+@click.option('--page-size', type=int, default=100, help='Entries per history page')
+def export_history(output, pages, page_size):
+    """Export history.jsonl as history.json for the web timeline"""
+    console.print("\n📤 [bold cyan]Exporting history...[/bold cyan]\n")
+    
+    storage = workspace().storage()
+    if not storage.export_history_json(Path(output) if output else None):
+        sys.exit(1)
+    if pages and not storage.export_history_pages(Path(pages), page_size):
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--output', '-o', type=click.Path(), default=None, help='Output directory (default: monkey_data)')
+def export_data(output):
+    """Export DNA, stats, achievements and history as JSON files (for GitHub Pages)"""
+    console.print("\n📤 [bold cyan]Exporting monkey data...[/bold cyan]\n")
+    
+    storage = workspace().storage()
+    if not storage.export_json(Path(output) if output else None):
+        sys.exit(1)
+
+
+@cli.command()
+@click.option('--prune', is_flag=True, help='Also delete objects no longer listed in the manifest')
+def migrate_archive(prune):
+    """Move monkey_evolution/*_monkey.svg into the content-addressed archive"""
+    console.print("\n🗄️  [bold cyan]Migrating SVG archive...[/bold cyan]\n")
+    
+    archive = workspace().archive()
+    before = len(list(archive.root.glob("*_monkey.svg")))
+    mapping = archive.migrate()
+    
+    storage = workspace().storage()
+    changed = storage.backend.rewrite_history(lambda entry: rewrite_svg_references(entry, mapping))
+    removed = archive.prune(
+        keep=[entry["svg_filename"] for entry in storage.backend.iter_history() if entry.get("svg_filename")]
+    ) if prune else 0
+    
+    objects = len(set(mapping.values()))
+    console.print(f"[green]✅ {before} snapshots stored as {objects} unique objects[/green]")
+    console.print(f"[dim]   Updated {changed} history entries, pruned {removed} objects[/dim]")
+
+
+@cli.command()
+@click.option('--keep-days', type=int, default=90, show_default=True, help='Keep every entry from the last N days')
+@click.option('--weekly-days', type=int, default=365, show_default=True,
+              help='Keep one entry per week up to N days old, one per month beyond')
+@click.option('--dry-run', is_flag=True, help='Only report what would be removed')
+def compact(keep_days, weekly_days, dry_run):
+    """Thin out old history and retire unused snapshots"""
+    from src.compaction import RetentionPolicy, compact as compact_history
+    
+    console.print("\n🗜️  [bold cyan]Compacting history...[/bold cyan]\n")
+    
+    ws = workspace()
+    policy = RetentionPolicy(keep_days=keep_days, weekly_days=weekly_days)
+    result = compact_history(ws.storage(), ws.archive(), policy, dry_run=dry_run)
+    
+    if dry_run:
+        console.print(f"[yellow]Would remove {result.entries_removed} of {result.entries_before} history entries[/yellow]")
+        return
+    console.print(f"[green]✅ {result.entries_before} → {result.entries_after} history entries[/green]")
+    console.print(f"[dim]   Retired {result.snapshots_retired} snapshots to monkey_evolution/retired.pack[/dim]")
+
+
+@cli.command()
+@click.option('--to', 'target', type=click.Choice(['file', 'sqlite']), required=True, help='Target backend')
+def migrate_storage(target):
+    """Copy monkey data into another storage backend"""
+    from src.backends import create_backend, copy_backend
+    
+    storage = workspace().storage()
+    if storage.backend.name == target:
+        console.print(f"[yellow]⚠️  Already using the {target} backend[/yellow]")
+        return
+    
+    console.print(f"\n🚚 [bold cyan]Migrating {storage.backend.name} → {target}...[/bold cyan]\n")
+    copied = copy_backend(storage.backend, create_backend(target, storage.data_dir))
+    console.print(f"[green]✅ Copied {copied['documents']} documents and {copied['history']} history entries[/green]")
+    if target == "sqlite":
+        console.print("[dim]   monkey_data/monkey.db is now used automatically; run 'export-data' before deploying Pages[/dim]")
+    else:
+        console.print("[dim]   Set FORKMONKEY_STORAGE=file (or remove monkey.db) to use the JSON files[/dim]")
+
+
 @cli.command()
 def visualize():
     """Generate and save monkey visualization"""
     console.print("\n🎨 [bold cyan]Generating visualization...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = workspace().storage()
     dna = storage.load_dna()
     
     if not dna:
@@ -358,15 +519,12 @@ def visualize():
     
     # Generate SVG
     svg = MonkeyVisualizer.generate_svg(dna)
-    svg_file = Path("monkey_data/monkey.svg")
-    svg_file.write_text(svg)
+    svg_file = workspace().svg_path
+    write_locked(svg_file, svg)
     
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    archive_file = Path(f"monkey_evolution/{timestamp}_monkey.svg")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    # Archive snapshot (deduplicated by content)
+    archive = workspace().archive()
+    archive_file = archive.root / archive.store(svg)
     
     console.print(f"[green]✅ SVG saved to: {svg_file}[/green]")
     console.print(f"[dim]   Archived to: {archive_file}[/dim]")
@@ -385,15 +543,15 @@ def update_readme():
     """Update README with current monkey"""
     console.print("\n📝 [bold cyan]Updating README...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    dna = storage.load_dna()
+    session = workspace().storage().session()
+    dna = session.load_dna()
     
     if not dna:
         console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
         return
     
     # Read current README
-    readme_file = Path("README.md")
+    readme_file = workspace().readme_path
     if not readme_file.exists():
         console.print("[red]❌ README.md not found![/red]")
         return
@@ -402,15 +560,11 @@ def update_readme():
     
     # Generate SVG and save it
     svg = MonkeyVisualizer.generate_svg(dna, width=400, height=400)
-    svg_file = Path("monkey_data/monkey.svg")
-    svg_file.write_text(svg)
+    svg_file = workspace().svg_path
+    write_locked(svg_file, svg)
     
-    # Archive with timestamp (using UTC for consistency)
-    from datetime import datetime, timezone
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d_%H-%M")
-    archive_file = Path(f"monkey_evolution/{timestamp}_monkey.svg")
-    archive_file.parent.mkdir(exist_ok=True)
-    archive_file.write_text(svg)
+    # Archive snapshot (deduplicated by content)
+    workspace().archive().store(svg)
     
     # Update monkey display section with image reference
     monkey_section = '''<!-- MONKEY_DISPLAY_START -->
@@ -427,8 +581,7 @@ def update_readme():
     readme = re.sub(pattern, monkey_section, readme, flags=re.DOTALL)
     
     # Update stats section
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = session.metadata.age_days
     rarity = dna.get_rarity_score()
     
     # Calculate rarity tier for display
@@ -497,7 +650,7 @@ def update_readme():
         readme = re.sub(pattern, breeding_section, readme, flags=re.DOTALL)
     
     # Save
-    readme_file.write_text(readme)
+    write_locked(readme_file, readme)
     
     console.print("[green]✅ README updated![/green]")
 
@@ -510,16 +663,15 @@ def share(copy, evolution, achievement):
     """Generate a shareable tweet about your monkey"""
     console.print("\n🐦 [bold cyan]Generating shareable tweet...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    dna = storage.load_dna()
+    session = workspace().storage().session()
+    dna = session.load_dna()
     
     if not dna:
         console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
         return
     
     # Get stats
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = session.metadata.age_days
     rarity = dna.get_rarity_score()
     repo = os.environ.get('GITHUB_REPOSITORY', 'roeiba/forkMonkey')
     
@@ -540,9 +692,10 @@ def share(copy, evolution, achievement):
             notable_trait = f"{trait.value} ({trait.rarity.value})"
     
     # Generate tweet based on context
-    if evolution and history:
+    latest_entries = session.recent_history(1) if evolution else []
+    if latest_entries:
         # Share latest evolution
-        latest = history[-1]
+        latest = latest_entries[-1]
         tweet = f"""Day {age_days} of my #ForkMonkey experiment! 🐵
 
 Today's evolution: {latest.get('story', 'Something changed!')}
@@ -612,23 +765,23 @@ def share_card(copy):
     """Generate a Wordle-style shareable evolution card"""
     console.print("\n🎨 [bold cyan]Generating Evolution Card...[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    dna = storage.load_dna()
+    session = workspace().storage().session()
+    dna = session.load_dna()
     
     if not dna:
         console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
         return
     
     # Get stats
-    history = storage.get_history()
-    age_days = len(history)
+    age_days = session.metadata.age_days
     rarity = dna.get_rarity_score()
     repo = os.environ.get('GITHUB_REPOSITORY', 'roeiba/forkMonkey')
     
     # Calculate rarity change (compare to yesterday if available)
     rarity_change = ""
-    if len(history) >= 2:
-        yesterday_rarity = history[-2].get('rarity_score', rarity)
+    recent = session.recent_history(2)
+    if len(recent) >= 2:
+        yesterday_rarity = recent[-2].get('rarity_score', rarity)
         change = rarity - yesterday_rarity
         if change > 0:
             rarity_change = f" (+{change:.1f})"
@@ -739,7 +892,7 @@ def streak():
     """Show your evolution streak"""
     console.print("\n🔥 [bold cyan]Evolution Streak[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = workspace().storage()
     streak_data = storage.get_streak()
     
     current = streak_data.get("current", 0)
@@ -789,16 +942,16 @@ def achievements():
     """Show unlocked achievements"""
     console.print("\n🏆 [bold cyan]Achievements[/bold cyan]\n")
     
-    storage = MonkeyStorage()
-    dna = storage.load_dna()
+    session = workspace().storage().session()
+    dna = session.load_dna()
     
     if not dna:
         console.print("[red]❌ No monkey found! Run 'init' first.[/red]")
         return
     
-    # Get history and stats for achievement checking
-    history = storage.get_history()
-    age_days = len(history)
+    # Get age and creation date for achievement checking
+    metadata = session.metadata
+    age_days = metadata.age_days
     rarity = dna.get_rarity_score()
     
     # Build stats dict for achievement checking
@@ -807,7 +960,7 @@ def achievements():
         "rarity_score": rarity,
         "generation": dna.generation,
         "total_mutations": dna.mutation_count,
-        "created_at": history[0].get("timestamp") if history else None,
+        "created_at": metadata.first_timestamp,
         "children_count": 0,  # Would need to scan forks to get this
     }
     
@@ -859,13 +1012,14 @@ def achievements():
     for key, achievement in locked[:3]:
         console.print(f"  {achievement['icon']} [dim]{achievement['title']}[/dim] - {achievement['description']}")
     
-    # Calculate streak
+    # Streak from the rolling summary
+    current_streak = metadata.streak.get("current", 0)
     console.print(f"\n[bold cyan]🔥 Evolution Streak:[/bold cyan]")
-    console.print(f"  Current: {age_days} days")
-    if age_days >= 7:
+    console.print(f"  Current: {current_streak} days")
+    if current_streak >= 7:
         console.print(f"  [green]✅ Week Warrior unlocked![/green]")
-    elif age_days >= 1:
-        console.print(f"  [yellow]{7 - age_days} more days for Week Warrior[/yellow]")
+    elif current_streak >= 1:
+        console.print(f"  [yellow]{7 - current_streak} more days for Week Warrior[/yellow]")
 
 
 @cli.command()
@@ -873,7 +1027,7 @@ def leaderboard():
     """Show your position on the rarity leaderboard"""
     console.print("\n🏆 [bold cyan]Rarity Leaderboard[/bold cyan]\n")
     
-    storage = MonkeyStorage()
+    storage = workspace().storage()
     dna = storage.load_dna()
     
     if not dna:
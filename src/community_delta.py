@@ -0,0 +1,288 @@
+"""
+ForkMonkey Community Deltas
+
+Patches between consecutive community scans, so a client that already
+holds one scan can catch up without downloading everything again.
+
+A scan's snapshot is its fork records keyed by ``full_name``. Its
+version id (``data_version`` in community_data.json and the sharded
+manifest) is the content hash of the compact JSON of that mapping, so
+identical scans share a version whatever their timestamps.
+
+After each scan, the delta from the previous scan's ``community_data.json``
+is written to ``web/deltas/<from version>.json``:
+
+- ``ops``: RFC 6902 JSON Patch operations (``add``, ``remove``,
+  ``replace``) on the snapshot. Nested objects are diffed member by
+  member, so a daily ``age_days`` tick is one small op per monkey.
+  Lists are replaced whole.
+- ``ranks``: leaderboard rank moves, as [old rank, new rank] (null when
+  absent), of monkeys that were added, removed or changed rarity. The
+  shifts these cause for everyone else follow from the order.
+- ``summary``: counts of added, removed and changed monkeys
+
+``deltas/index.json`` lists the retained deltas, oldest first, and the
+latest version. A client holding version V fetches ``deltas/V.json``,
+applies it and repeats until there is no delta for its version
+(``catch_up`` does this for a directory). Only the last ``DEFAULT_KEEP``
+deltas are kept; older clients reload the full data.
+
+Usage:
+    python src/community_delta.py diff old.json new.json
+    python src/community_delta.py apply web/community_data.json --deltas web/deltas --output synced.json
+"""
+
+import sys
+import copy
+import json
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+# Add parent directory to path for imports when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.community_outputs import CommunityAggregator, dumps, write_json
+from src.snapshot_pack import content_hash
+
+
+DELTA_VERSION = 1
+DEFAULT_KEEP = 30
+INDEX_NAME = "index.json"
+
+
+def snapshot(monkeys: Iterable[dict]) -> Dict[str, dict]:
+    """Fork records keyed by full_name (the first record of a repo wins)"""
+    records: Dict[str, dict] = {}
+    for monkey in monkeys:
+        records.setdefault(monkey["full_name"], monkey)
+    return records
+
+
+def version_id(records: Dict[str, dict]) -> str:
+    """Content hash of a snapshot, independent of record order"""
+    return content_hash(dumps(records, compact=True))
+
+
+def load_snapshot(path: Union[str, Path]) -> Optional[Dict[str, dict]]:
+    """The snapshot in a community_data.json, or None if missing or unreadable"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return snapshot(json.load(f).get("forks", []))
+    except (OSError, ValueError, KeyError, AttributeError) as e:
+        print(f"⚠️  Ignoring unreadable community data {path}: {e}")
+        return None
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(old: dict, new: dict, path: str = "") -> List[dict]:
+    """JSON Patch operations turning ``old`` into ``new``"""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        member = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": member, "value": value})
+            continue
+        previous = old[key]
+        if type(previous) is type(value) and previous == value:
+            continue
+        if isinstance(previous, dict) and isinstance(value, dict):
+            ops += diff(previous, value, member)
+        else:
+            ops.append({"op": "replace", "path": member, "value": value})
+    return ops
+
+
+def apply_patch(document: dict, ops: Iterable[dict]) -> dict:
+    """
+    ``document`` with JSON Patch operations applied (add/remove/replace on
+    object members)
+
+    The input is not modified: objects along each patched path are copied
+    once, everything else is shared.
+    """
+    result = dict(document)
+    copied = {id(result)}
+    for op in ops:
+        keys = [_unescape(token) for token in op["path"].split("/")[1:]]
+        if not keys:
+            raise ValueError(f"Cannot patch the document root: {op}")
+        target = result
+        for key in keys[:-1]:
+            child = target.get(key)
+            if not isinstance(child, dict):
+                raise ValueError(f"Patch path {op['path']} does not exist")
+            if id(child) not in copied:
+                child = dict(child)
+                target[key] = child
+                copied.add(id(child))
+            target = child
+
+        last = keys[-1]
+        kind = op["op"]
+        if kind == "remove" or kind == "replace":
+            if last not in target:
+                raise ValueError(f"Patch path {op['path']} does not exist")
+        if kind == "remove":
+            del target[last]
+        elif kind in ("add", "replace"):
+            target[last] = copy.deepcopy(op["value"])
+        else:
+            raise ValueError(f"Unsupported patch operation: {kind}")
+    return result
+
+
+def _ranks(records: Dict[str, dict]) -> Dict[str, int]:
+    ranked = CommunityAggregator(records.values()).ranked()
+    return {monkey["full_name"]: rank for rank, monkey in enumerate(ranked, start=1)}
+
+
+def _rarity(record: Optional[dict]):
+    return (record or {}).get("monkey_stats", {}).get("rarity_score", 0)
+
+
+def make_delta(old: Dict[str, dict], new: Dict[str, dict]) -> dict:
+    """The delta between two snapshots"""
+    ops = diff(old, new)
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [name for name in new if name in old and old[name] != new[name]]
+
+    movers = set(added) | set(removed) | {name for name in changed if _rarity(old[name]) != _rarity(new[name])}
+    ranks = {}
+    if movers:
+        old_ranks, new_ranks = _ranks(old), _ranks(new)
+        for name in sorted(movers):
+            before, after = old_ranks.get(name), new_ranks.get(name)
+            if before != after:
+                ranks[name] = [before, after]
+
+    return {
+        "version": DELTA_VERSION,
+        "from": version_id(old),
+        "to": version_id(new),
+        "created": datetime.now(timezone.utc).isoformat(),
+        "summary": {"added": len(added), "removed": len(removed), "changed": len(changed)},
+        "ops": ops,
+        "ranks": ranks,
+    }
+
+
+def apply_delta(records: Dict[str, dict], delta: dict) -> Dict[str, dict]:
+    """Apply one delta to the snapshot it was made from; raises ValueError on a version mismatch"""
+    current = version_id(records)
+    if current != delta["from"]:
+        raise ValueError(f"Delta applies to version {delta['from']}, snapshot is {current}")
+    result = apply_patch(records, delta["ops"])
+    if version_id(result) != delta["to"]:
+        raise ValueError(f"Delta did not produce version {delta['to']}")
+    return result
+
+
+def catch_up(records: Dict[str, dict], delta_dir: Union[str, Path]) -> Dict[str, dict]:
+    """Apply every delta in ``delta_dir`` that follows the snapshot's version, in order"""
+    delta_dir = Path(delta_dir)
+    seen = set()
+    version = version_id(records)
+    while version not in seen:
+        seen.add(version)
+        path = delta_dir / f"{version}.json"
+        if not path.exists():
+            break
+        with open(path, "r", encoding="utf-8") as f:
+            delta = json.load(f)
+        records = apply_delta(records, delta)
+        version = delta["to"]
+    return records
+
+
+def write_delta(delta: dict, delta_dir: Union[str, Path], keep: int = DEFAULT_KEEP, compact: bool = False) -> dict:
+    """
+    Write a delta as ``<from>.json``, record it in the index and drop the oldest; returns the index
+
+    Files are written atomically, delta first, then the index; deltas that
+    fell out of the index are deleted last, so a reader never finds the
+    index pointing at a missing file.
+    """
+    delta_dir = Path(delta_dir)
+    delta_dir.mkdir(parents=True, exist_ok=True)
+    index_path = delta_dir / INDEX_NAME
+    index = {"latest": None, "deltas": []}
+    if index_path.exists():
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Rebuilding unreadable delta index {index_path}: {e}")
+
+    name = f"{delta['from']}.json"
+    digest = write_json(delta_dir / name, delta, compact)
+    entries = [entry for entry in index.get("deltas", []) if entry["file"] != name]
+    entries.append({
+        "file": name,
+        "from": delta["from"],
+        "to": delta["to"],
+        "created": delta["created"],
+        "ops": len(delta["ops"]),
+        "hash": digest,
+    })
+    entries = entries[-keep:]
+
+    # Delta and index are both in place before anything the old index listed goes away
+    index = {"latest": delta["to"], "deltas": entries}
+    write_json(index_path, index, compact)
+
+    kept = {entry["file"] for entry in entries}
+    for stale in delta_dir.glob("*.json"):
+        if stale.name != INDEX_NAME and stale.name not in kept:
+            stale.unlink()
+    return index
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Deltas between community scans")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    diff_cmd = sub.add_parser("diff", help="Print the delta between two community_data.json files")
+    diff_cmd.add_argument("old")
+    diff_cmd.add_argument("new")
+
+    apply_cmd = sub.add_parser("apply", help="Bring a community_data.json up to date from a delta directory")
+    apply_cmd.add_argument("data")
+    apply_cmd.add_argument("--deltas", default="web/deltas")
+    apply_cmd.add_argument("--output", default=None, help="Output file (default: overwrite data)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "diff":
+        old, new = load_snapshot(args.old), load_snapshot(args.new)
+        if old is None or new is None:
+            sys.exit("❌ Both files must be readable community data")
+        print(json.dumps(make_delta(old, new), indent=2))
+    elif args.command == "apply":
+        records = load_snapshot(args.data)
+        if records is None:
+            sys.exit(f"❌ Cannot read {args.data}")
+        before = version_id(records)
+        records = catch_up(records, args.deltas)
+        output = Path(args.output or args.data)
+        write_json(output, {"data_version": version_id(records), "forks": list(records.values())})
+        print(f"✅ {before} → {version_id(records)} ({len(records)} monkeys) written to {output}")
+
+
+if __name__ == "__main__":
+    main()
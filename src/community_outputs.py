@@ -0,0 +1,427 @@
+"""
+ForkMonkey Community Outputs
+
+Builds the web/*.json files the community page reads from one pass over
+the scanned monkeys.
+
+``CommunityAggregator.add`` looks at each monkey once and keeps only what
+the outputs need:
+
+- leaderboard: one (-rarity_score, position) key per monkey; the full
+  ranking is one sort, the top K a K-sized heap (``heapq.nsmallest``)
+- family tree: the first position of each repo and a parent → children
+  adjacency list
+- network stats: Counters keyed by (trait, value) tuples and by
+  generation, plus running rarity sum/min/max and the active-today count
+
+Records are referenced, not copied, and output dicts are only built when
+an output is asked for. Every file is written by ``write_json``, either
+indented or, with ``compact=True``, without whitespace and with sorted
+keys. Compact output is several times smaller, byte-stable across runs,
+and encoded by json's C encoder rather than the pure-Python one that
+``indent`` needs.
+
+``write_sharded`` splits the same outputs into fixed-size files under
+web/community/ so the page never has to download the whole network:
+
+- ``leaderboard/page-NNNN.json``: ``page_size`` ranked entries per page
+- ``forks/<prefix>.json``: fork records sorted by lowercase owner, in
+  runs of owner prefixes of up to ``shard_size`` forks
+- ``tree/part-NNNN.json``: family-tree nodes, whole subtrees packed into
+  parts of up to ``part_size`` nodes (larger subtrees are split), each
+  node after its parent
+- ``<kind>/index.json``: every file of that kind with its count and
+  content hash
+- ``manifest.json``: counts, per-degree node counts, the top K of the
+  leaderboard, and the first file and index of each kind. Its size does
+  not depend on the number of monkeys.
+
+Files left over from a larger network are removed, and the manifest is
+written last.
+
+community_data.json and the manifest carry the scan's ``data_version``,
+which names the deltas between scans (src/community_delta.py).
+"""
+
+import heapq
+import json
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.fileio import atomic_write_text
+from src.snapshot_pack import content_hash
+
+
+MANIFEST_VERSION = 1
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_SHARD_SIZE = 100
+DEFAULT_PART_SIZE = 250
+DEFAULT_TOP_K = 10
+INDEX_NAME = "index.json"
+
+
+def dumps(data, compact: bool = False) -> str:
+    """Readable JSON, or compact JSON (no whitespace, sorted keys) for publishing"""
+    if compact:
+        return json.dumps(data, separators=(",", ":"), sort_keys=True)
+    return json.dumps(data, indent=2)
+
+
+def write_json(path: Path, data, compact: bool = False) -> str:
+    """
+    The one serializer for every community output file, returns its content hash
+
+    Written atomically (UTF-8), so the site never serves a half-written file.
+    """
+    text = dumps(data, compact)
+    atomic_write_text(path, text)
+    return content_hash(text)
+
+
+def _timestamp(value: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class CommunityAggregator:
+    """Single-pass aggregation of scanned monkeys for the leaderboard, family tree and stats"""
+
+    def __init__(self, monkeys: Iterable[dict] = (), now: Optional[datetime] = None,
+                 data_version: Optional[str] = None):
+        self.now = now or datetime.now(timezone.utc)
+        self.data_version = data_version
+        self.monkeys: List[dict] = []
+        self._ranking: List[Tuple[float, int]] = []
+        self._first: Dict[str, int] = {}
+        self._children: Dict[str, List[str]] = defaultdict(list)
+        self.generations: Counter = Counter()
+        self.degrees: Counter = Counter()
+        self.traits: Counter = Counter()
+        self.rarity_sum = 0
+        self.rarity_min = None
+        self.rarity_max = None
+        self.active_today = 0
+        for monkey in monkeys:
+            self.add(monkey)
+
+    def add(self, monkey: dict) -> None:
+        position = len(self.monkeys)
+        self.monkeys.append(monkey)
+        stats = monkey.get("monkey_stats", {})
+        rarity = stats.get("rarity_score", 0)
+
+        # Ties keep scan order, like a stable sort
+        self._ranking.append((-rarity, position))
+
+        full_name = monkey["full_name"]
+        if full_name not in self._first:
+            self._first[full_name] = position
+            self.degrees[str(monkey.get("degree", 0))] += 1
+            parent = monkey.get("parent")
+            if parent:
+                self._children[parent].append(full_name)
+
+        self.generations[str(stats.get("generation", 1))] += 1
+        self.rarity_sum += rarity
+        if self.rarity_min is None or rarity < self.rarity_min:
+            self.rarity_min = rarity
+        if self.rarity_max is None or rarity > self.rarity_max:
+            self.rarity_max = rarity
+
+        updated = monkey.get("updated_at")
+        if updated:
+            updated_dt = _timestamp(updated)
+            if updated_dt is not None and (self.now - updated_dt).days == 0:
+                self.active_today += 1
+
+        traits = stats.get("traits", {})
+        if not traits:
+            traits = (monkey.get("monkey_dna") or {}).get("traits", {})
+        counts = self.traits
+        for trait_name, trait_data in traits.items():
+            value = trait_data.get("value", "unknown") if isinstance(trait_data, dict) else trait_data
+            counts[trait_name, str(value)] += 1
+
+    def __len__(self) -> int:
+        return len(self.monkeys)
+
+    @property
+    def last_updated(self) -> str:
+        return self.now.isoformat()
+
+    def ranked(self, k: Optional[int] = None) -> List[dict]:
+        """Monkeys by rarity score, highest first (only the top ``k`` if given)"""
+        order = sorted(self._ranking) if k is None else heapq.nsmallest(k, self._ranking)
+        return [self.monkeys[position] for _, position in order]
+
+    def leaderboard_entries(self, k: Optional[int] = None) -> List[dict]:
+        return [self.leaderboard_entry(rank, monkey) for rank, monkey in enumerate(self.ranked(k), start=1)]
+
+    @staticmethod
+    def leaderboard_entry(rank: int, monkey: dict) -> dict:
+        stats = monkey.get("monkey_stats", {})
+        return {
+            "rank": rank,
+            "owner": monkey["owner"],
+            "repo": monkey["repo"],
+            "full_name": monkey["full_name"],
+            "url": monkey["url"],
+            "rarity_score": stats.get("rarity_score", 0),
+            "generation": stats.get("generation", 1),
+            "age_days": stats.get("age_days", 0),
+            "mutation_count": stats.get("mutation_count", 0),
+            "is_root": monkey["is_root"],
+            "degree": monkey.get("degree", 0),
+            "degree_label": monkey.get("degree_label", "root"),
+            "svg_hash": monkey.get("svg_hash")
+        }
+
+    def community_data(self, source_repo: str) -> dict:
+        return {
+            "last_updated": self.last_updated,
+            "data_version": self.data_version,
+            "source_repo": source_repo,
+            "total_forks": len(self.monkeys),
+            "forks": self.monkeys
+        }
+
+    def leaderboard(self) -> dict:
+        rankings = self.leaderboard_entries()
+        return {
+            "last_updated": self.last_updated,
+            "total_ranked": len(rankings),
+            "rankings": rankings
+        }
+
+    def tree_node(self, full_name: str) -> dict:
+        monkey = self.monkeys[self._first[full_name]]
+        stats = monkey.get("monkey_stats", {})
+        return {
+            "id": full_name,
+            "owner": monkey["owner"],
+            "repo": monkey["repo"],
+            "url": monkey["url"],
+            "parent": monkey.get("parent"),
+            "children": list(self._children.get(full_name, ())),
+            "is_root": monkey["is_root"],
+            "degree": monkey.get("degree", 0),
+            "degree_label": monkey.get("degree_label", "root"),
+            "rarity_score": stats.get("rarity_score", 0),
+            "generation": stats.get("generation", 1),
+            "svg_hash": monkey.get("svg_hash")
+        }
+
+    def subtrees(self, root_name: str, max_size: Optional[int] = None) -> List[List[str]]:
+        """
+        Tree nodes as whole subtrees, in depth-first order
+
+        The root alone comes first, then the subtree of each of its forks,
+        then subtrees whose parent was not scanned. A subtree larger than
+        ``max_size`` is split into its top node and its children's
+        subtrees, so a node never comes after its descendants.
+        """
+        seen = set()
+        units = []
+
+        def walk(top: str) -> List[str]:
+            order, stack, visited = [], [top], set()
+            while stack:
+                name = stack.pop()
+                if name in seen or name in visited:
+                    continue
+                visited.add(name)
+                order.append(name)
+                stack.extend(reversed(self._children.get(name, ())))
+            return order
+
+        def emit(top: str) -> None:
+            order = walk(top)
+            if max_size is None or len(order) <= max_size:
+                seen.update(order)
+                units.append(order)
+                return
+            seen.add(top)
+            units.append([top])
+            for child in self._children.get(top, ()):
+                if child not in seen:
+                    emit(child)
+
+        if root_name in self._first:
+            seen.add(root_name)
+            units.append([root_name])
+            for child in self._children.get(root_name, ()):
+                emit(child)
+        for name, position in self._first.items():
+            if name not in seen and self.monkeys[position].get("parent") not in self._first:
+                emit(name)
+        # Anything else hangs off a parent cycle
+        for name in self._first:
+            if name not in seen:
+                emit(name)
+        return units
+
+    def family_tree(self, root_name: str) -> dict:
+        nodes = [self.tree_node(full_name) for full_name in self._first]
+        return {
+            "last_updated": self.last_updated,
+            "root": root_name,
+            "total_nodes": len(nodes),
+            "nodes": nodes
+        }
+
+    def network_stats(self) -> dict:
+        if not self.monkeys:
+            return {
+                "last_updated": self.last_updated,
+                "total_monkeys": 0,
+                "active_today": 0,
+                "generations": {},
+                "avg_rarity": 0,
+                "rarest_trait": None,
+                "most_common_trait": None,
+                "trait_distribution": {}
+            }
+
+        most_common_trait = rarest_trait = None
+        if self.traits:
+            # Ties: the first trait seen is the most common, the last seen the rarest
+            (name, value), count = max(self.traits.items(), key=lambda item: item[1])
+            most_common_trait = {"trait": name, "value": value, "count": count}
+            (name, value), count = min(reversed(self.traits.items()), key=lambda item: item[1])
+            rarest_trait = {"trait": name, "value": value, "count": count}
+
+        trait_distribution: Dict[str, Dict[str, int]] = {}
+        for (name, value), count in self.traits.items():
+            trait_distribution.setdefault(name, {})[value] = count
+
+        return {
+            "last_updated": self.last_updated,
+            "total_monkeys": len(self.monkeys),
+            "active_today": self.active_today,
+            "generations": dict(self.generations),
+            "avg_rarity": round(self.rarity_sum / len(self.monkeys), 2),
+            "max_rarity": round(self.rarity_max, 2),
+            "min_rarity": round(self.rarity_min, 2),
+            "rarest_trait": rarest_trait,
+            "most_common_trait": most_common_trait,
+            "trait_distribution": trait_distribution
+        }
+
+
+def owner_shards(monkeys: List[dict], shard_size: int = DEFAULT_SHARD_SIZE) -> List[Tuple[str, List[dict]]]:
+    """
+    (start prefix, monkeys) runs of forks sorted by lowercase owner
+
+    Owners are grouped by prefix, and a group over ``shard_size`` is split
+    on the next character. Adjacent groups are then merged up to
+    ``shard_size``. A shard holds every owner from its start prefix up to
+    the next shard's, and only one owner's forks can exceed the limit.
+    """
+    keyed = sorted(((monkey["owner"].lower(), monkey) for monkey in monkeys), key=lambda pair: pair[0])
+    groups: List[Tuple[str, List[Tuple[str, dict]]]] = []
+
+    def split(prefix: str, items: List[Tuple[str, dict]]) -> None:
+        depth = len(prefix) + 1
+        if len(items) <= shard_size or items[0][0] == items[-1][0]:
+            groups.append((prefix, items))
+            return
+        start = 0
+        for i in range(1, len(items) + 1):
+            if i == len(items) or items[i][0][:depth] != items[start][0][:depth]:
+                split(items[start][0][:depth], items[start:i])
+                start = i
+
+    if keyed:
+        split("", keyed)
+
+    shards: List[Tuple[str, List[dict]]] = []
+    for prefix, items in groups:
+        if shards and len(shards[-1][1]) + len(items) <= shard_size:
+            shards[-1][1].extend(monkey for _, monkey in items)
+        else:
+            shards.append((prefix, [monkey for _, monkey in items]))
+    return shards
+
+
+def _clear_stale(directory: Path, keep: Iterable[str]) -> None:
+    keep = set(keep)
+    for stale in directory.glob("*.json"):
+        if stale.name not in keep:
+            stale.unlink()
+
+
+def _write_files(out_dir: Path, sub: str, items: Iterable[Tuple[str, dict, dict]], compact: bool = False) -> dict:
+    """
+    Write (name, data, info) files to out_dir/sub, plus an index of them
+
+    Returns the manifest entry: the number of files, the first one and the
+    index, each file listed with its info, path and content hash.
+    """
+    directory = out_dir / sub
+    directory.mkdir(parents=True, exist_ok=True)
+    files = []
+    for name, data, info in items:
+        digest = write_json(directory / name, data, compact)
+        files.append(dict(info, file=f"{sub}/{name}", hash=digest))
+    index_hash = write_json(directory / INDEX_NAME, {"files": files}, compact)
+    _clear_stale(directory, [entry["file"].split("/", 1)[1] for entry in files] + [INDEX_NAME])
+    return {
+        "count": len(files),
+        "first": files[0] if files else None,
+        "index": {"file": f"{sub}/{INDEX_NAME}", "hash": index_hash},
+    }
+
+
+def write_sharded(aggregate: CommunityAggregator, root_name: str, out_dir: Path,
+                  page_size: int = DEFAULT_PAGE_SIZE, shard_size: int = DEFAULT_SHARD_SIZE,
+                  part_size: int = DEFAULT_PART_SIZE, top_k: int = DEFAULT_TOP_K, compact: bool = False) -> dict:
+    """Write leaderboard pages, fork shards, tree parts and their manifest; returns the manifest"""
+    out_dir = Path(out_dir)
+    ranked = aggregate.ranked()
+
+    def pages():
+        for number, start in enumerate(range(0, len(ranked), page_size)):
+            rankings = [aggregate.leaderboard_entry(start + i + 1, monkey)
+                        for i, monkey in enumerate(ranked[start:start + page_size])]
+            yield f"page-{number:04d}.json", {"page": number, "rankings": rankings}, {"count": len(rankings)}
+
+    def forks():
+        for prefix, group in owner_shards(aggregate.monkeys, shard_size):
+            yield f"{prefix or '_'}.json", {"start": prefix, "forks": group}, {"start": prefix, "count": len(group)}
+
+    def parts():
+        part: List[str] = []
+        number = 0
+        for unit in aggregate.subtrees(root_name, part_size) + [None]:
+            if part and (unit is None or len(part) + len(unit) > part_size):
+                nodes = [aggregate.tree_node(full_name) for full_name in part]
+                yield f"part-{number:04d}.json", {"part": number, "nodes": nodes}, {"count": len(nodes)}
+                number += 1
+                part = []
+            if unit is not None:
+                part += unit
+
+    leaderboard = _write_files(out_dir, "leaderboard", pages(), compact)
+    leaderboard["page_size"] = page_size
+    shards = _write_files(out_dir, "forks", forks(), compact)
+    shards["shard_size"] = shard_size
+    tree = _write_files(out_dir, "tree", parts(), compact)
+    tree.update(part_size=part_size, root=root_name, degrees=dict(aggregate.degrees))
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "last_updated": aggregate.last_updated,
+        "data_version": aggregate.data_version,
+        "source_repo": root_name,
+        "counts": {"monkeys": len(aggregate), "nodes": sum(aggregate.degrees.values())},
+        "top": aggregate.leaderboard_entries(top_k),
+        "leaderboard": leaderboard,
+        "forks": shards,
+        "tree": tree,
+    }
+    write_json(out_dir / "manifest.json", manifest, compact)
+    return manifest
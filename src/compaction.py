@@ -0,0 +1,180 @@
+"""
+ForkMonkey History Compaction
+
+Retention policy for long-lived monkeys. Without it, history and
+``monkey_evolution/`` grow by one entry and one snapshot every day.
+
+- Entries from the last ``keep_days`` days are kept at full daily
+  resolution.
+- Older entries, up to ``weekly_days`` old, are thinned to one entry per
+  ISO week. Anything older keeps one entry per month.
+- The lineage story is preserved. The first and last entries survive, and
+  so do the first and last entry of every generation.
+- Each surviving entry carries a ``folded`` record for the entries merged
+  into it: count, first timestamp, active days and rarity range. The
+  summary (src/summary.py) can therefore still be rebuilt exactly.
+- Snapshots only referenced by dropped entries move to
+  ``monkey_evolution/retired.pack``.
+
+The stored summary keeps its all-time aggregates (age, streak, total
+mutations, rarity max/min). Compaction never touches them.
+
+Usage:
+    python -m src.cli compact --keep-days 90 --weekly-days 365
+"""
+
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.archive import SvgArchive
+from src.storage import MonkeyStorage
+from src.summary import iter_days
+
+
+class RetentionPolicy(BaseModel):
+    """How much history resolution to keep, by age in days"""
+    keep_days: int = 90
+    weekly_days: int = 365
+
+
+class CompactionResult(BaseModel):
+    """What a compaction run changed"""
+    entries_before: int
+    entries_after: int
+    snapshots_retired: int = 0
+    dry_run: bool = False
+
+    @property
+    def entries_removed(self) -> int:
+        return self.entries_before - self.entries_after
+
+
+def _entry_day(entry: dict) -> Optional[date]:
+    try:
+        return datetime.fromisoformat(str(entry.get("timestamp"))).date()
+    except ValueError:
+        return None
+
+
+def period_key(day: Optional[date], today: date, policy: RetentionPolicy) -> Optional[tuple]:
+    """Bucket an entry falls into, or None if it is kept as-is"""
+    if day is None:
+        return None
+    age = (today - day).days
+    if age < policy.keep_days:
+        return None
+    if age < policy.weekly_days:
+        year, week, _ = day.isocalendar()
+        return ("week", year, week)
+    return ("month", day.year, day.month)
+
+
+def _fold(kept: dict, merged: List[dict]) -> dict:
+    """Return ``kept`` with the entries in ``merged`` (all older) folded into it"""
+    previous = kept.get("folded") or {}
+    count = previous.get("count", 0)
+    first_timestamp = None
+    days = set(_folded_days(previous))
+    rarities = [previous.get("rarity_min"), previous.get("rarity_max")]
+
+    for entry in merged:
+        folded = entry.get("folded") or {}
+        count += 1 + folded.get("count", 0)
+        if first_timestamp is None:
+            first_timestamp = folded.get("first_timestamp") or entry.get("timestamp")
+        days.update(_folded_days(folded))
+        if _entry_day(entry):
+            days.add(_entry_day(entry))
+        rarities += [entry.get("rarity_score"), folded.get("rarity_min"), folded.get("rarity_max")]
+
+    rarities = [r for r in rarities if r is not None]
+    first_day = min(days) if days else None
+    mask = 0
+    for day in days:
+        mask |= 1 << (day - first_day).days
+
+    result = dict(kept)
+    result["folded"] = {
+        "count": count,
+        "first_timestamp": first_timestamp or previous.get("first_timestamp"),
+        "first_day": first_day.isoformat() if first_day else None,
+        "days": format(mask, "x"),
+        "rarity_min": min(rarities) if rarities else None,
+        "rarity_max": max(rarities) if rarities else None,
+    }
+    return result
+
+
+def _folded_days(folded: dict) -> List[date]:
+    return list(iter_days(folded.get("first_day"), folded.get("days", "0")))
+
+
+def plan_compaction(entries: List[dict], policy: RetentionPolicy,
+                    today: Optional[date] = None) -> Tuple[List[dict], List[dict]]:
+    """
+    Split history into (kept, removed) under ``policy``
+
+    Kept entries come back with the removed entries before them folded
+    in. An entry is kept if it is recent, if it is the last one in its
+    week/month bucket, or if it starts or ends a generation. A removed
+    entry is therefore always followed by a kept entry of the same bucket
+    and generation.
+    """
+    today = today or datetime.now().date()
+    keys = [period_key(_entry_day(entry), today, policy) for entry in entries]
+    generations = [entry.get("generation") for entry in entries]
+    last = len(entries) - 1
+
+    kept, removed, pending = [], [], []
+    for i, entry in enumerate(entries):
+        keep = (
+            i in (0, last)
+            or keys[i] is None
+            or keys[i] != keys[i + 1]
+            or generations[i] != generations[i - 1]
+            or generations[i] != generations[i + 1]
+        )
+        if keep:
+            kept.append(_fold(entry, pending) if pending else entry)
+            pending = []
+        else:
+            pending.append(entry)
+            removed.append(entry)
+
+    return kept, removed
+
+
+def compact(storage: MonkeyStorage, archive: SvgArchive, policy: Optional[RetentionPolicy] = None,
+            today: Optional[date] = None, dry_run: bool = False) -> CompactionResult:
+    """
+    Apply the retention policy to a monkey's history and snapshot archive
+
+    The summary is loaded, and rebuilt if needed, before anything is
+    dropped. It is then written in the same transaction as the thinned
+    history; every backend saves the summary before it replaces the
+    history, so age, streak and the all-time aggregates stay exact even
+    if the run dies in between.
+    """
+    policy = policy or RetentionPolicy()
+    backend = storage.backend
+
+    summary = storage.load_summary()
+    entries = backend.read_history()
+    kept, removed = plan_compaction(entries, policy, today)
+
+    result = CompactionResult(entries_before=len(entries), entries_after=len(kept), dry_run=dry_run)
+    if dry_run or not removed:
+        return result
+
+    with backend.transaction():
+        backend.write_document("summary", summary.model_dump())
+        backend.replace_history(kept)
+
+    result.snapshots_retired = archive.retire(
+        [entry["svg_filename"] for entry in removed if entry.get("svg_filename")],
+        keep=[entry["svg_filename"] for entry in kept if entry.get("svg_filename")],
+        timestamps={entry["svg_filename"]: entry.get("timestamp") for entry in removed if entry.get("svg_filename")},
+    )
+    return result
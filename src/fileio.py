@@ -0,0 +1,151 @@
+"""
+ForkMonkey File I/O
+
+Crash-safe writes and cross-process locking for monkey data.
+
+- atomic_write_text/atomic_write_json: write to a temp file in the same
+  directory, fsync, then rename over the target, so readers only ever see
+  the old or the new file, never a truncated one.
+- file_lock: advisory fcntl lock on a ``.lock`` file. Locks are scoped to
+  a directory (one per monkey), so parallel runners working on different
+  monkeys never wait on each other.
+"""
+
+import os
+import json
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # Windows: locking degrades to a no-op
+    HAS_FCNTL = False
+
+
+LOCK_NAME = ".lock"
+
+
+def fsync_dir(directory: Path) -> None:
+    """Flush a directory entry so a rename survives a crash"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(str(directory), os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _file_mode(path: Path) -> int:
+    """Permission bits for a file written over ``path``"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def write_temp(path: Union[str, Path], data: bytes) -> Path:
+    """
+    Write ``data`` to a fsynced temp file next to ``path``
+
+    The caller renames it into place with ``os.replace`` (or deletes it).
+    Used directly when several files must be staged before any is replaced.
+    The temp file gets the mode of the existing ``path``, or the umask
+    default for a new file, instead of mkstemp's 0600.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, _file_mode(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    return Path(tmp_name)
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes) -> None:
+    """Atomically replace ``path`` with ``data`` (temp file + fsync + rename)"""
+    path = Path(path)
+    tmp = write_temp(path, data)
+    try:
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    fsync_dir(path.parent)
+
+
+def atomic_write_text(path: Union[str, Path], text: str) -> None:
+    """Atomically replace ``path`` with ``text`` (UTF-8)"""
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+
+def atomic_write_json(path: Union[str, Path], data: Any, indent: int = 2) -> None:
+    """Atomically replace ``path`` with ``data`` serialized as JSON"""
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+
+_held = threading.local()
+
+
+@contextmanager
+def file_lock(directory: Union[str, Path], shared: bool = False) -> Iterator[None]:
+    """
+    Hold an advisory lock on ``directory`` for the duration of the block
+
+    Exclusive by default; pass ``shared=True`` for readers that only need
+    to exclude writers. Re-entrant within a thread: nested calls for the
+    same directory reuse the outer lock.
+    """
+    if not HAS_FCNTL:
+        yield
+        return
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    key = str(directory.resolve())
+
+    depths = getattr(_held, "depths", None)
+    if depths is None:
+        depths = _held.depths = {}
+
+    if depths.get(key):
+        depths[key] += 1
+        try:
+            yield
+        finally:
+            depths[key] -= 1
+        return
+
+    with open(directory / LOCK_NAME, "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        depths[key] = 1
+        try:
+            yield
+        finally:
+            depths.pop(key, None)
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,302 @@
+"""
+ForkMonkey GitHub Client
+
+Shared access layer for everything that talks to the GitHub API: the
+community scanner, MonkeyStorage (parent DNA over the HTTP cache) and the
+local web server.
+
+- ``RateLimitScheduler``: a token bucket per rate-limit resource (core,
+  graphql, search). It is refilled from the ``X-RateLimit-*`` headers of
+  every response (or PyGithub's ``rate_limiting``). When a bucket is empty,
+  callers wait for the reset instead of collecting 403s.
+- Priorities: ``INTERACTIVE`` callers (API requests a user is waiting on)
+  may spend the whole budget. ``BACKGROUND`` callers (scans) leave
+  ``reserve`` requests untouched, are paced to ``max_background_rps`` and
+  yield while an interactive request is waiting.
+- Secondary rate limits (429, or 403 with Retry-After / "secondary rate
+  limit") pause every caller of the token, with Retry-After or an
+  exponential backoff.
+- One pooled keep-alive ``requests`` session per process.
+
+Schedulers are shared per token, since GitHub's limits are per token:
+any number of ``GitHubClient`` objects for the same token draw from the
+same buckets.
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+DEFAULT_RESERVE = 100
+DEFAULT_POOL_SIZE = 16
+# First secondary-rate-limit pause without Retry-After, doubled per retry
+SECONDARY_BACKOFF = 60.0
+MAX_BACKOFF = 900.0
+# How often a background caller re-checks for waiting interactive callers
+PRIORITY_POLL = 0.05
+
+
+class RateBucket:
+    """What GitHub last told us about one rate-limit resource"""
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset: Optional[float] = None
+
+    def update(self, remaining: int, limit: Optional[int], reset: Optional[float]) -> None:
+        # In the same window, in-flight responses can report a stale (higher) count
+        if self.remaining is not None and reset == self.reset:
+            remaining = min(remaining, self.remaining)
+        self.remaining = remaining
+        self.limit = limit if limit is not None else self.limit
+        self.reset = reset
+
+
+def resource_for(url: str) -> str:
+    """Rate-limit resource a request URL counts against"""
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    if "/search/" in url:
+        return "search"
+    return "core"
+
+
+class RateLimitScheduler:
+    """Token-bucket scheduling of GitHub requests across threads and priorities"""
+
+    def __init__(self, reserve: int = DEFAULT_RESERVE, max_background_rps: Optional[float] = None,
+                 clock=time.monotonic, sleep=time.sleep, now=time.time):
+        self.reserve = reserve
+        self.max_background_rps = max_background_rps
+        self.clock = clock
+        self.sleep = sleep
+        self.now = now
+        self.buckets: Dict[str, RateBucket] = {}
+        self.blocked_until: Optional[float] = None
+        self._lock = threading.Lock()
+        self._interactive_waiting = 0
+        self._next_background = 0.0
+
+    def bucket(self, resource: str = "core") -> RateBucket:
+        with self._lock:
+            return self.buckets.setdefault(resource, RateBucket())
+
+    def update(self, headers, resource: Optional[str] = None) -> None:
+        """Feed ``X-RateLimit-*`` response headers into the bucket they belong to"""
+        remaining = headers.get("X-RateLimit-Remaining")
+        if remaining is None:
+            return
+        resource = headers.get("X-RateLimit-Resource") or resource or "core"
+        limit = headers.get("X-RateLimit-Limit")
+        reset = headers.get("X-RateLimit-Reset")
+        with self._lock:
+            self.buckets.setdefault(resource, RateBucket()).update(
+                int(remaining), int(limit) if limit else None, float(reset) if reset else None)
+
+    def update_from_pygithub(self, github) -> None:
+        """Sync the core bucket from a PyGithub client's last seen headers"""
+        try:
+            remaining, limit = github.rate_limiting
+            reset = float(github.rate_limiting_resettime)
+        except (TypeError, ValueError):
+            return
+        if remaining < 0:
+            return
+        with self._lock:
+            self.buckets.setdefault("core", RateBucket()).update(remaining, limit, reset)
+
+    def backoff(self, seconds: float) -> None:
+        """Pause every caller of this token for ``seconds`` (secondary rate limit)"""
+        with self._lock:
+            until = self.now() + seconds
+            self.blocked_until = max(self.blocked_until or 0.0, until)
+        print(f"⏳ Secondary rate limit, pausing GitHub requests for {seconds:.0f}s")
+
+    def _pace(self, max_rps: Optional[float]) -> float:
+        """Delay before the next background request (caller holds the lock)"""
+        if not max_rps:
+            return 0.0
+        now = self.clock()
+        delay = self._next_background - now
+        self._next_background = max(now, self._next_background) + 1.0 / max_rps
+        return delay
+
+    def acquire(self, priority: int = BACKGROUND, resource: str = "core",
+                reserve: Optional[int] = None, max_rps: Optional[float] = None) -> None:
+        """
+        Block until a request of ``priority`` may be sent, and take a token
+
+        ``reserve`` and ``max_rps`` override the scheduler's defaults for
+        this caller only, so callers sharing a token's scheduler can pace
+        themselves differently without changing it for the others.
+        """
+        reserve = self.reserve if reserve is None else reserve
+        max_rps = self.max_background_rps if max_rps is None else max_rps
+        interactive = priority == INTERACTIVE
+        if interactive:
+            with self._lock:
+                self._interactive_waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    delay, cleared = self._delay(interactive, resource, reserve)
+                if delay is None:
+                    break
+                if delay > 0:
+                    self.sleep(delay)
+                if cleared is not None:
+                    cleared()
+        finally:
+            if interactive:
+                with self._lock:
+                    self._interactive_waiting -= 1
+
+        if not interactive:
+            with self._lock:
+                delay = self._pace(max_rps)
+            if delay > 0:
+                self.sleep(delay)
+
+    def _delay(self, interactive: bool, resource: str, reserve: int):
+        """(seconds to wait, callback after waiting), or (None, None) once a token is taken"""
+        now = self.now()
+        blocked = self.blocked_until
+        if blocked is not None and now < blocked:
+            def unblock():
+                with self._lock:
+                    if self.blocked_until == blocked:
+                        self.blocked_until = None
+            return blocked - now, unblock
+
+        if not interactive and self._interactive_waiting:
+            return PRIORITY_POLL, None
+
+        bucket = self.buckets.setdefault(resource, RateBucket())
+        floor = 0 if interactive else reserve
+        if bucket.remaining is None or bucket.remaining > floor:
+            if bucket.remaining is not None:
+                bucket.remaining -= 1
+            return None, None
+
+        reset = bucket.reset
+        pause = max(0.0, (reset or now) - now) + 1
+        print(f"⏳ Rate limit low ({bucket.remaining} {resource} requests left), pausing {pause:.0f}s")
+
+        def refill():
+            with self._lock:
+                if bucket.reset == reset:
+                    bucket.remaining = bucket.limit
+                    bucket.reset = None
+        return pause, refill
+
+
+_schedulers: Dict[Optional[str], RateLimitScheduler] = {}
+_session = None
+_registry_lock = threading.Lock()
+
+
+def scheduler_for(token: Optional[str]) -> RateLimitScheduler:
+    """The process-wide scheduler for a token (anonymous requests share one)"""
+    with _registry_lock:
+        if token not in _schedulers:
+            _schedulers[token] = RateLimitScheduler()
+        return _schedulers[token]
+
+
+def shared_session(pool_size: int = DEFAULT_POOL_SIZE):
+    """The process-wide pooled keep-alive ``requests`` session"""
+    global _session
+    with _registry_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def secondary_limit_delay(response, attempt: int) -> Optional[float]:
+    """Seconds to back off if ``response`` is a secondary rate limit, else None"""
+    status = response.status_code
+    if status not in (403, 429):
+        return None
+    headers = response.headers
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        return float(retry_after)
+    if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset"):
+        return max(0.0, float(headers["X-RateLimit-Reset"]) - time.time()) + 1
+    if status == 429 or "secondary rate limit" in (getattr(response, "text", "") or "").lower():
+        return min(SECONDARY_BACKOFF * 2 ** attempt, MAX_BACKOFF)
+    # A plain 403 (permissions) is not retried
+    return None
+
+
+class GitHubClient:
+    """
+    Scheduled GitHub HTTP access for one token and priority
+
+    ``get``/``post`` have the ``requests`` signature, so a client can be
+    passed wherever a session is expected (HttpCache, GraphQLClient).
+    """
+
+    def __init__(self, token: Optional[str] = None, priority: int = BACKGROUND,
+                 scheduler: Optional[RateLimitScheduler] = None, session=None, retries: int = 3):
+        self.token = token
+        self.priority = priority
+        self.scheduler = scheduler or scheduler_for(token)
+        self.retries = retries
+        self._session = session
+        self._github = None
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = shared_session()
+        return self._session
+
+    def request(self, method: str, url: str, priority: Optional[int] = None, **kwargs):
+        """Send a request once the scheduler allows it, retrying secondary rate limits"""
+        priority = self.priority if priority is None else priority
+        resource = resource_for(url)
+        for attempt in range(self.retries + 1):
+            self.scheduler.acquire(priority, resource)
+            response = self.session.request(method, url, **kwargs)
+            self.scheduler.update(response.headers, resource)
+            delay = secondary_limit_delay(response, attempt)
+            if delay is None or attempt == self.retries:
+                return response
+            self.scheduler.backoff(delay)
+        return response
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def pygithub(self, **kwargs):
+        """
+        A PyGithub client for this token
+
+        PyGithub sends its own requests; call ``wait()`` before each call
+        so they are scheduled too. Its default retry already backs off on
+        secondary rate limits.
+        """
+        from github import Github
+        kwargs.setdefault("seconds_between_requests", None)
+        self._github = Github(self.token, **kwargs)
+        return self._github
+
+    def wait(self, priority: Optional[int] = None) -> None:
+        """Schedule one PyGithub call, using the headers it saw last time"""
+        if self._github is not None:
+            self.scheduler.update_from_pygithub(self._github)
+        self.scheduler.acquire(self.priority if priority is None else priority)
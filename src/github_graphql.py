@@ -0,0 +1,289 @@
+"""
+ForkMonkey GitHub GraphQL
+
+Batch fetching of monkey files across many repos with the GraphQL API.
+
+One query covers up to ``batch_size`` repositories, each under an alias
+(``r0``, ``r1``, ...). For every repo it pulls:
+
+- metadata: owner, parent, fork flag, timestamps
+- ``stats.json``, ``dna.json`` and ``monkey.svg`` through
+  ``object(expression: "HEAD:<path>")``
+- the first page of forks
+
+Repos with more forks than fit on a page are paged with a follow-up
+query per repo. Every response carries ``rateLimit { cost remaining }``,
+and the totals are kept in ``GraphQLCost``.
+
+About 50 repos per query replaces ~200 REST calls (three Contents calls
+plus the metadata and fork listing for each repo).
+"""
+
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+DEFAULT_BATCH_SIZE = 50
+FORKS_PER_PAGE = 100
+
+MONKEY_FILES = {
+    "stats": "monkey_data/stats.json",
+    "dna": "monkey_data/dna.json",
+    "svg": "monkey_data/monkey.svg",
+}
+
+RATE_LIMIT_FIELDS = "rateLimit { cost remaining limit resetAt }"
+
+
+class GraphQLError(RuntimeError):
+    """The GraphQL API rejected a query"""
+
+    def __init__(self, message: str, errors: Optional[list] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class GraphQLCost(BaseModel):
+    """Running query-cost accounting from ``rateLimit`` in each response"""
+    queries: int = 0
+    cost: int = 0
+    remaining: Optional[int] = None
+    limit: Optional[int] = None
+    reset_at: Optional[str] = None
+
+    def record(self, rate_limit: Optional[dict]) -> None:
+        self.queries += 1
+        if not rate_limit:
+            return
+        self.cost += rate_limit.get("cost", 0)
+        self.remaining = rate_limit.get("remaining", self.remaining)
+        self.limit = rate_limit.get("limit", self.limit)
+        self.reset_at = rate_limit.get("resetAt", self.reset_at)
+
+
+class RepoRecord(BaseModel):
+    """Everything the scanner needs about one repo, from a single batch query"""
+    full_name: str
+    owner: str
+    name: str
+    url: str
+    fork: bool = False
+    parent: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    pushed_at: Optional[datetime] = None
+    head_oid: Optional[str] = None
+    files: Dict[str, Optional[str]] = {}
+    file_oids: Dict[str, Optional[str]] = {}
+    forks: List[str] = []
+    forks_total: int = 0
+    forks_cursor: Optional[str] = None
+
+
+def _quote(value: str) -> str:
+    """GraphQL string literal"""
+    return json.dumps(value)
+
+
+def _split(full_name: str) -> Tuple[str, str]:
+    owner, _, name = full_name.partition("/")
+    return owner, name
+
+
+def _fork_connection(after: Optional[str] = None) -> str:
+    cursor = f", after: {_quote(after)}" if after else ""
+    return (
+        f"forks(first: {FORKS_PER_PAGE}{cursor}, orderBy: {{field: CREATED_AT, direction: DESC}}) {{"
+        " totalCount pageInfo { hasNextPage endCursor } nodes { nameWithOwner } }"
+    )
+
+
+def repo_fields(with_forks: bool = True, with_files: bool = True, svg_text: bool = True) -> str:
+    """Selection set for one repository (``svg_text=False``: only the SVG's blob oid)"""
+    def blob(key):
+        return "oid" if key == "svg" and not svg_text else "oid text isBinary"
+
+    files = " ".join(
+        f"{key}: object(expression: {_quote('HEAD:' + path)}) {{ ... on Blob {{ {blob(key)} }} }}"
+        for key, path in MONKEY_FILES.items()
+    ) if with_files else ""
+    forks = _fork_connection() if with_forks else ""
+    return (
+        "nameWithOwner url isFork createdAt updatedAt pushedAt"
+        " owner { login } parent { nameWithOwner }"
+        " defaultBranchRef { target { oid } }"
+        f" {files} {forks}"
+    )
+
+
+def build_batch_query(repos: List[str], with_forks: bool = True, with_files: bool = True,
+                      svg_text: bool = True) -> Tuple[str, Dict[str, str]]:
+    """
+    One query for many repos, each under an alias
+
+    Without files the query is metadata only (pushedAt, HEAD oid, forks),
+    which is what an incremental scan checks first. Returns the query and
+    an alias → full_name map.
+    """
+    aliases = {}
+    parts = []
+    fields = repo_fields(with_forks, with_files, svg_text)
+    for i, full_name in enumerate(repos):
+        alias = f"r{i}"
+        owner, name = _split(full_name)
+        aliases[alias] = full_name
+        parts.append(f"{alias}: repository(owner: {_quote(owner)}, name: {_quote(name)}) {{ {fields} }}")
+    return "query { " + " ".join(parts) + f" {RATE_LIMIT_FIELDS} }}", aliases
+
+
+def build_forks_query(full_name: str, after: str) -> str:
+    """The next page of one repo's forks"""
+    owner, name = _split(full_name)
+    return (
+        f"query {{ repository(owner: {_quote(owner)}, name: {_quote(name)}) {{ {_fork_connection(after)} }}"
+        f" {RATE_LIMIT_FIELDS} }}"
+    )
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def parse_repo(node: dict) -> RepoRecord:
+    """RepoRecord from a ``repository`` selection"""
+    files, oids = {}, {}
+    for key in MONKEY_FILES:
+        blob = node.get(key) or {}
+        files[key] = None if blob.get("isBinary") else blob.get("text")
+        oids[key] = blob.get("oid")
+
+    forks = node.get("forks") or {}
+    page = forks.get("pageInfo") or {}
+    owner, name = _split(node["nameWithOwner"])
+    head = ((node.get("defaultBranchRef") or {}).get("target") or {}).get("oid")
+
+    return RepoRecord(
+        full_name=node["nameWithOwner"],
+        owner=(node.get("owner") or {}).get("login", owner),
+        name=name,
+        url=node.get("url") or f"https://github.com/{node['nameWithOwner']}",
+        fork=node.get("isFork", False),
+        parent=(node.get("parent") or {}).get("nameWithOwner"),
+        created_at=_timestamp(node.get("createdAt")),
+        updated_at=_timestamp(node.get("updatedAt")),
+        pushed_at=_timestamp(node.get("pushedAt")),
+        head_oid=head,
+        files=files,
+        file_oids=oids,
+        forks=[fork["nameWithOwner"] for fork in forks.get("nodes") or []],
+        forks_total=forks.get("totalCount", 0),
+        forks_cursor=page.get("endCursor") if page.get("hasNextPage") else None,
+    )
+
+
+class GraphQLClient:
+    """Minimal GitHub GraphQL client with batching and cost accounting"""
+
+    def __init__(self, token: str, session=None, url: str = GRAPHQL_URL, timeout: float = 30,
+                 batch_size: int = DEFAULT_BATCH_SIZE, retries: int = 3):
+        if not token:
+            raise ValueError("The GitHub GraphQL API requires a token")
+        self.token = token
+        self.url = url
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.retries = retries
+        self.cost = GraphQLCost()
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            from src.github_client import GitHubClient
+            self._session = GitHubClient(self.token)
+        return self._session
+
+    def execute(self, query: str, variables: Optional[dict] = None) -> dict:
+        """
+        Run a query and return its ``data``
+
+        Partial errors (e.g. NOT_FOUND for a deleted fork) leave that
+        alias null and are not raised; a response without data is.
+        Rate limits are left to the session: GitHubClient waits on the
+        token's scheduler and retries secondary limits, so a 403/429 that
+        reaches here is final. Only transient 5xx responses are retried.
+        """
+        headers = {"Authorization": f"bearer {self.token}"}
+        payload = {"query": query, "variables": variables or {}}
+
+        for attempt in range(self.retries + 1):
+            response = self.session.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+            if response.status_code >= 500 and attempt < self.retries:
+                time.sleep(2 ** attempt)
+                continue
+            break
+
+        if response.status_code != 200:
+            raise GraphQLError(f"GraphQL request failed with HTTP {response.status_code}")
+
+        body = response.json()
+        data = body.get("data")
+        errors = body.get("errors") or []
+        if data is None:
+            message = "; ".join(e.get("message", "") for e in errors) or "no data"
+            raise GraphQLError(f"GraphQL query failed: {message}", errors)
+
+        self.cost.record(data.get("rateLimit"))
+        return data
+
+    def fetch_repos(self, repos: Iterable[str], with_forks: bool = True,
+                    with_files: bool = True, svg_text: bool = True,
+                    all_forks: bool = True) -> Dict[str, RepoRecord]:
+        """
+        RepoRecords for many repos, ``batch_size`` per query
+
+        Missing or inaccessible repos are left out. Forks beyond the first
+        page are fetched too, so ``forks`` is complete, unless
+        ``all_forks=False``: then only the first page is fetched and
+        ``forks_cursor`` points at the next one.
+        """
+        repos = list(dict.fromkeys(repos))
+        records = {}
+        for start in range(0, len(repos), self.batch_size):
+            query, aliases = build_batch_query(repos[start:start + self.batch_size], with_forks, with_files,
+                                               svg_text)
+            data = self.execute(query)
+            for alias, full_name in aliases.items():
+                node = data.get(alias)
+                if node:
+                    records[full_name] = parse_repo(node)
+
+        if with_forks and all_forks:
+            for record in records.values():
+                if record.forks_cursor:
+                    record.forks += self.fetch_forks(record.full_name, record.forks_cursor)
+                    record.forks_cursor = None
+        return records
+
+    def fetch_forks(self, full_name: str, after: str) -> List[str]:
+        """Remaining fork names of one repo, starting after a cursor"""
+        forks = []
+        while after:
+            page, after = self.fetch_forks_page(full_name, after)
+            forks += page
+        return forks
+
+    def fetch_forks_page(self, full_name: str, after: str) -> Tuple[List[str], Optional[str]]:
+        """One page of a repo's forks after a cursor, and the cursor of the next page (None on the last)"""
+        data = self.execute(build_forks_query(full_name, after))
+        connection = (data.get("repository") or {}).get("forks") or {}
+        page = connection.get("pageInfo") or {}
+        forks = [fork["nameWithOwner"] for fork in connection.get("nodes") or []]
+        return forks, page.get("endCursor") if page.get("hasNextPage") else None
@@ -0,0 +1,578 @@
+"""
+ForkMonkey History Log
+
+Append-only JSONL storage for evolution history.
+
+Each line of ``history.jsonl`` holds one history entry, so recording an
+evolution is a single O(1) append instead of a full rewrite of
+``history.json``. The legacy ``{"entries": [...]}`` document can still be
+produced on demand for the web timeline.
+
+Logs can optionally be delta-encoded: a full keyframe every K entries and
+only the changed fields/traits in between. Daily evolution touches 0-2
+traits, so this shrinks long histories several-fold; readers reconstruct
+entries from the nearest keyframe.
+"""
+
+import os
+import json
+from pathlib import Path
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+try:
+    from src.fileio import atomic_write_json, atomic_write_text, file_lock
+except ImportError:  # Run as a standalone script: python src/history_log.py
+    from fileio import atomic_write_json, atomic_write_text, file_lock
+
+
+# Delta encoding: a full keyframe every K entries, only changes in between.
+# Records are one of
+#   {...entry...}                      plain entry (legacy logs, also a keyframe)
+#   {"_k": {...entry...}}              keyframe
+#   {"_d": {fields}, "_t": {traits},   delta against the previous entry;
+#    "_tx": [traits], "_x": [fields]}  _tx/_x list removed trait/field keys
+KEYFRAME_KEY = "_k"
+DELTA_KEY = "_d"
+DEFAULT_KEYFRAME_INTERVAL = 32
+
+_DELTA_PREFIX = b'{"' + DELTA_KEY.encode() + b'"'
+_ENCODED_PREFIXES = (_DELTA_PREFIX, b'{"' + KEYFRAME_KEY.encode() + b'"')
+_MISSING = object()
+
+
+def is_keyframe_line(line: bytes) -> bool:
+    """True unless the raw line is a delta record (checked without parsing)"""
+    return not line.lstrip().startswith(_DELTA_PREFIX)
+
+
+def encode_delta(prev: dict, entry: dict) -> dict:
+    """Encode ``entry`` as the changes from ``prev``"""
+    prev_traits = prev.get("traits")
+    traits = entry.get("traits")
+    diff_traits = isinstance(prev_traits, dict) and isinstance(traits, dict)
+
+    record = {DELTA_KEY: {
+        k: v for k, v in entry.items()
+        if not (k == "traits" and diff_traits) and prev.get(k, _MISSING) != v
+    }}
+
+    if diff_traits:
+        changed = {k: v for k, v in traits.items() if prev_traits.get(k, _MISSING) != v}
+        dropped = [k for k in prev_traits if k not in traits]
+        if changed:
+            record["_t"] = changed
+        if dropped:
+            record["_tx"] = dropped
+
+    removed = [k for k in prev if k not in entry]
+    if removed:
+        record["_x"] = removed
+
+    return record
+
+
+def decode_record(prev: Optional[dict], record: dict) -> Optional[dict]:
+    """
+    Turn a stored record back into a full entry
+
+    Returns None for a delta with no base (e.g. its keyframe was torn).
+    """
+    if KEYFRAME_KEY in record:
+        return record[KEYFRAME_KEY]
+    if DELTA_KEY not in record:
+        return record
+    if prev is None:
+        return None
+
+    entry = dict(prev)
+    entry.update(record[DELTA_KEY])
+
+    if "_t" in record or "_tx" in record:
+        traits = dict(prev.get("traits") or {})
+        traits.update(record.get("_t", {}))
+        for key in record.get("_tx", []):
+            traits.pop(key, None)
+        entry["traits"] = traits
+
+    for key in record.get("_x", []):
+        entry.pop(key, None)
+
+    return entry
+
+
+def reconstruct(records: List[dict], index: int) -> Optional[dict]:
+    """
+    Random access into a list of stored records
+
+    Finds the nearest keyframe at or before ``index`` and replays the
+    deltas after it, so at most K records are decoded.
+    """
+    start = index
+    while start > 0 and DELTA_KEY in records[start]:
+        start -= 1
+
+    entry = None
+    for record in records[start:index + 1]:
+        entry = decode_record(entry, record)
+    return entry
+
+
+class HistoryLog:
+    """
+    Append-only JSONL history log (one entry per line)
+
+    With ``keyframe_interval`` set, new entries are delta-encoded with a
+    full keyframe every K entries. When it is None, a log that is already
+    encoded stays encoded (at the default interval) and a plain log stays
+    plain; pass 0 to force plain entries. Readers decode transparently.
+    """
+
+    BLOCK_SIZE = 8192
+
+    def __init__(self, path: Path, keyframe_interval: Optional[int] = None):
+        self.path = Path(path)
+        self.keyframe_interval = keyframe_interval
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def append(self, entry: dict) -> None:
+        """Append a single entry to the end of the log (locked and fsynced)"""
+        self.append_many([entry])
+
+    def append_many(self, entries: List[dict]) -> None:
+        """Append several entries with a single write and fsync"""
+        if not entries:
+            return
+
+        with file_lock(self.path.parent):
+            records = self._encode(entries)
+            data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+
+            with open(self.path, "ab") as f:
+                # Cut off a torn line left by an interrupted writer, so every
+                # newline-terminated line stays a complete record
+                end = self._complete_length()
+                if end < f.tell():
+                    f.truncate(end)
+                    f.seek(end)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _complete_length(self) -> int:
+        """Length of the log up to and including its last newline"""
+        if not self.path.exists():
+            return 0
+        with open(self.path, "rb") as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - self.BLOCK_SIZE)
+                f.seek(start)
+                block = f.read(position - start)
+                newline = block.rfind(b"\n")
+                if newline != -1:
+                    return start + newline + 1
+                position = start
+        return 0
+
+    def _encode(self, entries: List[dict]) -> List[dict]:
+        """Records to append for ``entries``, given what is already in the log"""
+        interval = self.keyframe_interval
+        if interval == 0:
+            return list(entries)
+
+        lines = self._read_tail_lines(1)
+        if interval is None:
+            if not any(line.lstrip().startswith(_ENCODED_PREFIXES) for line in lines):
+                return list(entries)
+            interval = DEFAULT_KEYFRAME_INTERVAL
+
+        decoded = self._parse_lines(lines)
+        prev = decoded[-1] if decoded else None
+        since_keyframe = 0
+        for line in reversed(lines):
+            if is_keyframe_line(line):
+                break
+            since_keyframe += 1
+
+        records = []
+        for entry in entries:
+            if prev is None or since_keyframe + 1 >= interval:
+                records.append({KEYFRAME_KEY: entry})
+                since_keyframe = 0
+            else:
+                records.append(encode_delta(prev, entry))
+                since_keyframe += 1
+            prev = entry
+        return records
+
+    def read_all(self) -> List[dict]:
+        """Read every entry in the log, oldest first"""
+        if not self.path.exists():
+            return []
+
+        with open(self.path, "rb") as f:
+            return self._parse_lines(f.read().split(b"\n"))
+
+    def iter(self) -> Iterator[dict]:
+        """Stream entries one line at a time, oldest first"""
+        if not self.path.exists():
+            return
+
+        with open(self.path, "rb") as f:
+            yield from self._decode_lines(f)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter()
+
+    def range(self, start: int, end: Optional[int] = None) -> List[dict]:
+        """Entries with index start <= i < end, streamed from the start of the log"""
+        start = max(start, 0)
+        if end is not None and end <= start:
+            return []
+
+        entries = []
+        for i, entry in enumerate(self.iter()):
+            if end is not None and i >= end:
+                break
+            if i >= start:
+                entries.append(entry)
+        return entries
+
+    def get(self, index: int) -> dict:
+        """
+        Random access to a single entry
+
+        Scans raw lines without parsing them and only decodes from the
+        nearest keyframe, so at most K records are parsed.
+        """
+        if index < 0:
+            entries = self.tail(-index)
+            if len(entries) < -index:
+                raise IndexError(index)
+            return entries[0]
+
+        if self.path.exists():
+            window: List[bytes] = []
+            with open(self.path, "rb") as f:
+                i = -1
+                for line in f:
+                    if not line.strip():
+                        continue
+                    i += 1
+                    if is_keyframe_line(line):
+                        window = []
+                    window.append(line)
+                    if i == index:
+                        entries = self._parse_lines(window)
+                        if entries:
+                            return entries[-1]
+                        break
+        raise IndexError(index)
+
+    def head(self, n: int) -> List[dict]:
+        """Read the first ``n`` entries"""
+        if n <= 0 or not self.path.exists():
+            return []
+
+        lines = []
+        with open(self.path, "rb") as f:
+            for line in f:
+                lines.append(line)
+                if len(lines) >= n:
+                    break
+        return self._parse_lines(lines)
+
+    def count(self) -> int:
+        """
+        Number of entries, counted without parsing any JSON
+
+        Trusts the log: every newline-terminated line is one entry. A torn
+        trailing write has no newline, so it is not counted, and the next
+        append cuts it off rather than terminating it.
+        """
+        if not self.path.exists():
+            return 0
+
+        count = 0
+        with open(self.path, "rb") as f:
+            while True:
+                block = f.read(1024 * 1024)
+                if not block:
+                    break
+                count += block.count(b"\n")
+        return count
+
+    def tail(self, n: int) -> List[dict]:
+        """
+        Read the last ``n`` entries, oldest first
+
+        Seeks backwards from the end of the file in fixed-size blocks, so
+        the cost depends on ``n`` (plus at most one keyframe interval)
+        rather than on the size of the log.
+        """
+        if n <= 0:
+            return []
+        return self._parse_lines(self._read_tail_lines(n))[-n:]
+
+    def _read_tail_lines(self, n: int) -> List[bytes]:
+        """
+        Raw complete lines covering the last ``n`` entries
+
+        Keeps reading backwards until the first returned line is a
+        keyframe (or the start of the file), so deltas can be decoded.
+        """
+        if n <= 0 or not self.path.exists():
+            return []
+
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+
+            while position > 0:
+                # Need n complete lines, i.e. n + 1 newlines unless we hit the start
+                if buffer.count(b"\n") > n:
+                    lines = [line for line in buffer.split(b"\n")[1:] if line.strip()]
+                    if any(is_keyframe_line(line) for line in lines[:max(len(lines) - n + 1, 0)]):
+                        break
+
+                read_size = min(self.BLOCK_SIZE, position)
+                position -= read_size
+                f.seek(position)
+                buffer = f.read(read_size) + buffer
+
+        lines = [line for line in buffer.split(b"\n")[1 if position > 0 else 0:] if line.strip()]
+
+        # Start at the last keyframe that still leaves n entries after it
+        if position > 0:
+            cut = max(len(lines) - n, 0)
+            while cut > 0 and not is_keyframe_line(lines[cut]):
+                cut -= 1
+            lines = lines[cut:]
+
+        return lines
+
+    def is_encoded(self) -> bool:
+        """True if the log starts with a keyframe record (i.e. is delta-encoded)"""
+        if not self.path.exists():
+            return False
+        with open(self.path, "rb") as f:
+            return f.readline().lstrip().startswith(_ENCODED_PREFIXES)
+
+    def rewrite(self, entries: List[dict], keyframe_interval: Optional[int] = None) -> None:
+        """
+        Atomically replace the whole log with ``entries``
+
+        Keeps the current encoding unless ``keyframe_interval`` is given
+        (0 = plain entries).
+        """
+        with file_lock(self.path.parent):
+            if keyframe_interval is None:
+                keyframe_interval = self.keyframe_interval
+            if keyframe_interval is None:
+                keyframe_interval = DEFAULT_KEYFRAME_INTERVAL if self.is_encoded() else 0
+
+            records = []
+            prev = None
+            for i, entry in enumerate(entries):
+                if not keyframe_interval:
+                    records.append(entry)
+                elif prev is None or i % keyframe_interval == 0:
+                    records.append({KEYFRAME_KEY: entry})
+                else:
+                    records.append(encode_delta(prev, entry))
+                prev = entry
+
+            atomic_write_text(self.path, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records))
+
+    @classmethod
+    def _parse_lines(cls, lines: Iterable[bytes]) -> List[dict]:
+        return list(cls._decode_lines(lines))
+
+    @staticmethod
+    def _decode_lines(lines: Iterable[bytes]) -> Iterator[dict]:
+        prev = None
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A torn trailing write from an interrupted run; skip it
+                continue
+            entry = decode_record(prev, record)
+            if entry is None:
+                continue
+            prev = entry
+            yield entry
+
+
+def encode_history_log(path: Path, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL) -> dict:
+    """
+    Rewrite an existing log with the given keyframe interval
+
+    ``keyframe_interval=0`` decodes back to plain entries. The rewrite is
+    atomic and locked. Returns entry count and size before/after in bytes.
+    """
+    log = HistoryLog(path)
+    with file_lock(log.path.parent):
+        before = log.path.stat().st_size if log.exists() else 0
+        entries = log.read_all()
+        log.rewrite(entries, keyframe_interval)
+
+    return {"entries": len(entries), "bytes_before": before, "bytes_after": log.path.stat().st_size}
+
+
+def migrate_history_json(json_path: Path, log_path: Path, remove_legacy: bool = True) -> int:
+    """
+    One-time conversion of a legacy ``history.json`` into ``history.jsonl``
+
+    Returns the number of migrated entries. Does nothing if the log
+    already exists.
+    """
+    json_path = Path(json_path)
+    log = HistoryLog(log_path)
+
+    if log.exists() or not json_path.exists():
+        return 0
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        entries = json.load(f).get("entries", [])
+
+    with file_lock(log.path.parent):
+        if log.exists():
+            return 0
+
+        atomic_write_text(log.path, "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in entries))
+
+        if remove_legacy:
+            json_path.unlink()
+
+    return len(entries)
+
+
+def export_history_json(log_path: Path, json_path: Path) -> int:
+    """
+    Write the log out as a legacy ``{"entries": [...]}`` document
+
+    This is the compatibility format consumed by the web timeline.
+    Returns the number of exported entries.
+    """
+    entries = HistoryLog(log_path).read_all()
+
+    atomic_write_json(json_path, {"entries": entries})
+
+    return len(entries)
+
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def export_history_pages(entries: Iterable[dict], output_dir: Path, page_size: int = DEFAULT_PAGE_SIZE) -> dict:
+    """
+    Split history into fixed-size page files plus a small manifest
+
+    Writes ``page-0000.json``, ``page-0001.json``, ... (oldest first) and
+    ``manifest.json`` into ``output_dir``. Entries are consumed as a
+    stream, so only one page is held in memory at a time. Because pages
+    are fixed-size and history is append-only, every page except the last
+    is immutable and caches well. Returns the manifest.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    pages = []
+    buffer: List[dict] = []
+
+    def flush():
+        name = f"page-{len(pages):04d}.json"
+        atomic_write_json(output_dir / name, {"page": len(pages), "entries": buffer}, indent=None)
+        pages.append({
+            "file": name,
+            "count": len(buffer),
+            "first_timestamp": buffer[0].get("timestamp"),
+            "last_timestamp": buffer[-1].get("timestamp"),
+        })
+
+    for entry in entries:
+        buffer.append(entry)
+        if len(buffer) >= page_size:
+            flush()
+            buffer = []
+    if buffer:
+        flush()
+
+    # Drop pages left over from a previous, longer export
+    for stale in output_dir.glob("page-*.json"):
+        if stale.name not in {p["file"] for p in pages}:
+            stale.unlink()
+
+    manifest = {
+        "total": sum(p["count"] for p in pages),
+        "page_size": page_size,
+        "pages": pages,
+        "last_updated": datetime.now().isoformat(),
+    }
+    atomic_write_json(output_dir / "manifest.json", manifest)
+    return manifest
+
+
+def main(argv: Optional[List[str]] = None):
+    """Standalone entry point (stdlib only, usable before deps are installed)"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ForkMonkey history log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    migrate = sub.add_parser("migrate", help="Convert history.json into history.jsonl")
+    migrate.add_argument("--data-dir", default="monkey_data")
+    migrate.add_argument("--keep-legacy", action="store_true", help="Keep history.json after migrating")
+
+    export = sub.add_parser("export", help="Export history.jsonl as history.json")
+    export.add_argument("--data-dir", default="monkey_data")
+    export.add_argument("--output", default=None, help="Output path (default: <data-dir>/history.json)")
+
+    encode = sub.add_parser("encode", help="Rewrite history.jsonl with keyframe + delta encoding")
+    encode.add_argument("--data-dir", default="monkey_data")
+    encode.add_argument("--keyframe-interval", type=int, default=DEFAULT_KEYFRAME_INTERVAL,
+                        help="Full entry every K entries (0 = plain entries)")
+
+    pages = sub.add_parser("pages", help="Export history.jsonl as paged files with a manifest")
+    pages.add_argument("--data-dir", default="monkey_data")
+    pages.add_argument("--output", default=None, help="Output directory (default: <data-dir>/history)")
+    pages.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+
+    args = parser.parse_args(argv)
+    data_dir = Path(args.data_dir)
+    log_path = data_dir / "history.jsonl"
+
+    if args.command == "migrate":
+        count = migrate_history_json(data_dir / "history.json", log_path, remove_legacy=not args.keep_legacy)
+        print(f"✅ Migrated {count} history entries to {log_path}")
+    elif args.command == "export":
+        output = Path(args.output) if args.output else data_dir / "history.json"
+        if not log_path.exists():
+            print(f"ℹ️  No {log_path} found, nothing to export")
+            return
+        count = export_history_json(log_path, output)
+        print(f"✅ Exported {count} history entries to {output}")
+    elif args.command == "encode":
+        if not log_path.exists():
+            print(f"ℹ️  No {log_path} found, nothing to encode")
+            return
+        result = encode_history_log(log_path, args.keyframe_interval)
+        print(f"✅ Re-encoded {result['entries']} history entries: "
+              f"{result['bytes_before']:,} → {result['bytes_after']:,} bytes")
+    elif args.command == "pages":
+        output = Path(args.output) if args.output else data_dir / "history"
+        manifest = export_history_pages(HistoryLog(log_path).iter(), output, args.page_size)
+        print(f"✅ Exported {manifest['total']} history entries in {len(manifest['pages'])} pages to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+ForkMonkey HTTP Cache
+
+On-disk cache for GitHub API GETs, revalidated with ETags.
+
+Every cached response keeps its ``ETag`` / ``Last-Modified`` validators.
+The next request for the same URL sends ``If-None-Match`` /
+``If-Modified-Since``. A ``304 Not Modified`` answer reuses the stored
+body, and GitHub does not count 304s against the rate limit, so a parent
+monkey with hundreds of children initializing the same day costs a single
+real fetch.
+
+If the network fails, a stale cached body is served rather than nothing.
+
+Entries are keyed by the URL plus the request's ``Accept`` header and a
+hash of its ``Authorization`` header, so a private response fetched with
+one token is never served to a request made with another, or anonymously.
+
+The cache directory defaults to ``~/.cache/forkmonkey/http``. Override it
+with FORKMONKEY_CACHE_DIR (e.g. a directory restored by actions/cache).
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import quote
+
+from pydantic import BaseModel
+
+from src.fileio import atomic_write_bytes, atomic_write_json
+
+
+GITHUB_API = "https://api.github.com"
+
+# Request headers that change the response for the same URL
+VARY_HEADERS = ("Accept", "Authorization")
+
+
+def default_cache_dir() -> Path:
+    root = os.getenv("FORKMONKEY_CACHE_DIR")
+    if root:
+        return Path(root) / "http"
+    return Path.home() / ".cache" / "forkmonkey" / "http"
+
+
+class CachedResponse(BaseModel):
+    """Result of a cached GET"""
+    status: int
+    body: bytes = b""
+    etag: Optional[str] = None
+    from_cache: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class HttpCache:
+    """ETag-revalidating on-disk cache for GET requests"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, session=None, timeout: float = 10):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.timeout = timeout
+        self._session = session
+
+    @property
+    def session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    @staticmethod
+    def cache_key(url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """Cache key for a GET of ``url`` with ``headers`` (credentials only as a hash)"""
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        parts = [url]
+        for name in VARY_HEADERS:
+            value = headers.get(name.lower())
+            if name == "Authorization" and value:
+                value = hashlib.sha256(value.encode("utf-8")).hexdigest()
+            parts.append(f"{name}: {value or ''}")
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        return self.cache_dir / f"{key}.json", self.cache_dir / f"{key}.body"
+
+    def _load(self, key: str) -> Optional[dict]:
+        meta_path, body_path = self._paths(key)
+        if not (meta_path.exists() and body_path.exists()):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        meta["body"] = body_path.read_bytes()
+        return meta
+
+    def _store(self, key: str, url: str, response) -> None:
+        meta_path, body_path = self._paths(key)
+        # Body first: metadata only ever points at a complete body
+        atomic_write_bytes(body_path, response.content)
+        atomic_write_json(meta_path, {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": datetime.now().isoformat(),
+        })
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> CachedResponse:
+        """
+        GET ``url``, revalidating any cached copy
+
+        Only successful responses carrying a validator are cached, keyed by
+        the URL, the Accept header and the credential (see ``cache_key``).
+        """
+        key = self.cache_key(url, headers)
+        cached = self._load(key)
+        request_headers = dict(headers or {})
+        if cached:
+            if cached.get("etag"):
+                request_headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                request_headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+        except Exception as e:
+            if cached:
+                print(f"⚠️  Network error, using cached copy of {url}: {e}")
+                return CachedResponse(status=200, body=cached["body"], etag=cached.get("etag"), from_cache=True)
+            raise
+
+        if response.status_code == 304 and cached:
+            return CachedResponse(status=200, body=cached["body"], etag=cached.get("etag"), from_cache=True)
+
+        if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            self._store(key, url, response)
+
+        return CachedResponse(
+            status=response.status_code,
+            body=response.content,
+            etag=response.headers.get("ETag"),
+        )
+
+    def clear(self) -> int:
+        """Delete every cached response, returns the number removed"""
+        removed = 0
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*.json"):
+                path.unlink()
+                path.with_suffix(".body").unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+def github_headers(token: Optional[str] = None, raw: bool = False) -> Dict[str, str]:
+    """Standard GitHub REST headers (raw=True returns file contents as-is)"""
+    headers = {
+        "Accept": "application/vnd.github.raw+json" if raw else "application/vnd.github+json",
+        "X-GitHub-Api-Version": "2022-11-28",
+    }
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def fetch_repo_file(repo: str, path: str, token: Optional[str] = None, ref: Optional[str] = None,
+                    cache: Optional[HttpCache] = None) -> Optional[bytes]:
+    """
+    Raw contents of ``path`` in ``repo`` (owner/name) via the Contents API
+
+    Returns None if the file does not exist.
+    """
+    cache = cache or HttpCache()
+    url = f"{GITHUB_API}/repos/{repo}/contents/{quote(path)}"
+    if ref:
+        url += f"?ref={quote(ref)}"
+
+    response = cache.get(url, headers=github_headers(token, raw=True))
+    if response.status == 404:
+        return None
+    if not response.ok:
+        raise RuntimeError(f"GitHub returned {response.status} for {repo}/{path}")
+    return response.body
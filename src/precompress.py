@@ -0,0 +1,117 @@
+"""
+ForkMonkey Precompress
+
+gzip and brotli copies of the static web files, made once at build time
+instead of on every request.
+
+For every ``.json`` and ``.svg`` file under a directory, writes
+``<file>.gz`` (gzip -9) and ``<file>.br`` (brotli quality 11, when the
+optional ``brotli`` package is installed). Siblings get their source's
+mtime. A sibling whose mtime still matches is left alone, so repeat runs
+only compress what changed. Siblings of deleted files are removed, and
+files that do not get smaller get no sibling.
+
+web/serve.py answers with a sibling and ``Content-Encoding`` when the
+request's Accept-Encoding allows it. Static hosts and CDNs that serve
+precompressed files (nginx ``gzip_static``/``brotli_static``, most CDNs)
+do the same.
+
+Usage:
+    python src/precompress.py web
+"""
+
+import os
+import sys
+import gzip
+import argparse
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+
+SUFFIXES = (".json", ".svg")
+# (Content-Encoding, file suffix), most preferred first
+SIBLINGS: List[Tuple[str, str]] = [("br", ".br"), ("gzip", ".gz")]
+
+
+def _gzip(data: bytes) -> bytes:
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def compressors(use_brotli: bool = True) -> Dict[str, Callable[[bytes], bytes]]:
+    """File suffix → compress function for the encodings available here"""
+    available = {".gz": _gzip}
+    if use_brotli and HAS_BROTLI:
+        available[".br"] = _brotli
+    return available
+
+
+def sibling_path(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+def precompress_file(path: Union[str, Path], use_brotli: bool = True) -> int:
+    """Write the missing or outdated siblings of one file, returns how many were written"""
+    path = Path(path)
+    source_mtime = path.stat().st_mtime_ns
+    data = None
+    written = 0
+    for suffix, compress in compressors(use_brotli).items():
+        sibling = sibling_path(path, suffix)
+        if sibling.exists() and sibling.stat().st_mtime_ns == source_mtime:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        packed = compress(data)
+        if len(packed) >= len(data):
+            sibling.unlink(missing_ok=True)
+            continue
+        sibling.write_bytes(packed)
+        os.utime(sibling, ns=(source_mtime, source_mtime))
+        written += 1
+    return written
+
+
+def precompress_dir(root: Union[str, Path], suffixes: Iterable[str] = SUFFIXES,
+                    use_brotli: bool = True) -> Tuple[int, int]:
+    """Precompress every matching file under ``root``; returns (siblings written, stale siblings removed)"""
+    root = Path(root)
+    suffixes = tuple(suffixes)
+    sibling_suffixes = tuple(suffix for _, suffix in SIBLINGS)
+    written = removed = 0
+    for path in root.rglob("*"):
+        if not path.is_file():
+            continue
+        if path.suffix in sibling_suffixes:
+            source = path.with_suffix("")
+            if source.suffix in suffixes and not source.exists():
+                path.unlink()
+                removed += 1
+        elif path.suffix in suffixes:
+            written += precompress_file(path, use_brotli)
+    return written, removed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Write .gz/.br siblings for static JSON and SVG files")
+    parser.add_argument("root", nargs="?", default="web", help="Directory to precompress (default: web)")
+    parser.add_argument("--no-brotli", action="store_true", help="Only write .gz siblings")
+    args = parser.parse_args(argv)
+
+    if not args.no_brotli and not HAS_BROTLI:
+        print("⚠️  brotli not installed, writing .gz siblings only (pip install brotli)")
+    written, removed = precompress_dir(args.root, use_brotli=not args.no_brotli)
+    print(f"🗜️  Wrote {written} compressed siblings under {args.root} ({removed} stale removed)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,144 @@
+"""
+ForkMonkey Render Cache
+
+Monkey SVGs rebuilt locally from DNA, for the community scan.
+
+``MonkeyVisualizer.generate_svg`` is deterministic, so a fork's
+``monkey.svg`` can be rendered from the ``dna.json`` the scanner already
+fetches instead of being downloaded (~6 KB per fork). A fork's SVG is
+only trusted if the git blob sha of the local render matches the sha
+GitHub reports for its ``monkey.svg``. Hand-edited SVGs, and SVGs drawn
+by an older visualizer, do not match and are still fetched.
+
+Renders are cached by dna_hash (plus generation, which the Gen badge
+shows) in memory and on disk under FORKMONKEY_CACHE_DIR/render, or
+``~/.cache/forkmonkey/render``. The on-disk cache is namespaced by a hash
+of the visualizer source, so changing the art invalidates it.
+
+A render takes well under a millisecond, so batches are rendered inline.
+Only batches of ``PARALLEL_MIN`` or more uncached DNAs go to a process
+pool.
+"""
+
+import os
+import sys
+import hashlib
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Add parent directory to path for imports when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src import visualizer
+from src.fileio import atomic_write_text
+from src.genetics import GeneticsEngine
+from src.visualizer import MonkeyVisualizer
+
+
+PARALLEL_MIN = 2000
+
+
+def default_cache_dir() -> Path:
+    root = os.getenv("FORKMONKEY_CACHE_DIR")
+    if root:
+        return Path(root) / "render"
+    return Path.home() / ".cache" / "forkmonkey" / "render"
+
+
+def git_blob_sha(content) -> str:
+    """The sha git (and GitHub's Contents / GraphQL APIs) report for a file"""
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+
+
+def renderer_version() -> str:
+    """Short hash of the visualizer source; renders from another version may differ"""
+    return hashlib.sha1(inspect.getsource(visualizer).encode("utf-8")).hexdigest()[:12]
+
+
+def render_key(dna: dict) -> Optional[str]:
+    """Cache key for a DNA dict, or None if it has no hash"""
+    if not dna.get("dna_hash"):
+        return None
+    return f"{dna['dna_hash']}-g{dna.get('generation', 1)}"
+
+
+def render_dna(dna: dict) -> Optional[str]:
+    """SVG for a DNA dict, or None if the DNA cannot be parsed"""
+    try:
+        return MonkeyVisualizer.generate_svg(GeneticsEngine.dict_to_dna(dna))
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+class RenderCache:
+    """dna_hash → rendered SVG, in memory and (optionally) on disk"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, persist: bool = True):
+        self.cache_dir = (Path(cache_dir) if cache_dir else default_cache_dir()) / renderer_version()
+        self.persist = persist
+        self._memory: Dict[str, str] = {}
+        self.hits = 0
+        self.renders = 0
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.svg"
+
+    def _lookup(self, key: Optional[str]) -> Optional[str]:
+        if key is None:
+            return None
+        if key in self._memory:
+            return self._memory[key]
+        if self.persist:
+            path = self._path(key)
+            if path.exists():
+                self._memory[key] = path.read_text(encoding="utf-8")
+                return self._memory[key]
+        return None
+
+    def _remember(self, key: Optional[str], svg: Optional[str]) -> None:
+        if key is None or svg is None:
+            return
+        self._memory[key] = svg
+        if self.persist:
+            atomic_write_text(self._path(key), svg)
+
+    def render(self, dna: Optional[dict]) -> Optional[str]:
+        """SVG for one DNA dict (None if there is no usable DNA)"""
+        return self.render_many([dna])[0]
+
+    def render_many(self, dnas: List[Optional[dict]], workers: Optional[int] = None) -> List[Optional[str]]:
+        """SVGs for many DNA dicts, in order; identical DNAs render once"""
+        results: List[Optional[str]] = [None] * len(dnas)
+        todo: Dict[str, dict] = {}
+        for i, dna in enumerate(dnas):
+            if not dna:
+                continue
+            key = render_key(dna)
+            cached = self._lookup(key)
+            if cached is not None:
+                self.hits += 1
+                results[i] = cached
+            elif key is not None:
+                todo.setdefault(key, dna)
+            else:
+                results[i] = render_dna(dna)
+
+        if todo:
+            keys = list(todo)
+            if len(keys) >= PARALLEL_MIN:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    svgs = list(pool.map(render_dna, [todo[k] for k in keys], chunksize=64))
+            else:
+                svgs = [render_dna(todo[k]) for k in keys]
+            self.renders += len(keys)
+            for key, svg in zip(keys, svgs):
+                self._remember(key, svg)
+            for i, dna in enumerate(dnas):
+                if results[i] is None and dna:
+                    results[i] = self._memory.get(render_key(dna))
+
+        return results
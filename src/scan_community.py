@@ -4,30 +4,172 @@ ForkMonkey Community Scanner
 
 Scans all forks of the repository to aggregate monkey data.
 Generates multiple static JSON files for the web app:
-- web/community_data.json - All forks with SVGs and stats
+- web/community_data.json - All forks with stats
 - web/leaderboard.json - Rarity rankings
 - web/family_tree.json - Fork genealogy
 - web/network_stats.json - Aggregate statistics
+- web/svg/<hash>.svg - Each distinct monkey SVG once, referenced from the
+  JSON files by ``svg_hash``; files no longer referenced are pruned
+
+All JSON files come from one aggregation pass over the scanned monkeys
+(src/community_outputs.py). With --sharded (or SCAN_SHARDED=1), the
+same outputs are also split into leaderboard pages, fork shards by owner
+prefix and family-tree parts under web/community/, with a small
+manifest.json. The page loads the manifest and first pages, so its size
+does not grow with the network. Each scan also writes the delta from the
+previous scan's data to web/deltas/<previous version>.json, so clients
+holding an older version can catch up (src/community_delta.py). --compact (or SCAN_COMPACT=1) writes
+the JSON without whitespace and with sorted keys. gzip/brotli copies for
+serving are made at deploy time (src/precompress.py).
+
+Repos are scanned concurrently by a bounded thread pool, paced by a
+shared throttle that also backs off when GitHub's rate limit runs low.
+Output order is deterministic regardless of completion order.
+
+With --graphql (or SCAN_MODE=graphql), files, metadata and fork lists are
+fetched with one batched GraphQL query per ~50 repos instead (see
+src/github_graphql.py).
+
+Scans are incremental. Forks not pushed to since the last scan are
+carried forward from the saved scan state (src/scan_state.py) without
+downloading their files. Pass --full to rescan everything.
+
+The fork network is crawled breadth-first over every page of every fork
+list. --max-calls / --max-seconds bound the crawl (API calls, or queries
+with --graphql); when the budget runs out or a rate limit hits, the
+frontier is checkpointed and the next scan resumes it. Meanwhile, forks not reached yet keep their previous results.
+
+With --render (or SCAN_RENDER=1), monkey.svg is not downloaded. It is
+rendered locally from dna.json, and only forks whose SVG blob sha differs
+from the render (custom art) are fetched (see src/render_cache.py).
+
+Usage:
+    python src/scan_community.py [--workers 16] [--max-rps 10] [--graphql] [--full] [--render]
+                                 [--max-calls 5000] [--max-seconds 1800] [--sharded] [--compact]
 """
 
 import os
+import sys
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime, timezone
-from collections import Counter
-from github import Github, GithubException
+from collections import deque
+from typing import List, Optional
+from github import GithubException
+
+# Add parent directory to path for imports when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.github_client import BACKGROUND, GitHubClient, RateLimitScheduler
+from src.github_graphql import DEFAULT_BATCH_SIZE, FORKS_PER_PAGE, GraphQLClient, GraphQLError
+from src.render_cache import RenderCache, git_blob_sha
+from src.community_outputs import CommunityAggregator, write_json, write_sharded
+from src.community_delta import load_snapshot, make_delta, snapshot, version_id, write_delta
+from src.fileio import atomic_write_text
+from src.snapshot_pack import content_hash
+from src.scan_state import CHECKPOINT_NAME, CrawlCheckpoint, ScanState, default_checkpoint_path
+
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_RPS = 10.0
+# Requests kept in reserve before the throttle waits for the rate-limit reset
+RATE_LIMIT_RESERVE = 50
+# Fork pages fetched between checkpoint saves
+CHECKPOINT_EVERY = 25
+# Content-addressed monkey SVGs referenced by the generated JSON
+SVG_DIR = Path("web/svg")
+SHARD_DIR = Path("web/community")
+DELTA_DIR = Path("web/deltas")
+
+
+class RequestThrottle:
+    """
+    Background-priority scheduling for the scanner's PyGithub calls
+
+    A thin adapter over the shared RateLimitScheduler (src/github_client.py).
+    Requests are spaced at least ``1 / max_per_second`` apart across all
+    threads. The scanner leaves ``reserve`` requests for interactive
+    callers of the same token: when the client reports fewer remaining
+    (from the X-RateLimit-* headers PyGithub tracks), callers wait for the
+    reset instead of failing with 403s.
+    """
+
+    def __init__(self, max_per_second: float = DEFAULT_MAX_RPS, client=None,
+                 reserve: int = RATE_LIMIT_RESERVE, clock=time.monotonic, sleep=time.sleep,
+                 scheduler: Optional[RateLimitScheduler] = None):
+        self.client = client
+        self.scheduler = scheduler or RateLimitScheduler(clock=clock, sleep=sleep)
+        self.reserve = reserve
+        self.max_per_second = max_per_second
+
+    def wait(self) -> None:
+        """Block until the next request may be sent"""
+        if self.client is not None:
+            self.scheduler.update_from_pygithub(self.client)
+        self.scheduler.acquire(BACKGROUND, reserve=self.reserve, max_rps=self.max_per_second)
+
+
+class CrawlBudget:
+    """
+    Limits on one fork-network crawl: API calls and/or wall time
+
+    Either limit may be None (unbounded). The crawl checks ``exhausted``
+    before every fork page and stops cleanly, leaving a checkpoint.
+    """
+
+    def __init__(self, max_calls: Optional[int] = None, max_seconds: Optional[float] = None,
+                 clock=time.monotonic):
+        self.max_calls = max_calls
+        self.max_seconds = max_seconds
+        self.clock = clock
+        self.calls = 0
+        self.started = clock()
+
+    def spend(self, calls: int = 1) -> None:
+        self.calls += calls
+
+    @property
+    def exhausted(self) -> bool:
+        if self.max_calls is not None and self.calls >= self.max_calls:
+            return True
+        return self.max_seconds is not None and self.clock() - self.started >= self.max_seconds
+
 
+def _env_number(name, cast):
+    value = os.getenv(name)
+    return cast(value) if value else None
 
-def scan_community():
+
+def scan_community(workers: Optional[int] = None, max_rps: Optional[float] = None,
+                   graphql: Optional[bool] = None, full: bool = False, state_path: Optional[Path] = None,
+                   max_calls: Optional[int] = None, max_seconds: Optional[float] = None,
+                   render: Optional[bool] = None, sharded: Optional[bool] = None,
+                   compact: Optional[bool] = None):
     """Main scanner function that generates all static data files."""
     print("🌍 Starting ForkMonkey Community Scan...")
+    workers = workers or int(os.getenv("SCAN_WORKERS", DEFAULT_WORKERS))
+    max_rps = max_rps or float(os.getenv("SCAN_MAX_RPS", DEFAULT_MAX_RPS))
+    budget = CrawlBudget(max_calls or _env_number("SCAN_MAX_CALLS", int),
+                         max_seconds or _env_number("SCAN_MAX_SECONDS", float))
+    if graphql is None:
+        graphql = os.getenv("SCAN_MODE", "rest").lower() == "graphql"
+    if render is None:
+        render = os.getenv("SCAN_RENDER", "").lower() in ("1", "true", "yes")
+    renderer = RenderCache() if render else None
+    if sharded is None:
+        sharded = os.getenv("SCAN_SHARDED", "").lower() in ("1", "true", "yes")
+    if compact is None:
+        compact = os.getenv("SCAN_COMPACT", "").lower() in ("1", "true", "yes")
     
     # Initialize GitHub
     token = os.getenv("GITHUB_TOKEN")
     if not token:
         print("⚠️  No GITHUB_TOKEN found. API limits will be strict.")
-    
-    g = Github(token)
+        if graphql:
+            print("⚠️  GraphQL needs a token, falling back to REST.")
+            graphql = False
     
     # Determine repo to scan
     repo_name = os.getenv("GITHUB_REPOSITORY")
@@ -35,31 +177,25 @@ def scan_community():
         print("⚠️  GITHUB_REPOSITORY not set. Using default 'roeiba/forkMonkey'")
         repo_name = "roeiba/forkMonkey"
         
-    try:
-        repo = g.get_repo(repo_name)
+    # Results of the previous scan, to skip forks that have not changed
+    state = ScanState() if full else ScanState.load(state_path)
         
-        # If we are a fork, scan the parent's forks instead
-        if repo.fork and repo.parent:
-            print(f"🍴 Detected fork of {repo.parent.full_name}. Scanning parent's network...")
-            target_repo = repo.parent
+    try:
+        start = time.perf_counter()
+        checkpoint_path = Path(state_path).with_name(CHECKPOINT_NAME) if state_path else None
+        if graphql:
+            root_name, monkeys = scan_with_graphql(token, repo_name, state=state, renderer=renderer, budget=budget,
+                                                   checkpoint_path=checkpoint_path)
         else:
-            target_repo = repo
-            
-        print(f"📡 Scanning forks of {target_repo.full_name}...")
-        
-        # Collect all repos to scan
-        repos_to_scan = collect_repos(target_repo)
-        print(f"🎯 Found {len(repos_to_scan)} potential habitats.")
-        
-        # Scan each repo and collect monkey data
-        monkeys = []
-        for repo_tuple in repos_to_scan:
-            repo, degree = repo_tuple
-            monkey = scan_repo(repo, target_repo.full_name, degree)
-            if monkey:
-                monkeys.append(monkey)
-                degree_label = get_degree_label(degree)
-                print(f"✅ Found monkey in {repo.full_name} ({degree_label})")
+            root_name, monkeys = scan_with_rest(token, repo_name, workers, max_rps, state=state, budget=budget,
+                                                renderer=renderer, checkpoint_path=checkpoint_path)
+        state.root = root_name
+        # SVGs go to web/svg once; the committed state only keeps their hashes
+        state_svgs = externalize_state(state)
+        state.save(state_path)
+        for monkey in monkeys:
+            print(f"✅ Found monkey in {monkey['full_name']} ({monkey['degree_label']})")
+        print(f"⏱️  Scan took {time.perf_counter() - start:.1f}s")
         
         # Print summary by degree
         degree_counts = {}
@@ -72,11 +208,12 @@ def scan_community():
         
         print(f"\n✨ Scan complete! Discovered {len(monkeys)} monkeys.")
         
-        # Generate all output files
-        generate_community_data(target_repo.full_name, monkeys)
-        generate_leaderboard(monkeys)
-        generate_family_tree(target_repo.full_name, monkeys)
-        generate_network_stats(monkeys)
+        # Generate all output files, SVGs stored once and referenced by hash
+        published = externalize_svgs(monkeys)
+        data_version = generate_delta(published, compact=compact)
+        generate_outputs(root_name, published, sharded=sharded, compact=compact, data_version=data_version)
+        pruned = prune_svgs({m["svg_hash"] for m in published if m.get("svg_hash")} | state_svgs)
+        print(f"🖼️  {len(list(SVG_DIR.glob('*.svg')))} SVGs in {SVG_DIR} ({pruned} pruned)")
         
         print("\n💾 All data files generated successfully!")
         
@@ -87,47 +224,179 @@ def scan_community():
         exit(1)
 
 
-def collect_repos(target_repo, max_depth=3, max_total=200):
+def scan_with_rest(token, repo_name, workers=DEFAULT_WORKERS, max_rps=DEFAULT_MAX_RPS, state=None,
+                   budget=None, checkpoint_path=None, renderer=None):
+    """Scan the network with PyGithub: list forks, then 3 Contents calls per repo."""
+    # Pacing is done by RequestThrottle; PyGithub's own global delay would serialize the pool
+    access = GitHubClient(token, priority=BACKGROUND)
+    g = access.pygithub(pool_size=workers, per_page=FORKS_PER_PAGE)
+    throttle = RequestThrottle(max_rps, client=g, scheduler=access.scheduler)
+    
+    repo = g.get_repo(repo_name)
+    
+    # If we are a fork, scan the parent's forks instead
+    if repo.fork and repo.parent:
+        print(f"🍴 Detected fork of {repo.parent.full_name}. Scanning parent's network...")
+        target_repo = repo.parent
+    else:
+        target_repo = repo
+        
+    print(f"📡 Scanning forks of {target_repo.full_name}...")
+    
+    # Collect all repos to scan, resuming an interrupted crawl if there is one
+    checkpoint_path = checkpoint_path or default_checkpoint_path()
+    checkpoint = CrawlCheckpoint.load(checkpoint_path, root=target_repo.full_name)
+    repos_to_scan = collect_repos(target_repo, throttle=throttle, budget=budget, checkpoint=checkpoint,
+                                  checkpoint_path=checkpoint_path, page_size=FORKS_PER_PAGE,
+                                  resolve=lambda name: g.get_repo(name, lazy=True))
+    print(f"🎯 Found {len(repos_to_scan)} potential habitats.")
+    
+    # Scan repos concurrently and collect monkey data (in collection order)
+    monkeys = scan_repos(repos_to_scan, target_repo.full_name, workers, throttle, state, renderer)
+    print(f"🧵 Scanned {len(repos_to_scan)} repos with {workers} workers")
+    if state is not None:
+        collected = {repo.full_name for repo, _ in repos_to_scan}
+        if checkpoint.complete:
+            state.retain(collected)
+        else:
+            # Forks the crawl has not reached yet keep their last known monkey
+            for full_name, previous in state.repos.items():
+                if full_name not in collected and previous.monkey:
+                    monkeys.append(carry_forward(previous.monkey, target_repo.full_name, previous.monkey["degree"]))
+    return target_repo.full_name, monkeys
+
+
+def scan_with_graphql(token, repo_name, batch_size=DEFAULT_BATCH_SIZE, state=None, renderer=None,
+                      budget=None, checkpoint_path=None):
+    """Scan the network with batched GraphQL queries (files + forks per ~50 repos)."""
+    client = GraphQLClient(token, batch_size=batch_size)
+    
+    own = client.fetch_repos([repo_name], with_forks=False).get(repo_name)
+    if own is None:
+        raise RuntimeError(f"Repository {repo_name} not found")
+    
+    # If we are a fork, scan the parent's forks instead
+    root_name = repo_name
+    if own.fork and own.parent:
+        print(f"🍴 Detected fork of {own.parent}. Scanning parent's network...")
+        root_name = own.parent
+    
+    print(f"📡 Scanning forks of {root_name} via GraphQL...")
+    checkpoint_path = checkpoint_path or default_checkpoint_path()
+    checkpoint = CrawlCheckpoint.load(checkpoint_path, root=root_name, mode="graphql")
+    monkeys, scanned = scan_network_graphql(client, root_name, state=state, renderer=renderer, budget=budget,
+                                            checkpoint=checkpoint, checkpoint_path=checkpoint_path)
+    cost = client.cost
+    print(f"🎯 Scanned {len(scanned)} repos in {cost.queries} queries "
+          f"(cost {cost.cost}, {cost.remaining} points left)")
+    if state is not None and checkpoint.complete:
+        state.retain(scanned)
+    return root_name, monkeys
+
+
+def collect_repos(target_repo, max_depth=3, max_total=None, throttle=None, budget=None,
+                  checkpoint=None, checkpoint_path=None, resolve=None, page_size=None):
     """Collect all repos in the network (root + nested forks up to max_depth levels).
     
+    Breadth-first over every page of every repo's fork list. With a budget
+    the crawl stops once it is spent, and a rate-limit error stops it too;
+    either way the frontier is kept in ``checkpoint`` so a later call can
+    pick up where this one stopped.
+    
     Args:
         target_repo: The root repository to scan
         max_depth: Maximum depth to scan (1=direct forks, 2=forks of forks, 3=third level)
-        max_total: Maximum total repos to collect
+        max_total: Optional cap on total repos collected (None = the whole network)
+        throttle: Optional RequestThrottle, waited on before each fork page
+        budget: Optional CrawlBudget limiting API calls / wall time
+        checkpoint: Optional CrawlCheckpoint to resume from; updated in place,
+            ``checkpoint.complete`` tells whether the crawl finished
+        checkpoint_path: Where to save the checkpoint while crawling (removed when done)
+        resolve: full_name -> repo, used to rebuild repos when resuming
+        page_size: Forks per page; a shorter page is known to be the last
         
     Returns:
         List of tuples: (repo, degree) where degree is the distance from root (0=root, 1=1st degree, etc.)
     """
     repos = [(target_repo, 0)]  # (repo, degree)
-    seen = {target_repo.full_name}
-    queue = [(target_repo, 0)]  # BFS queue with (repo, current_depth)
+    queue = deque([(target_repo, 0, 0)])  # BFS queue with (repo, current_depth, next fork page)
+    
+    if checkpoint is not None and not checkpoint.complete and resolve is not None:
+        repos += [(resolve(name), degree) for name, degree in checkpoint.collected[1:]]
+        by_name = {repo.full_name: repo for repo, _ in repos}
+        queue = deque((by_name.get(name) or resolve(name), depth, page) for name, depth, page in checkpoint.queue)
+        print(f"⏯️  Resuming crawl: {len(repos)} repos found, {len(queue)} left to expand")
+    seen = {repo.full_name for repo, _ in repos}
     
-    while queue and len(repos) < max_total:
-        current_repo, current_depth = queue.pop(0)
+    def at_cap():
+        return max_total is not None and len(repos) >= max_total
+    
+    def save_checkpoint():
+        if checkpoint is None:
+            return
+        checkpoint.root = target_repo.full_name
+        checkpoint.collected = [(repo.full_name, degree) for repo, degree in repos]
+        checkpoint.queue = [] if at_cap() else [(repo.full_name, depth, page) for repo, depth, page in queue]
+        if checkpoint_path is not None:
+            if checkpoint.complete:
+                checkpoint.clear(checkpoint_path)
+            else:
+                checkpoint.save(checkpoint_path)
+    
+    pages = 0
+    while queue and not at_cap():
+        current_repo, current_depth, page_number = queue[0]
         
-        # Stop if we've reached max depth
-        if current_depth >= max_depth:
+        # Stop if we've reached max depth, or the listing says there are no forks
+        forks_count = getattr(current_repo, "forks_count", None)
+        if current_depth >= max_depth or (page_number == 0 and isinstance(forks_count, int) and forks_count == 0):
+            queue.popleft()
             continue
         
+        if budget is not None and budget.exhausted:
+            print(f"⏸️  Crawl budget spent after {budget.calls} calls, {len(queue)} repos left to expand")
+            break
+        if throttle is not None:
+            throttle.wait()
+        
         try:
-            forks = current_repo.get_forks()
-            # Get up to 50 forks per repo (1 page)
-            try:
-                page = forks.get_page(0)
-                for fork in page:
-                    if fork.full_name not in seen and len(repos) < max_total:
-                        seen.add(fork.full_name)
-                        fork_degree = current_depth + 1
-                        repos.append((fork, fork_degree))
-                        queue.append((fork, fork_degree))
-                        
-                        degree_label = get_degree_label(fork_degree)
-                        print(f"  📍 Found {degree_label} fork: {fork.full_name}")
-            except Exception:
-                pass
+            page = current_repo.get_forks().get_page(page_number)
+        except GithubException as e:
+            if e.status in (403, 429):
+                print(f"⏸️  Rate limited while listing forks of {current_repo.full_name}, checkpointing")
+                break
+            print(f"⚠️ Error fetching forks of {current_repo.full_name}: {e}")
+            page = []
         except Exception as e:
             print(f"⚠️ Error fetching forks of {current_repo.full_name}: {e}")
+            page = []
+        finally:
+            pages += 1
+            if budget is not None:
+                budget.spend()
+        
+        new = 0
+        for fork in page:
+            if fork.full_name not in seen and not at_cap():
+                seen.add(fork.full_name)
+                fork_degree = current_depth + 1
+                repos.append((fork, fork_degree))
+                queue.append((fork, fork_degree, 0))
+                new += 1
+                
+                degree_label = get_degree_label(fork_degree)
+                print(f"  📍 Found {degree_label} fork: {fork.full_name}")
+        
+        # An empty, short or all-duplicate page is the last one
+        if not new or (page_size and len(page) < page_size):
+            queue.popleft()
+        else:
+            queue[0] = (current_repo, current_depth, page_number + 1)
+        
+        if pages % CHECKPOINT_EVERY == 0 and checkpoint_path is not None:
+            save_checkpoint()
     
+    save_checkpoint()
     return repos
 
 
@@ -142,302 +411,644 @@ def get_degree_label(degree):
     return labels.get(degree, f"{degree}th degree")
 
 
-def scan_repo(repo, root_name, degree=0):
+def scan_repos(repos, root_name, workers=DEFAULT_WORKERS, throttle=None, state=None,
+               renderer=None) -> List[dict]:
+    """Scan (repo, degree) pairs with a bounded thread pool.
+    
+    Args:
+        repos: (repo, degree) tuples as returned by collect_repos
+        root_name: Full name of the root repository
+        workers: Maximum concurrent repos (1 = sequential)
+        throttle: Optional RequestThrottle shared by all workers
+        state: Optional ScanState; repos not pushed since it was saved are
+            carried forward instead of fetched, and results are recorded
+        renderer: Optional RenderCache; SVGs are rendered from DNA and
+            only custom ones are downloaded
+        
+    Returns:
+        Monkey data for repos that have a monkey, in the order of ``repos``
+    """
+    results = [None] * len(repos)
+    pending = []
+    for i, (repo, degree) in enumerate(repos):
+        pushed_at = getattr(repo, "pushed_at", None)
+        if state is not None and state.is_unchanged(repo.full_name, pushed_at):
+            results[i] = carry_forward(state.previous(repo.full_name), root_name, degree, repo.updated_at)
+        else:
+            pending.append(i)
+    
+    def scan(i):
+        repo, degree = repos[i]
+        if state is None or renderer is None:
+            return scan_repo(repo, root_name, degree, throttle, render=renderer is not None)
+        return scan_repo(repo, root_name, degree, throttle, render=True,
+                         previous=state.previous(repo.full_name), previous_shas=state.file_shas(repo.full_name))
+    
+    scanned = run_pool(scan, pending, workers)
+    
+    if renderer is not None:
+        by_name = {repo.full_name: repo for repo, _ in repos}
+        
+        def fetch_svgs(custom):
+            def fetch(monkey):
+                try:
+                    monkey["monkey_svg"] = fetch_file(by_name[monkey["full_name"]], "monkey_data/monkey.svg", throttle)
+                except Exception:
+                    pass
+            run_pool(fetch, custom, workers)
+        
+        finish_rendered_svgs(scanned, renderer, fetch_svgs)
+    
+    for i, monkey in zip(pending, scanned):
+        file_shas = monkey.pop("_file_shas", None) if monkey else None
+        results[i] = monkey
+        if state is not None:
+            repo = repos[i][0]
+            state.record(repo.full_name, monkey, getattr(repo, "pushed_at", None), file_shas=file_shas)
+    
+    if state is not None:
+        print(f"♻️  {len(repos) - len(pending)} unchanged repos carried forward, {len(pending)} fetched")
+    return [monkey for monkey in results if monkey]
+
+
+def run_pool(fn, items, workers=DEFAULT_WORKERS):
+    """[fn(item) for item in items] on a bounded thread pool, results in input order."""
+    if workers <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        # map() yields in submission order, whatever order requests finish in
+        return list(pool.map(fn, items))
+
+
+def finish_rendered_svgs(monkeys, renderer, fetch_svgs):
+    """Fill in monkey_svg for records scanned in render mode.
+    
+    Such records carry their monkey.svg blob sha as ``_svg_sha``. The local
+    render from DNA is used when its sha matches; the rest (custom or
+    older art, or no usable DNA) are handed to ``fetch_svgs`` to download.
+    """
+    pending = [monkey for monkey in monkeys if monkey and monkey.get("_svg_sha")]
+    svgs = renderer.render_many([monkey.get("monkey_dna") for monkey in pending])
+    custom = []
+    for monkey, svg in zip(pending, svgs):
+        sha = monkey.pop("_svg_sha")
+        if svg is not None and git_blob_sha(svg) == sha:
+            monkey["monkey_svg"] = svg
+        else:
+            custom.append(monkey)
+    if custom:
+        fetch_svgs(custom)
+    print(f"🎨 Rendered {len(pending) - len(custom)} SVGs locally ({renderer.hits} from cache), "
+          f"downloaded {len(custom)} custom")
+
+
+def carry_forward(monkey, root_name, degree, updated_at=None, svg_dir=SVG_DIR):
+    """A monkey record from the previous scan, refreshed for this one (None stays None).
+    
+    The state keeps SVGs by ``svg_hash``; the SVG is read back from svg_dir.
+    """
+    if monkey is None:
+        return None
+    monkey = dict(monkey)
+    if not monkey.get("monkey_svg") and monkey.get("svg_hash"):
+        path = Path(svg_dir) / f"{monkey['svg_hash']}.svg"
+        if path.exists():
+            monkey["monkey_svg"] = path.read_text(encoding="utf-8")
+            del monkey["svg_hash"]
+    monkey["is_root"] = monkey["full_name"] == root_name
+    monkey["degree"] = degree
+    monkey["degree_label"] = get_degree_label(degree)
+    if updated_at is not None:
+        monkey["updated_at"] = updated_at.isoformat()
+    
+    # Age moves on even when the repo does not
+    created = datetime.fromisoformat(monkey["created_at"])
+    if monkey.get("monkey_stats"):
+        stats = dict(monkey["monkey_stats"])
+        stats["age_days"] = (datetime.now(timezone.utc) - created.replace(tzinfo=timezone.utc)).days
+        monkey["monkey_stats"] = stats
+    return monkey
+
+
+def fetch_file(repo, path, throttle=None):
+    """Decoded contents of a file in a repo, paced by the throttle."""
+    if throttle:
+        throttle.wait()
+    return repo.get_contents(path).decoded_content.decode()
+
+
+def list_monkey_files(repo, throttle=None):
+    """{file name: blob sha} in a repo's monkey_data/ (empty if there is none)."""
+    if throttle:
+        throttle.wait()
+    try:
+        listing = repo.get_contents("monkey_data")
+    except Exception:
+        return {}
+    if not isinstance(listing, list):
+        return {}
+    return {item.name: item.sha for item in listing}
+
+
+def scan_repo(repo, root_name, degree=0, throttle=None, render=False, previous=None, previous_shas=None):
     """Scan a single repo for monkey data.
     
     Args:
         repo: GitHub repository object
         root_name: Full name of the root repository
         degree: Fork degree (0=root, 1=1st degree, 2=2nd degree, 3=3rd degree)
+        throttle: Optional RequestThrottle to pace the content requests
+        render: List monkey_data/ and fetch stats/DNA only; the record
+            keeps monkey.svg's blob sha as ``_svg_sha`` for
+            finish_rendered_svgs instead of the SVG itself
+        previous, previous_shas: Render mode only; the last scan's record
+            and monkey_data/ blob shas, so files whose sha did not change
+            are reused instead of fetched
     """
+    if render:
+        return scan_repo_for_render(repo, root_name, degree, throttle, previous, previous_shas)
     try:
-        # Calculate age from creation
-        now = datetime.now(timezone.utc)
-        created = repo.created_at.replace(tzinfo=timezone.utc)
-        age = (now - created).days
-        
-        monkey_data = {
-            "owner": repo.owner.login,
-            "repo": repo.name,
-            "full_name": repo.full_name,
-            "url": repo.html_url,
-            "is_root": repo.full_name == root_name,
-            "degree": degree,
-            "degree_label": get_degree_label(degree),
-            "parent": repo.parent.full_name if repo.fork and repo.parent else None,
-            "created_at": repo.created_at.isoformat(),
-            "updated_at": repo.updated_at.isoformat() if repo.updated_at else None,
-            "monkey_stats": None,
-            "monkey_svg": None,
-            "monkey_dna": None
-        }
+        monkey_data = new_monkey_record(
+            owner=repo.owner.login,
+            name=repo.name,
+            full_name=repo.full_name,
+            url=repo.html_url,
+            root_name=root_name,
+            degree=degree,
+            parent=repo.parent.full_name if repo.fork and repo.parent else None,
+            created_at=repo.created_at,
+            updated_at=repo.updated_at,
+        )
         
         # Fetch stats.json
         try:
-            contents = repo.get_contents("monkey_data/stats.json")
-            stats = json.loads(contents.decoded_content.decode())
-            # Always calculate fresh age from repo creation date (fixes Issue #64)
-            stats["age_days"] = age
-            monkey_data["monkey_stats"] = stats
+            monkey_data["monkey_stats"] = json.loads(fetch_file(repo, "monkey_data/stats.json", throttle))
         except Exception:
             pass
         
         # Fetch monkey.svg
         try:
-            contents = repo.get_contents("monkey_data/monkey.svg")
-            svg = contents.decoded_content.decode()
-            monkey_data["monkey_svg"] = svg
+            monkey_data["monkey_svg"] = fetch_file(repo, "monkey_data/monkey.svg", throttle)
         except Exception:
             pass
         
         # Fetch dna.json for extra data
         try:
-            contents = repo.get_contents("monkey_data/dna.json")
-            dna = json.loads(contents.decoded_content.decode())
-            monkey_data["monkey_dna"] = dna
+            monkey_data["monkey_dna"] = json.loads(fetch_file(repo, "monkey_data/dna.json", throttle))
         except Exception:
             pass
         
-        # Only return if we found at least stats or SVG
-        if monkey_data["monkey_stats"] or monkey_data["monkey_svg"]:
-            # Ensure basic stats if missing
-            if not monkey_data["monkey_stats"]:
-                monkey_data["monkey_stats"] = {
-                    "generation": 1,
-                    "rarity_score": 0,
-                    "age_days": age,
-                    "mutation_count": 0
-                }
-            return monkey_data
+        return complete_monkey_record(monkey_data, repo.created_at)
         
+    except Exception as e:
+        print(f"❌ Error scanning {repo.full_name}: {e}")
         return None
+
+
+def scan_repo_for_render(repo, root_name, degree=0, throttle=None, previous=None, previous_shas=None):
+    """scan_repo in render mode: one listing call, then only the files that exist and changed.
+    
+    With the previous record and its blob shas, a push that did not touch
+    monkey_data/ costs the listing call alone. The record keeps the
+    listing as ``_file_shas`` for the scan state.
+    """
+    previous = carry_forward(previous, root_name, degree) if previous else None
+    previous_shas = previous_shas or {}
+    
+    def unchanged(name, files):
+        return previous is not None and name in files and files[name] == previous_shas.get(name)
+    
+    try:
+        monkey_data = new_monkey_record(
+            owner=repo.owner.login,
+            name=repo.name,
+            full_name=repo.full_name,
+            url=repo.html_url,
+            root_name=root_name,
+            degree=degree,
+            parent=repo.parent.full_name if repo.fork and repo.parent else None,
+            created_at=repo.created_at,
+            updated_at=repo.updated_at,
+        )
+        files = list_monkey_files(repo, throttle)
+        
+        for name, field in (("stats.json", "monkey_stats"), ("dna.json", "monkey_dna")):
+            if unchanged(name, files) and previous.get(field):
+                monkey_data[field] = previous[field]
+            elif name in files:
+                try:
+                    monkey_data[field] = json.loads(fetch_file(repo, f"monkey_data/{name}", throttle))
+                except Exception:
+                    pass
+        if unchanged("monkey.svg", files) and previous.get("monkey_svg"):
+            monkey_data["monkey_svg"] = previous["monkey_svg"]
+        elif "monkey.svg" in files:
+            monkey_data["_svg_sha"] = files["monkey.svg"]
+        
+        monkey_data = complete_monkey_record(monkey_data, repo.created_at)
+        if monkey_data is not None:
+            monkey_data["_file_shas"] = files
+        return monkey_data
         
     except Exception as e:
         print(f"❌ Error scanning {repo.full_name}: {e}")
         return None
 
 
-def generate_community_data(source_repo, monkeys):
-    """Generate community_data.json with all fork data."""
-    data = {
-        "last_updated": datetime.now(timezone.utc).isoformat(),
-        "source_repo": source_repo,
-        "total_forks": len(monkeys),
-        "forks": monkeys
+def new_monkey_record(owner, name, full_name, url, root_name, degree, parent, created_at, updated_at):
+    """Monkey data for a repo, before its files are fetched."""
+    return {
+        "owner": owner,
+        "repo": name,
+        "full_name": full_name,
+        "url": url,
+        "is_root": full_name == root_name,
+        "degree": degree,
+        "degree_label": get_degree_label(degree),
+        "parent": parent,
+        "created_at": created_at.isoformat(),
+        "updated_at": updated_at.isoformat() if updated_at else None,
+        "monkey_stats": None,
+        "monkey_svg": None,
+        "monkey_dna": None
     }
+
+
+def complete_monkey_record(monkey_data, created_at):
+    """Finish a monkey record once its files are in, or None if the repo has no monkey."""
+    # Always calculate fresh age from repo creation date (fixes Issue #64)
+    now = datetime.now(timezone.utc)
+    age = (now - created_at.replace(tzinfo=timezone.utc)).days
+    if monkey_data["monkey_stats"]:
+        monkey_data["monkey_stats"]["age_days"] = age
     
-    output_file = Path("web/community_data.json")
-    output_file.parent.mkdir(exist_ok=True)
-    
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=2)
+    # Only return if we found at least stats or SVG (possibly still to be rendered)
+    if monkey_data["monkey_stats"] or monkey_data["monkey_svg"] or monkey_data.get("_svg_sha"):
+        # Ensure basic stats if missing
+        if not monkey_data["monkey_stats"]:
+            monkey_data["monkey_stats"] = {
+                "generation": 1,
+                "rarity_score": 0,
+                "age_days": age,
+                "mutation_count": 0
+            }
+        return monkey_data
     
-    print(f"📊 Generated {output_file}")
+    return None
 
 
-def generate_leaderboard(monkeys):
-    """Generate leaderboard.json with rarity rankings."""
-    # Sort by rarity score (descending)
-    sorted_monkeys = sorted(
-        monkeys,
-        key=lambda m: m.get("monkey_stats", {}).get("rarity_score", 0),
-        reverse=True
+def monkey_from_graphql(record, root_name, degree=0):
+    """Monkey data from a GraphQL RepoRecord (files already fetched)."""
+    monkey_data = new_monkey_record(
+        owner=record.owner,
+        name=record.name,
+        full_name=record.full_name,
+        url=record.url,
+        root_name=root_name,
+        degree=degree,
+        parent=record.parent if record.fork else None,
+        created_at=record.created_at,
+        updated_at=record.updated_at,
     )
+    for key, field in (("stats", "monkey_stats"), ("dna", "monkey_dna")):
+        text = record.files.get(key)
+        if text:
+            try:
+                monkey_data[field] = json.loads(text)
+            except ValueError:
+                pass
+    monkey_data["monkey_svg"] = record.files.get("svg") or None
+    if not monkey_data["monkey_svg"] and record.file_oids.get("svg"):
+        # Fetched without SVG text: render it later (finish_rendered_svgs)
+        monkey_data["_svg_sha"] = record.file_oids["svg"]
+    return complete_monkey_record(monkey_data, record.created_at)
+
+
+def scan_network_graphql(client, root_name, max_depth=3, max_total=None, state=None, renderer=None,
+                         budget=None, checkpoint=None, checkpoint_path=None):
+    """Collect and scan the fork network with batched GraphQL queries.
     
-    rankings = []
-    for rank, monkey in enumerate(sorted_monkeys, start=1):
-        stats = monkey.get("monkey_stats", {})
-        rankings.append({
-            "rank": rank,
-            "owner": monkey["owner"],
-            "repo": monkey["repo"],
-            "full_name": monkey["full_name"],
-            "url": monkey["url"],
-            "rarity_score": stats.get("rarity_score", 0),
-            "generation": stats.get("generation", 1),
-            "age_days": stats.get("age_days", 0),
-            "mutation_count": stats.get("mutation_count", 0),
-            "is_root": monkey["is_root"],
-            "degree": monkey.get("degree", 0),
-            "degree_label": monkey.get("degree_label", "root"),
-            "monkey_svg": monkey.get("monkey_svg")
-        })
-    
-    data = {
-        "last_updated": datetime.now(timezone.utc).isoformat(),
-        "total_ranked": len(rankings),
-        "rankings": rankings
-    }
+    Walks the network level by level in batches of ``client.batch_size``
+    repos (files, metadata and the first page of forks together), so a
+    200-repo network takes a handful of queries. Longer fork lists are
+    paged by cursor.
     
-    output_file = Path("web/leaderboard.json")
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=2)
+    With a ScanState, each batch is first fetched without files; only
+    repos whose pushedAt / HEAD oid changed are fetched again with files,
+    the rest are carried forward.
     
-    print(f"🏆 Generated {output_file}")
-
-
-def generate_family_tree(root_name, monkeys):
-    """Generate family_tree.json with fork genealogy."""
-    # Build parent-children relationships
-    nodes = {}
+    With a RenderCache, only the SVGs' blob oids are fetched. SVGs are
+    rendered from DNA, and custom ones are fetched in a final query.
     
-    for monkey in monkeys:
-        full_name = monkey["full_name"]
-        parent = monkey.get("parent")
-        
-        # Create node if not exists
-        if full_name not in nodes:
-            nodes[full_name] = {
-                "id": full_name,
-                "owner": monkey["owner"],
-                "repo": monkey["repo"],
-                "url": monkey["url"],
-                "parent": parent,
-                "children": [],
-                "is_root": monkey["is_root"],
-                "degree": monkey.get("degree", 0),
-                "degree_label": monkey.get("degree_label", "root"),
-                "rarity_score": monkey.get("monkey_stats", {}).get("rarity_score", 0),
-                "generation": monkey.get("monkey_stats", {}).get("generation", 1),
-                "monkey_svg": monkey.get("monkey_svg")
-            }
-        
-        # Add as child to parent
-        if parent and parent in nodes:
-            if full_name not in nodes[parent]["children"]:
-                nodes[parent]["children"].append(full_name)
-    
-    # Second pass: ensure all children are properly linked
-    for monkey in monkeys:
-        parent = monkey.get("parent")
-        full_name = monkey["full_name"]
-        if parent and parent in nodes:
-            if full_name not in nodes[parent]["children"]:
-                nodes[parent]["children"].append(full_name)
-    
-    data = {
-        "last_updated": datetime.now(timezone.utc).isoformat(),
-        "root": root_name,
-        "total_nodes": len(nodes),
-        "nodes": list(nodes.values())
-    }
+    With a CrawlBudget, every query is charged to it. The crawl stops when
+    the budget is spent or a query fails (rate limit or other
+    GraphQLError). The frontier, meaning unfetched repos and fork-list
+    cursors, is kept in ``checkpoint`` (saved to ``checkpoint_path``), and
+    a later call resumes it like collect_repos. Repos fetched by earlier
+    runs of the crawl, and those not reached yet, keep their monkey from
+    the state.
     
-    output_file = Path("web/family_tree.json")
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=2)
+    Returns:
+        (monkeys, scanned) with monkeys in BFS order, like collect_repos,
+        and the full names of every repo reached
+    """
+    collected = [(root_name, 0)]
+    queue = deque([(root_name, 0)])
+    cursors = {}
+    if checkpoint is not None and not checkpoint.complete:
+        collected = [tuple(item) for item in checkpoint.collected]
+        queue = deque((name, degree) for name, degree, page in checkpoint.queue if not page)
+        cursors = dict(checkpoint.cursors)
+        print(f"⏯️  Resuming crawl: {len(collected)} repos found, {len(queue) + len(cursors)} left to expand")
+    degrees = dict(collected)
+    records = {}
+    changed = set()
+    missing = set()
+    svg_text = renderer is None
     
-    print(f"🌳 Generated {output_file}")
-
-
-def generate_network_stats(monkeys):
-    """Generate network_stats.json with aggregate statistics."""
-    if not monkeys:
-        data = {
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-            "total_monkeys": 0,
-            "active_today": 0,
-            "generations": {},
-            "avg_rarity": 0,
-            "rarest_trait": None,
-            "most_common_trait": None,
-            "trait_distribution": {}
-        }
-    else:
-        # Count generations
-        generation_counts = Counter()
-        rarity_scores = []
-        trait_counts = Counter()
-        active_today = 0
-        now = datetime.now(timezone.utc)
-        
-        for monkey in monkeys:
-            stats = monkey.get("monkey_stats", {})
-            dna = monkey.get("monkey_dna", {})
-            
-            # Generations
-            gen = stats.get("generation", 1)
-            generation_counts[str(gen)] += 1
-            
-            # Rarity
-            rarity = stats.get("rarity_score", 0)
-            rarity_scores.append(rarity)
-            
-            # Active today check
-            updated = monkey.get("updated_at")
-            if updated:
-                try:
-                    updated_dt = datetime.fromisoformat(updated.replace("Z", "+00:00"))
-                    if (now - updated_dt).days == 0:
-                        active_today += 1
-                except Exception:
-                    pass
-            
-            # Collect traits
-            traits = stats.get("traits", {})
-            if not traits and dna:
-                traits = dna.get("traits", {})
+    def at_cap():
+        return max_total is not None and len(degrees) >= max_total
+    
+    def charged(fetch, *args, **kwargs):
+        before = client.cost.queries
+        try:
+            return fetch(*args, **kwargs)
+        finally:
+            if budget is not None:
+                budget.spend(client.cost.queries - before)
+    
+    def discover(full_name, forks):
+        degree = degrees[full_name] + 1
+        for fork in forks:
+            if fork not in degrees and not at_cap():
+                degrees[fork] = degree
+                collected.append((fork, degree))
+                queue.append((fork, degree))
+                print(f"  📍 Found {get_degree_label(degree)} fork: {fork}")
+    
+    def save_checkpoint():
+        if checkpoint is None:
+            return
+        checkpoint.mode = "graphql"
+        checkpoint.root = root_name
+        checkpoint.collected = collected
+        checkpoint.queue = ([(name, degrees[name], 1) for name in cursors]
+                            + [(name, degree, 0) for name, degree in queue])
+        checkpoint.cursors = dict(cursors)
+        if checkpoint_path is not None:
+            if checkpoint.complete:
+                checkpoint.clear(checkpoint_path)
+            else:
+                checkpoint.save(checkpoint_path)
+    
+    try:
+        while queue or cursors:
+            if budget is not None and budget.exhausted:
+                print(f"⏸️  Crawl budget spent after {budget.calls} queries, "
+                      f"{len(queue) + len(cursors)} repos left to expand")
+                break
             
-            for trait_name, trait_data in traits.items():
-                if isinstance(trait_data, dict):
-                    value = trait_data.get("value", "unknown")
+            # Finish paging fork lists before the next batch
+            if cursors:
+                full_name, after = next(iter(cursors.items()))
+                forks, after = charged(client.fetch_forks_page, full_name, after)
+                if after:
+                    cursors[full_name] = after
                 else:
-                    value = trait_data
-                trait_counts[f"{trait_name}:{value}"] += 1
-        
-        # Calculate stats
-        avg_rarity = sum(rarity_scores) / len(rarity_scores) if rarity_scores else 0
-        
-        # Find rarest and most common traits
-        rarest_trait = None
-        most_common_trait = None
-        
-        if trait_counts:
-            sorted_traits = trait_counts.most_common()
-            most_common = sorted_traits[0]
-            rarest = sorted_traits[-1]
+                    del cursors[full_name]
+                discover(full_name, forks)
+                continue
             
-            most_common_trait = {
-                "trait": most_common[0].split(":")[0],
-                "value": most_common[0].split(":")[1] if ":" in most_common[0] else most_common[0],
-                "count": most_common[1]
-            }
-            
-            rarest_trait = {
-                "trait": rarest[0].split(":")[0],
-                "value": rarest[0].split(":")[1] if ":" in rarest[0] else rarest[0],
-                "count": rarest[1]
-            }
-        
-        # Build trait distribution
-        trait_distribution = {}
-        for trait_key, count in trait_counts.items():
-            parts = trait_key.split(":")
-            trait_name = parts[0]
-            trait_value = parts[1] if len(parts) > 1 else "unknown"
+            degree = queue[0][1]
+            batch = []
+            for full_name, d in queue:
+                if d != degree or len(batch) == client.batch_size:
+                    break
+                batch.append(full_name)
+            with_forks = degree < max_depth
+            fetched = charged(client.fetch_repos, batch, with_forks=with_forks, with_files=state is None,
+                              svg_text=svg_text, all_forks=False)
+            batch_changed = set(fetched)
+            if state is not None:
+                batch_changed = {name for name, record in fetched.items()
+                                 if not state.is_unchanged(name, record.pushed_at, record.head_oid)}
+                if batch_changed:
+                    with_files = charged(client.fetch_repos, [n for n in batch if n in batch_changed],
+                                         with_forks=False, svg_text=svg_text)
+                    for name, record in with_files.items():
+                        fetched[name].files = record.files
+                        fetched[name].file_oids = record.file_oids
             
-            if trait_name not in trait_distribution:
-                trait_distribution[trait_name] = {}
-            trait_distribution[trait_name][trait_value] = count
+            for _ in batch:
+                queue.popleft()
+            records.update(fetched)
+            changed |= batch_changed
+            for full_name in batch:
+                record = fetched.get(full_name)
+                if record is None:
+                    missing.add(full_name)
+                    continue
+                if with_forks:
+                    discover(full_name, record.forks)
+                    if record.forks_cursor:
+                        cursors[full_name] = record.forks_cursor
+    except GraphQLError as e:
+        print(f"⏸️  GraphQL query failed ({e}), checkpointing")
+    
+    save_checkpoint()
+    complete = not queue and not cursors
+    pending = {name for name, _ in queue}
+    
+    monkeys = []
+    scanned = []
+    fetched = []
+    carried = 0
+    for full_name, degree in collected:
+        if full_name in missing or full_name in pending:
+            continue
+        scanned.append(full_name)
+        record = records.get(full_name)
+        if record is not None and full_name in changed:
+            monkey = monkey_from_graphql(record, root_name, degree)
+            fetched.append((full_name, monkey, record))
+        elif state is not None:
+            # Unchanged, or fetched by an earlier run of a resumed crawl
+            monkey = carry_forward(state.previous(full_name), root_name, degree,
+                                   record.updated_at if record is not None else None)
+            carried += 1
+        else:
+            monkey = None
+        if monkey:
+            monkeys.append(monkey)
+    
+    if state is not None and not complete:
+        # Forks the crawl has not reached yet keep their last known monkey
+        reached = set(scanned)
+        for full_name, previous in state.repos.items():
+            if full_name not in reached and previous.monkey:
+                monkeys.append(carry_forward(previous.monkey, root_name, previous.monkey["degree"]))
+    
+    if renderer is not None:
+        def fetch_svgs(custom):
+            records = client.fetch_repos([monkey["full_name"] for monkey in custom], with_forks=False)
+            for monkey in custom:
+                record = records.get(monkey["full_name"])
+                if record is not None:
+                    monkey["monkey_svg"] = record.files.get("svg") or None
         
-        data = {
-            "last_updated": datetime.now(timezone.utc).isoformat(),
-            "total_monkeys": len(monkeys),
-            "active_today": active_today,
-            "generations": dict(generation_counts),
-            "avg_rarity": round(avg_rarity, 2),
-            "max_rarity": round(max(rarity_scores), 2) if rarity_scores else 0,
-            "min_rarity": round(min(rarity_scores), 2) if rarity_scores else 0,
-            "rarest_trait": rarest_trait,
-            "most_common_trait": most_common_trait,
-            "trait_distribution": trait_distribution
-        }
+        finish_rendered_svgs([monkey for _, monkey, _ in fetched], renderer, fetch_svgs)
     
-    output_file = Path("web/network_stats.json")
-    with open(output_file, "w") as f:
-        json.dump(data, f, indent=2)
+    if state is not None:
+        for full_name, monkey, record in fetched:
+            state.record(full_name, monkey, record.pushed_at, record.head_oid)
+        print(f"♻️  {carried} unchanged repos carried forward, {len(scanned) - carried} fetched")
+    return monkeys, scanned
+
+
+def store_svg(svg, svg_dir=SVG_DIR):
+    """Write an SVG as svg_dir/<hash>.svg (once) and return its hash."""
+    digest = content_hash(svg)
+    path = Path(svg_dir) / f"{digest}.svg"
+    if not path.exists():
+        atomic_write_text(path, svg)
+    return digest
+
+
+def externalize_svgs(monkeys, svg_dir=SVG_DIR):
+    """Monkey records with ``monkey_svg`` moved out to svg_dir, replaced by ``svg_hash``."""
+    return [externalize_svg(monkey, svg_dir) for monkey in monkeys]
+
+
+def externalize_svg(monkey, svg_dir=SVG_DIR):
+    """One record with ``monkey_svg`` stored in svg_dir and replaced by ``svg_hash`` (kept if already set)."""
+    record = dict(monkey)
+    svg = record.pop("monkey_svg", None)
+    record["svg_hash"] = store_svg(svg, svg_dir) if svg else record.get("svg_hash")
+    return record
+
+
+def externalize_state(state, svg_dir=SVG_DIR):
+    """Replace inline SVGs in the scan state's records by ``svg_hash``; returns the hashes the state uses."""
+    hashes = set()
+    for repo in state.repos.values():
+        if repo.monkey is None:
+            continue
+        if "monkey_svg" in repo.monkey:
+            repo.monkey = externalize_svg(repo.monkey, svg_dir)
+        if repo.monkey.get("svg_hash"):
+            hashes.add(repo.monkey["svg_hash"])
+    return hashes
+
+
+def prune_svgs(keep, svg_dir=SVG_DIR):
+    """Delete SVGs in svg_dir whose hash is not in ``keep``; returns how many."""
+    removed = 0
+    for path in Path(svg_dir).glob("*.svg"):
+        if path.stem not in keep:
+            path.unlink()
+            removed += 1
+    return removed
+
+
+def generate_delta(monkeys, previous_file=Path("web/community_data.json"), delta_dir=DELTA_DIR, compact=False):
+    """Write the delta from the previous community_data.json to these monkeys; returns their data version.
     
+    Must run before community_data.json is regenerated.
+    """
+    current = snapshot(monkeys)
+    data_version = version_id(current)
+    previous = load_snapshot(previous_file)
+    if previous is not None:
+        delta = make_delta(previous, current)
+        if delta["from"] == delta["to"]:
+            print(f"🔁 No changes since the last scan (version {data_version})")
+        else:
+            write_delta(delta, delta_dir, compact=compact)
+            summary = delta["summary"]
+            print(f"🧩 Generated {delta_dir}/{delta['from']}.json → {data_version} "
+                  f"(+{summary['added']} -{summary['removed']} ~{summary['changed']}, {len(delta['ops'])} ops)")
+    return data_version
+
+
+def generate_outputs(root_name, monkeys, sharded=False, compact=False, data_version=None):
+    """Generate every web/*.json file from one aggregation pass over the monkeys."""
+    aggregate = CommunityAggregator(monkeys, data_version=data_version)
+    generate_community_data(root_name, monkeys, aggregate, compact)
+    generate_leaderboard(monkeys, aggregate, compact)
+    generate_family_tree(root_name, monkeys, aggregate, compact)
+    generate_network_stats(monkeys, aggregate, compact)
+    if sharded:
+        generate_sharded(root_name, aggregate, compact=compact)
+
+
+def generate_sharded(root_name, aggregate, out_dir=SHARD_DIR, compact=False):
+    """Generate the paged/sharded copies of the outputs and their manifest."""
+    manifest = write_sharded(aggregate, root_name, out_dir, compact=compact)
+    print(f"🗂️  Generated {out_dir}/manifest.json ({manifest['leaderboard']['count']} leaderboard pages, "
+          f"{manifest['forks']['count']} fork shards, {manifest['tree']['count']} tree parts)")
+
+
+def generate_community_data(source_repo, monkeys, aggregate=None, compact=False):
+    """Generate community_data.json with all fork data."""
+    aggregate = aggregate or CommunityAggregator(monkeys)
+    output_file = Path("web/community_data.json")
+    output_file.parent.mkdir(exist_ok=True)
+    write_json(output_file, aggregate.community_data(source_repo), compact)
+    print(f"📊 Generated {output_file}")
+
+
+def generate_leaderboard(monkeys, aggregate=None, compact=False):
+    """Generate leaderboard.json with rarity rankings."""
+    aggregate = aggregate or CommunityAggregator(monkeys)
+    output_file = Path("web/leaderboard.json")
+    write_json(output_file, aggregate.leaderboard(), compact)
+    print(f"🏆 Generated {output_file}")
+
+
+def generate_family_tree(root_name, monkeys, aggregate=None, compact=False):
+    """Generate family_tree.json with fork genealogy."""
+    aggregate = aggregate or CommunityAggregator(monkeys)
+    output_file = Path("web/family_tree.json")
+    write_json(output_file, aggregate.family_tree(root_name), compact)
+    print(f"🌳 Generated {output_file}")
+
+
+def generate_network_stats(monkeys, aggregate=None, compact=False):
+    """Generate network_stats.json with aggregate statistics."""
+    aggregate = aggregate or CommunityAggregator(monkeys)
+    output_file = Path("web/network_stats.json")
+    write_json(output_file, aggregate.network_stats(), compact)
     print(f"📈 Generated {output_file}")
 
 
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Scan the ForkMonkey fork network")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Concurrent repo scans (default: SCAN_WORKERS or {DEFAULT_WORKERS})")
+    parser.add_argument("--max-rps", type=float, default=None,
+                        help=f"Max API requests per second (default: SCAN_MAX_RPS or {DEFAULT_MAX_RPS:g})")
+    parser.add_argument("--graphql", action="store_true", default=None,
+                        help="Fetch files and forks with batched GraphQL queries (or SCAN_MODE=graphql)")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved scan state and refetch every repo")
+    parser.add_argument("--render", action="store_true", default=None,
+                        help="Render SVGs from DNA, download only custom ones (or SCAN_RENDER=1)")
+    parser.add_argument("--state", type=Path, default=None,
+                        help="Scan state file (default: SCAN_STATE or .forkmonkey/scan_state.json)")
+    parser.add_argument("--max-calls", type=int, default=None,
+                        help="Stop the fork crawl after this many API calls and resume next run (or SCAN_MAX_CALLS)")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="Stop the fork crawl after this many seconds and resume next run (or SCAN_MAX_SECONDS)")
+    parser.add_argument("--sharded", action="store_true", default=None,
+                        help="Also write paged/sharded outputs with a manifest to web/community/ (or SCAN_SHARDED=1)")
+    parser.add_argument("--compact", action="store_true", default=None,
+                        help="Write JSON without whitespace and with sorted keys (or SCAN_COMPACT=1)")
+    args = parser.parse_args(argv)
+    scan_community(workers=args.workers, max_rps=args.max_rps, graphql=args.graphql,
+                   full=args.full, state_path=args.state, max_calls=args.max_calls, max_seconds=args.max_seconds,
+                   render=args.render, sharded=args.sharded, compact=args.compact)
+
+
 if __name__ == "__main__":
-    scan_community()
+    main()
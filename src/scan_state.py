@@ -0,0 +1,185 @@
+"""
+ForkMonkey Scan State
+
+Persisted results of the previous community scan, so the next scan only
+downloads forks that changed.
+
+For every repo the state keeps:
+
+- ``pushed_at`` and the HEAD commit oid when known
+- the monkey record found last time (or None if the repo had no monkey),
+  with its SVG referenced by ``svg_hash`` under web/svg/ rather than
+  inline; the scanner reads it back when carrying the record forward
+
+A repo whose ``pushed_at`` and HEAD oid still match is carried forward
+without fetching its files. Its metadata comes for free with the fork
+listing. Repos that drop out of the network are removed from the state
+at the end of a scan.
+
+The state lives in ``.forkmonkey/scan_state.json`` by default (override
+with SCAN_STATE). The community workflow commits it alongside the
+generated data.
+
+A fork-network crawl that runs out of budget (API calls, wall time) or
+hits a rate limit leaves a ``CrawlCheckpoint`` next to it
+(``.forkmonkey/crawl_checkpoint.json``): the repos collected so far and
+the BFS frontier with the next fork page of each repo. The next scan
+resumes from there, and the checkpoint is removed once a crawl finishes.
+"""
+
+import os
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from src.fileio import atomic_write_text
+
+
+STATE_VERSION = 1
+DEFAULT_STATE_PATH = Path(".forkmonkey") / "scan_state.json"
+CHECKPOINT_NAME = "crawl_checkpoint.json"
+
+
+def default_state_path() -> Path:
+    return Path(os.getenv("SCAN_STATE", str(DEFAULT_STATE_PATH)))
+
+
+def default_checkpoint_path() -> Path:
+    return default_state_path().with_name(CHECKPOINT_NAME)
+
+
+def _iso(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.isoformat()
+    return str(value)
+
+
+class RepoState(BaseModel):
+    """What the last scan saw for one repo"""
+    pushed_at: Optional[str] = None
+    head_oid: Optional[str] = None
+    monkey: Optional[dict] = None
+    # monkey_data/ file name → blob sha (REST render mode)
+    file_shas: Dict[str, str] = {}
+    scanned_at: Optional[str] = None
+
+
+class ScanState(BaseModel):
+    """Per-repo results of the previous scan, keyed by full_name"""
+    version: int = STATE_VERSION
+    root: Optional[str] = None
+    last_scan: Optional[str] = None
+    repos: Dict[str, RepoState] = {}
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "ScanState":
+        """The saved state, or an empty one if missing, unreadable or from another version"""
+        path = Path(path) if path else default_state_path()
+        if not path.exists():
+            return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = cls(**json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable scan state {path}: {e}")
+            return cls()
+        return state if state.version == STATE_VERSION else cls()
+
+    def save(self, path: Optional[Path] = None) -> None:
+        path = Path(path) if path else default_state_path()
+        self.last_scan = datetime.now(timezone.utc).isoformat()
+        atomic_write_text(path, json.dumps(self.model_dump(), separators=(",", ":"), sort_keys=True))
+
+    def is_unchanged(self, full_name: str, pushed_at=None, head_oid: Optional[str] = None) -> bool:
+        """True if the repo has not been pushed to since it was last scanned"""
+        previous = self.repos.get(full_name)
+        if previous is None or pushed_at is None or previous.pushed_at != _iso(pushed_at):
+            return False
+        # The HEAD oid is only compared when both scans know it
+        return head_oid is None or previous.head_oid is None or previous.head_oid == head_oid
+
+    def previous(self, full_name: str) -> Optional[dict]:
+        """The monkey record from the last scan (None if there was none)"""
+        previous = self.repos.get(full_name)
+        return previous.monkey if previous else None
+
+    def file_shas(self, full_name: str) -> Dict[str, str]:
+        """monkey_data/ blob shas seen by the last scan (empty if unknown)"""
+        previous = self.repos.get(full_name)
+        return previous.file_shas if previous else {}
+
+    def record(self, full_name: str, monkey: Optional[dict], pushed_at=None,
+               head_oid: Optional[str] = None, file_shas: Optional[Dict[str, str]] = None) -> None:
+        self.repos[full_name] = RepoState(
+            pushed_at=_iso(pushed_at),
+            head_oid=head_oid,
+            monkey=monkey,
+            file_shas=file_shas or {},
+            scanned_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+    def retain(self, full_names: Iterable[str]) -> int:
+        """Drop repos not seen in this scan, returns how many were removed"""
+        keep = set(full_names)
+        gone = [name for name in self.repos if name not in keep]
+        for name in gone:
+            del self.repos[name]
+        return len(gone)
+
+
+class CrawlCheckpoint(BaseModel):
+    """
+    A fork-network BFS that stopped early, to resume on the next run
+
+    ``collected`` is every (full_name, degree) found so far, in BFS order;
+    ``queue`` is the frontier as (full_name, degree, next fork page).
+    GraphQL crawls (``mode="graphql"``) page fork lists by cursor instead:
+    their queue entries have page 0 until the repo is fetched, and
+    ``cursors`` holds the next fork-list cursor of repos with more pages.
+    """
+    version: int = STATE_VERSION
+    mode: str = "rest"
+    root: Optional[str] = None
+    collected: List[Tuple[str, int]] = []
+    queue: List[Tuple[str, int, int]] = []
+    cursors: Dict[str, str] = {}
+    calls: int = 0
+    saved_at: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return not self.queue
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None, root: Optional[str] = None,
+             mode: str = "rest") -> "CrawlCheckpoint":
+        """The saved checkpoint for ``root`` and crawl ``mode``, or an empty one"""
+        path = Path(path) if path else default_checkpoint_path()
+        if not path.exists():
+            return cls(root=root, mode=mode)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                checkpoint = cls(**json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable crawl checkpoint {path}: {e}")
+            return cls(root=root, mode=mode)
+        if checkpoint.version != STATE_VERSION or (root and checkpoint.root != root) or checkpoint.mode != mode:
+            return cls(root=root, mode=mode)
+        return checkpoint
+
+    def save(self, path: Optional[Path] = None) -> None:
+        path = Path(path) if path else default_checkpoint_path()
+        self.saved_at = datetime.now(timezone.utc).isoformat()
+        atomic_write_text(path, json.dumps(self.model_dump(), separators=(",", ":")))
+
+    @staticmethod
+    def clear(path: Optional[Path] = None) -> None:
+        path = Path(path) if path else default_checkpoint_path()
+        path.unlink(missing_ok=True)
@@ -0,0 +1,335 @@
+"""
+ForkMonkey Snapshot Pack
+
+Single-file storage for evolution snapshots.
+
+``monkey_evolution/snapshots.pack`` holds the compressed SVG blobs
+back to back. ``snapshots.idx`` is an append-only JSONL index with one
+line per snapshot: timestamp, content hash, offset, length and codec.
+Identical snapshots share a blob. Readers mmap the pack once and slice
+blobs out by offset. That replaces hundreds of small-file opens, and git
+only has to track two files.
+
+History compaction removes retired blobs by rewriting both files
+(``drop``); otherwise they are only appended to.
+
+Blobs use zstd when the optional ``zstandard`` package is installed,
+otherwise gzip. The codec is recorded per blob, so both can be mixed.
+
+Usage:
+    python src/snapshot_pack.py list
+    python src/snapshot_pack.py extract --output web/monkey_evolution --objects
+    python src/snapshot_pack.py build --prune
+    python src/snapshot_pack.py --name retired list
+"""
+
+import os
+import sys
+import gzip
+import hashlib
+import json
+import mmap
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# Add parent directory to path for imports when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.fileio import atomic_write_bytes, atomic_write_text, file_lock
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+
+DEFAULT_PACK = "snapshots"
+PACK_NAME = f"{DEFAULT_PACK}.pack"
+INDEX_NAME = f"{DEFAULT_PACK}.idx"
+
+
+def content_hash(svg: Union[str, bytes]) -> str:
+    """Short SHA-256 of the SVG content, used as the object name"""
+    if isinstance(svg, str):
+        svg = svg.encode("utf-8")
+    return hashlib.sha256(svg).hexdigest()[:16]
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if not HAS_ZSTD:
+            raise RuntimeError("Snapshot is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    if codec == "none":
+        return data
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def default_codec() -> str:
+    return "zstd" if HAS_ZSTD else "gzip"
+
+
+class SnapshotPack:
+    """Append-only pack of compressed SVG snapshots with an offset index"""
+
+    def __init__(self, root: Path = Path("monkey_evolution"), codec: Optional[str] = None,
+                 name: str = DEFAULT_PACK):
+        self.root = Path(root)
+        self.pack_path = self.root / f"{name}.pack"
+        self.index_path = self.root / f"{name}.idx"
+        self.codec = codec or default_codec()
+
+        self._index: Optional[List[dict]] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+
+    def exists(self) -> bool:
+        return self.index_path.exists()
+
+    def __enter__(self) -> "SnapshotPack":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def entries(self) -> List[dict]:
+        """Index entries in append order (timestamp, hash, offset, length, codec)"""
+        if self._index is None:
+            self._index = []
+            if self.index_path.exists():
+                with open(self.index_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        try:
+                            self._index.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            # Torn trailing write; the blob it points to is unreferenced
+                            continue
+        return self._index
+
+    def timestamps(self) -> List[str]:
+        return sorted({entry["timestamp"] for entry in self.entries()})
+
+    def _by_timestamp(self) -> Dict[str, dict]:
+        return {entry["timestamp"]: entry for entry in self.entries()}
+
+    def _by_hash(self) -> Dict[str, dict]:
+        return {entry["hash"]: entry for entry in self.entries()}
+
+    def append(self, svg: str, timestamp: str, digest: Optional[str] = None) -> dict:
+        """
+        Add a snapshot; content already in the pack only adds an index line
+
+        The blob is fsynced before its index line is written, so a crash
+        can leave unreferenced bytes at the end of the pack, never an
+        index entry pointing at missing data.
+        """
+        data = svg.encode("utf-8")
+        digest = digest or content_hash(data)
+
+        with file_lock(self.root):
+            # Another process may have appended since we last read the index
+            self.close()
+            self._index = None
+
+            existing = self._by_hash().get(digest)
+            if existing:
+                entry = {**existing, "timestamp": timestamp}
+            else:
+                blob = compress(data, self.codec)
+                with open(self.pack_path, "ab") as f:
+                    offset = f.tell()
+                    f.write(blob)
+                    f.flush()
+                    os.fsync(f.fileno())
+                entry = {"timestamp": timestamp, "hash": digest, "offset": offset,
+                         "length": len(blob), "codec": self.codec}
+
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+            self._index.append(entry)
+        return entry
+
+    def drop(self, digests) -> int:
+        """
+        Rewrite the pack without the blobs (and index lines) of ``digests``
+
+        Kept blobs are copied as they are, not recompressed. The new pack
+        and index are written to temp files and renamed over the old ones.
+        Returns the number of blobs removed.
+        """
+        digests = set(digests)
+        with file_lock(self.root):
+            self.close()
+            self._index = None
+            entries = self.entries()
+            removed = {entry["hash"] for entry in entries if entry["hash"] in digests}
+            if not removed:
+                return 0
+
+            blobs = bytearray()
+            offsets: Dict[str, int] = {}
+            lines = []
+            with open(self.pack_path, "rb") as f:
+                for entry in entries:
+                    digest = entry["hash"]
+                    if digest in removed:
+                        continue
+                    if digest not in offsets:
+                        f.seek(entry["offset"])
+                        offsets[digest] = len(blobs)
+                        blobs += f.read(entry["length"])
+                    lines.append(json.dumps({**entry, "offset": offsets[digest]}) + "\n")
+
+            atomic_write_bytes(self.pack_path, bytes(blobs))
+            atomic_write_text(self.index_path, "".join(lines))
+            self._index = None
+        return len(removed)
+
+    def _view(self) -> mmap.mmap:
+        if self._mmap is None:
+            self._file = open(self.pack_path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mmap
+
+    def _read_entry(self, entry: dict) -> str:
+        view = self._view()
+        blob = view[entry["offset"]:entry["offset"] + entry["length"]]
+        return decompress(blob, entry.get("codec", "gzip")).decode("utf-8")
+
+    def read(self, timestamp: str) -> Optional[str]:
+        """SVG for a snapshot timestamp, or None"""
+        entry = self._by_timestamp().get(timestamp)
+        return self._read_entry(entry) if entry else None
+
+    def read_hash(self, digest: str) -> Optional[str]:
+        """SVG for a content hash, or None"""
+        entry = self._by_hash().get(digest)
+        return self._read_entry(entry) if entry else None
+
+    def iter(self) -> Iterator[Tuple[str, str]]:
+        """(timestamp, svg) for every snapshot, oldest first, through one mmap"""
+        by_timestamp = self._by_timestamp()
+        for timestamp in sorted(by_timestamp):
+            yield timestamp, self._read_entry(by_timestamp[timestamp])
+
+    def extract(self, output_dir: Path, timestamps: Optional[List[str]] = None,
+                objects: bool = False) -> int:
+        """
+        Write snapshots back out as loose files
+
+        By default as ``<timestamp>_monkey.svg``; with ``objects=True`` as
+        the content-addressed ``objects/<hash>.svg`` + ``manifest.json``
+        layout the web timeline reads. An existing ``manifest.json`` in
+        ``output_dir`` is updated, not replaced. Returns the number of
+        files written.
+        """
+        output_dir = Path(output_dir)
+        by_timestamp = self._by_timestamp()
+        selected = sorted(ts for ts in (by_timestamp if timestamps is None else timestamps) if ts in by_timestamp)
+        written = 0
+
+        if objects:
+            seen = set()
+            for timestamp in selected:
+                entry = by_timestamp[timestamp]
+                if entry["hash"] in seen:
+                    continue
+                seen.add(entry["hash"])
+                atomic_write_text(output_dir / "objects" / f"{entry['hash']}.svg", self._read_entry(entry))
+                written += 1
+            manifest_path = output_dir / "manifest.json"
+            snapshots = {}
+            if manifest_path.exists():
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    snapshots = json.load(f).get("snapshots", {})
+            snapshots.update({ts: by_timestamp[ts]["hash"] for ts in selected})
+            atomic_write_text(manifest_path, json.dumps({
+                "snapshots": dict(sorted(snapshots.items())),
+                "objects": len(set(snapshots.values())),
+            }, indent=2))
+            return written
+
+        for timestamp in selected:
+            atomic_write_text(output_dir / f"{timestamp}_monkey.svg", self._read_entry(by_timestamp[timestamp]))
+            written += 1
+        return written
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ForkMonkey snapshot pack tools")
+    parser.add_argument("--data-dir", default="monkey_evolution", help="Archive directory")
+    parser.add_argument("--name", default=DEFAULT_PACK, help="Pack name (e.g. 'retired' for compacted snapshots)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("list", help="List packed snapshots")
+
+    extract = sub.add_parser("extract", help="Write packed snapshots out as SVG files")
+    extract.add_argument("--output", default=".", help="Output directory")
+    extract.add_argument("--timestamp", action="append", help="Only this snapshot (repeatable)")
+    extract.add_argument("--objects", action="store_true", help="Write objects/<hash>.svg + manifest.json")
+
+    build = sub.add_parser("build", help="Pack all loose snapshots in the archive")
+    build.add_argument("--prune", action="store_true", help="Delete loose SVG files once packed")
+
+    args = parser.parse_args(argv)
+    root = Path(args.data_dir)
+
+    if args.command == "build":
+        from src.archive import SvgArchive
+        added = SvgArchive(root).pack_all(prune=args.prune)
+        print(f"✅ Packed {added} snapshots into {root / PACK_NAME}")
+        return
+
+    with SnapshotPack(root, name=args.name) as pack:
+        if not pack.exists():
+            print(f"ℹ️  No {pack.index_path} found")
+            return
+
+        if args.command == "list":
+            for entry in sorted(pack.entries(), key=lambda e: e["timestamp"]):
+                print(f"{entry['timestamp']}  {entry['hash']}  {entry['length']:>7,} bytes  {entry['codec']}")
+            size = pack.pack_path.stat().st_size if pack.pack_path.exists() else 0
+            print(f"\n{len(pack.timestamps())} snapshots, {len(pack._by_hash())} blobs, {size:,} bytes")
+        elif args.command == "extract":
+            timestamps = args.timestamp
+            if timestamps is None and args.name == DEFAULT_PACK:
+                # Only what the archive still lists, not snapshots retired by compaction
+                from src.archive import SvgArchive
+                archive = SvgArchive(root)
+                if archive.manifest_path.exists():
+                    timestamps = list(archive.load_manifest())
+            written = pack.extract(Path(args.output), timestamps, objects=args.objects)
+            print(f"✅ Extracted {written} files to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
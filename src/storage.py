@@ -1,7 +1,15 @@
 """
 ForkMonkey Storage
 
-Handles DNA storage in GitHub Secrets and history in files.
+Handles DNA storage in GitHub Secrets and local data through a pluggable
+backend (JSON files by default, SQLite via FORKMONKEY_STORAGE=sqlite,
+in-memory via FORKMONKEY_STORAGE=memory).
+
+The GitHub client is created lazily, only when fork detection or parent
+DNA actually need it, so local commands never touch the network. Set
+FORKMONKEY_OFFLINE=1 (or ``cli --offline``) to disable GitHub access.
+Requests go through the shared, rate-limit-aware access layer
+(src/github_client.py) at interactive priority.
 """
 
 import os
@@ -10,29 +18,78 @@ import base64
 from typing import Optional, Dict, List
 from datetime import datetime
 from pathlib import Path
-from github import Github, GithubException
 from src.genetics import MonkeyDNA, GeneticsEngine
+from src.backends import HistoryReader, StorageBackend, create_backend
+from src.github_client import INTERACTIVE, GitHubClient
+from src.http_cache import HttpCache, fetch_repo_file
+from src.summary import EMPTY_STREAK, HistorySummary
+
+
+def is_offline() -> bool:
+    """FORKMONKEY_OFFLINE: never contact the GitHub API"""
+    return os.getenv("FORKMONKEY_OFFLINE", "").lower() in ("1", "true", "yes")
 
 
 class MonkeyStorage:
     """Manages monkey data storage"""
     
-    def __init__(self, repo_name: Optional[str] = None, github_token: Optional[str] = None):
+    def __init__(self, repo_name: Optional[str] = None, github_token: Optional[str] = None,
+                 backend: Optional[StorageBackend] = None, offline: Optional[bool] = None,
+                 data_dir: Optional[Path] = None):
         self.repo_name = repo_name or os.getenv("GITHUB_REPOSITORY") or "test/repo"
         self.github_token = github_token or os.getenv("GITHUB_TOKEN")
+        self.offline = is_offline() if offline is None else offline
+        
+        self.data_dir = Path(data_dir) if data_dir else Path("monkey_data")
+        self.backend = backend or create_backend(None, self.data_dir)
+        if self.backend.persistent:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
         
-        self.data_dir = Path("monkey_data")
-        self.data_dir.mkdir(exist_ok=True)
+        # Scheduled GitHub access, shared with every other client of this token
+        self.github_client = GitHubClient(self.github_token, priority=INTERACTIVE)
         
-        # Initialize GitHub client if token available
-        self.github = None
-        self.repo = None
-        if self.github_token:
+        # ETag cache for repo content fetched over HTTP
+        self.http_cache = HttpCache(session=self.github_client)
+        
+        # GitHub client and repo handle, created on first use
+        self._github = None
+        self._repo = None
+        self._github_unavailable = False
+    
+    @property
+    def github(self):
+        """GitHub client, or None without a token, offline, or on failure"""
+        if self._github is None and not self._github_unavailable:
+            if self.offline or not self.github_token:
+                self._github_unavailable = True
+                return None
             try:
-                self.github = Github(self.github_token)
-                self.repo = self.github.get_repo(self.repo_name)
+                self._github = self.github_client.pygithub()
             except Exception as e:
                 print(f"⚠️  GitHub API not available: {e}")
+                self._github_unavailable = True
+        return self._github
+    
+    @github.setter
+    def github(self, client):
+        self._github = client
+    
+    @property
+    def repo(self):
+        """This monkey's repository (one API round trip on first access)"""
+        if self._repo is None and self.github is not None:
+            try:
+                self.github_client.wait()
+                self._repo = self.github.get_repo(self.repo_name)
+            except Exception as e:
+                print(f"⚠️  GitHub API not available: {e}")
+                self._github_unavailable = True
+                self._github = None
+        return self._repo
+    
+    @repo.setter
+    def repo(self, repo):
+        self._repo = repo
     
     def save_dna_to_secrets(self, dna: MonkeyDNA) -> bool:
         """
@@ -67,12 +124,9 @@ class MonkeyStorage:
         """Save DNA to local file"""
         try:
             dna_dict = GeneticsEngine.dna_to_dict(dna)
+            self.backend.write_document("dna", dna_dict)
             
-            dna_file = self.data_dir / "dna.json"
-            with open(dna_file, "w") as f:
-                json.dump(dna_dict, f, indent=2)
-            
-            print(f"✅ DNA saved to {dna_file}")
+            print(f"✅ DNA saved to {self.backend.describe('dna')}")
             return True
             
         except Exception as e:
@@ -82,17 +136,14 @@ class MonkeyStorage:
     def load_dna(self) -> Optional[MonkeyDNA]:
         """Load DNA from local file"""
         try:
-            dna_file = self.data_dir / "dna.json"
+            dna_dict = self.backend.read_document("dna")
             
-            if not dna_file.exists():
+            if dna_dict is None:
                 print("ℹ️  No DNA file found")
                 return None
             
-            with open(dna_file, "r") as f:
-                dna_dict = json.load(f)
-            
             dna = GeneticsEngine.dict_to_dna(dna_dict)
-            print(f"✅ DNA loaded from {dna_file}")
+            print(f"✅ DNA loaded from {self.backend.describe('dna')}")
             return dna
             
         except Exception as e:
@@ -108,38 +159,12 @@ class MonkeyStorage:
             svg_filename: Optional filename of the SVG snapshot (e.g., "2025-11-20_17-32_monkey.svg")
         """
         try:
-            history_file = self.data_dir / "history.json"
-            
-            # Load existing history
-            if history_file.exists():
-                with open(history_file, "r") as f:
-                    history = json.load(f)
-            else:
-                history = {"entries": []}
-            
-            # Add new entry
-            entry = {
-                "timestamp": datetime.now().isoformat(),
-                "dna_hash": dna.dna_hash,
-                "generation": dna.generation,
-                "mutation_count": dna.mutation_count,
-                "rarity_score": dna.get_rarity_score(),
-                "traits": {
-                    cat.value: trait.value
-                    for cat, trait in dna.traits.items()
-                },
-                "story": story
-            }
-            
-            # Add SVG filename if provided
-            if svg_filename:
-                entry["svg_filename"] = svg_filename
-            
-            history["entries"].append(entry)
-            
-            # Save
-            with open(history_file, "w") as f:
-                json.dump(history, f, indent=2)
+            entry = self.build_history_entry(dna, story, svg_filename)
+            summary = self.load_summary()
+            summary.record_entry(entry)
+            with self.backend.transaction():
+                self.backend.append_history(entry)
+                self.backend.write_document("summary", summary.model_dump())
             
             print(f"✅ History entry saved")
             return True
@@ -151,47 +176,64 @@ class MonkeyStorage:
     def get_history(self) -> List[dict]:
         """Get evolution history"""
         try:
-            history_file = self.data_dir / "history.json"
-            
-            if not history_file.exists():
-                return []
-            
-            with open(history_file, "r") as f:
-                history = json.load(f)
-            
-            return history.get("entries", [])
-            
+            return self.backend.read_history()
+        except Exception as e:
+            print(f"❌ Failed to load history: {e}")
+            return []
+    
+    def history_reader(self) -> HistoryReader:
+        """Streaming history access: tail(n), range(start, end), iter()"""
+        return HistoryReader(self.backend)
+    
+    def get_recent_history(self, limit: int) -> List[dict]:
+        """Get the last `limit` history entries without reading the whole history"""
+        try:
+            return self.backend.tail_history(limit)
         except Exception as e:
             print(f"❌ Failed to load history: {e}")
             return []
     
+    def export_history_json(self, output_path: Optional[Path] = None) -> bool:
+        """Export history as the legacy history.json consumed by the web"""
+        try:
+            output_path = Path(output_path) if output_path else self.data_dir / "history.json"
+            count = self.backend.export_history_json(output_path)
+            print(f"✅ Exported {count} history entries to {output_path}")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to export history: {e}")
+            return False
+    
+    def export_history_pages(self, output_dir: Optional[Path] = None, page_size: int = 100) -> bool:
+        """Export history as fixed-size page files with a manifest for the web"""
+        try:
+            output_dir = Path(output_dir) if output_dir else self.data_dir / "history"
+            manifest = self.history_reader().export_pages(output_dir, page_size)
+            print(f"✅ Exported {manifest['total']} history entries in {len(manifest['pages'])} pages to {output_dir}")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to export history pages: {e}")
+            return False
+    
+    def export_json(self, output_dir: Optional[Path] = None) -> bool:
+        """Export all monkey data as the plain JSON files GitHub Pages serves"""
+        try:
+            written = self.backend.export_json(Path(output_dir) if output_dir else self.data_dir)
+            print(f"✅ Exported {len(written)} files to {output_dir or self.data_dir}")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to export data: {e}")
+            return False
+    
     def save_stats(self, dna: MonkeyDNA, age_days: int = 0) -> bool:
         """Save monkey statistics"""
         try:
-            # Load existing stats to track streak
-            stats_file = self.data_dir / "stats.json"
-            streak = self._calculate_streak(stats_file)
-            
-            stats = {
-                "dna_hash": dna.dna_hash,
-                "generation": dna.generation,
-                "age_days": age_days,
-                "mutation_count": dna.mutation_count,
-                "rarity_score": dna.get_rarity_score(),
-                "parent_id": dna.parent_id,
-                "traits": {
-                    cat.value: {
-                        "value": trait.value,
-                        "rarity": trait.rarity.value
-                    }
-                    for cat, trait in dna.traits.items()
-                },
-                "streak": streak,
-                "last_updated": datetime.now().isoformat()
-            }
-            
-            with open(stats_file, "w") as f:
-                json.dump(stats, f, indent=2)
+            # Today counts towards the streak kept in the summary
+            summary = self.load_summary()
+            summary.record_day(datetime.now())
+            with self.backend.transaction():
+                self.backend.write_document("stats", self.build_stats(dna, age_days, summary.streak))
+                self.backend.write_document("summary", summary.model_dump())
             
             print(f"✅ Stats saved")
             return True
@@ -200,54 +242,84 @@ class MonkeyStorage:
             print(f"❌ Failed to save stats: {e}")
             return False
     
-    def _calculate_streak(self, stats_file: Path) -> dict:
-        """Calculate evolution streak from history"""
-        try:
-            # Load existing stats
-            if stats_file.exists():
-                with open(stats_file, "r") as f:
-                    old_stats = json.load(f)
-                old_streak = old_stats.get("streak", {"current": 0, "best": 0, "last_date": None})
-            else:
-                old_streak = {"current": 0, "best": 0, "last_date": None}
-            
-            today = datetime.now().date().isoformat()
-            last_date = old_streak.get("last_date")
-            
-            if last_date:
-                last = datetime.fromisoformat(last_date).date()
-                today_date = datetime.now().date()
-                diff = (today_date - last).days
-                
-                if diff == 0:
-                    # Same day, no streak change
-                    return old_streak
-                elif diff == 1:
-                    # Consecutive day, increment streak
-                    new_current = old_streak["current"] + 1
-                    new_best = max(new_current, old_streak["best"])
-                    return {"current": new_current, "best": new_best, "last_date": today}
-                else:
-                    # Streak broken
-                    return {"current": 1, "best": old_streak["best"], "last_date": today}
-            else:
-                # First time
-                return {"current": 1, "best": 1, "last_date": today}
-                
-        except Exception:
-            return {"current": 1, "best": 1, "last_date": datetime.now().date().isoformat()}
+    @staticmethod
+    def build_history_entry(dna: MonkeyDNA, story: str = "", svg_filename: Optional[str] = None) -> dict:
+        """Build a history entry for the given DNA"""
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "dna_hash": dna.dna_hash,
+            "generation": dna.generation,
+            "mutation_count": dna.mutation_count,
+            "rarity_score": dna.get_rarity_score(),
+            "traits": {
+                cat.value: trait.value
+                for cat, trait in dna.traits.items()
+            },
+            "story": story
+        }
+        
+        # Add SVG filename if provided
+        if svg_filename:
+            entry["svg_filename"] = svg_filename
+        
+        return entry
+    
+    @staticmethod
+    def build_stats(dna: MonkeyDNA, age_days: int, streak: dict) -> dict:
+        """Build the stats.json document for the given DNA"""
+        return {
+            "dna_hash": dna.dna_hash,
+            "generation": dna.generation,
+            "age_days": age_days,
+            "mutation_count": dna.mutation_count,
+            "rarity_score": dna.get_rarity_score(),
+            "parent_id": dna.parent_id,
+            "traits": {
+                cat.value: {
+                    "value": trait.value,
+                    "rarity": trait.rarity.value
+                }
+                for cat, trait in dna.traits.items()
+            },
+            "streak": streak,
+            "last_updated": datetime.now().isoformat()
+        }
+    
+    def load_summary(self) -> HistorySummary:
+        """Rolling history summary (O(1)); rebuilt from history if missing or stale"""
+        return load_summary(self.backend, self.backend.read_document("summary"))
     
     def get_streak(self) -> dict:
         """Get current streak information"""
         try:
-            stats_file = self.data_dir / "stats.json"
-            if stats_file.exists():
-                with open(stats_file, "r") as f:
-                    stats = json.load(f)
-                return stats.get("streak", {"current": 0, "best": 0, "last_date": None})
+            return self.load_summary().streak
         except Exception:
-            pass
-        return {"current": 0, "best": 0, "last_date": None}
+            return dict(EMPTY_STREAK)
+    
+    def session(self) -> "StorageSession":
+        """Open a unit of work: load each document once, flush once on exit"""
+        return StorageSession(self)
+    
+    def save_achievements(self, achievements: List[Dict]) -> bool:
+        """Save unlocked achievements"""
+        try:
+            self.backend.write_document("achievements", {
+                "unlocked": achievements,
+                "updated_at": datetime.utcnow().isoformat()
+            })
+            return True
+        except Exception as e:
+            print(f"❌ Failed to save achievements: {e}")
+            return False
+    
+    def load_achievements(self) -> List[Dict]:
+        """Load unlocked achievements"""
+        try:
+            data = self.backend.read_document("achievements")
+            return data.get("unlocked", []) if data else []
+        except Exception as e:
+            print(f"❌ Failed to load achievements: {e}")
+            return []
     
     def detect_fork(self) -> Optional[str]:
         """
@@ -272,24 +344,27 @@ class MonkeyStorage:
         """
         Fetch parent monkey's DNA from parent repository
         
+        Goes through the on-disk HTTP cache: repeated calls revalidate with
+        the stored ETag, and a 304 is served from disk without using rate
+        limit.
+        
         Args:
             parent_repo: Full repo name (owner/repo)
         """
-        if not self.github:
-            print("⚠️  GitHub API not available")
+        if self.offline:
+            print("⚠️  GitHub API not available (offline)")
             return None
         
         try:
-            parent = self.github.get_repo(parent_repo)
-            
-            # Try to get DNA file from parent
-            content = parent.get_contents("monkey_data/dna.json")
-            dna_json = content.decoded_content.decode()
-            dna_dict = json.loads(dna_json)
+            content = fetch_repo_file(parent_repo, "monkey_data/dna.json", self.github_token, cache=self.http_cache)
+            if content is None:
+                print(f"⚠️  Parent {parent_repo} has no monkey_data/dna.json")
+                return None
             
+            dna_dict = json.loads(content.decode())
             return GeneticsEngine.dict_to_dna(dna_dict)
             
-        except GithubException as e:
+        except Exception as e:
             print(f"⚠️  Failed to fetch parent DNA: {e}")
             return None
     
@@ -325,6 +400,142 @@ class MonkeyStorage:
         return child_dna
 
 
+def load_summary(backend: StorageBackend, document: Optional[dict]) -> HistorySummary:
+    """
+    Summary from its stored document, checked against the history tail
+    
+    The last timestamp is compared with tail_history(1) (cheap on every
+    backend); a missing or stale summary, e.g. from before summaries
+    existed, is rebuilt in one pass and saved with the next write.
+    """
+    if document is not None:
+        summary = HistorySummary(**document)
+        last = backend.tail_history(1)
+        if summary.last_timestamp == (last[0].get("timestamp") if last else None):
+            return summary
+    
+    stats = backend.read_document("stats") or {}
+    return HistorySummary.build(backend.iter_history(), streak=stats.get("streak"))
+
+
+class StorageSession:
+    """
+    Unit of work over MonkeyStorage
+    
+    Each document is read from the backend at most once and cached; writes
+    and new history entries are buffered and flushed in a single backend
+    transaction by commit(). Use as a context manager: the session commits
+    on a clean exit and discards everything if an exception escapes. A
+    failed commit on exit raises, so the command does not report success.
+    """
+    
+    def __init__(self, storage: MonkeyStorage):
+        self.storage = storage
+        self.backend = storage.backend
+        self._documents: Dict[str, Optional[dict]] = {}
+        self._dirty: set = set()
+        self._pending_history: List[dict] = []
+        self._metadata: Optional[HistorySummary] = None
+        self._dna: Optional[MonkeyDNA] = None
+    
+    def __enter__(self) -> "StorageSession":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self._flush()
+        return False
+    
+    def document(self, name: str) -> Optional[dict]:
+        """Read a document, hitting the backend only the first time"""
+        if name not in self._documents:
+            self._documents[name] = self.backend.read_document(name)
+        return self._documents[name]
+    
+    def set_document(self, name: str, data: dict):
+        self._documents[name] = data
+        self._dirty.add(name)
+    
+    @property
+    def metadata(self) -> HistorySummary:
+        """Entry count, first/last timestamp, active days and streak (O(1), loaded once)"""
+        if self._metadata is None:
+            self._metadata = load_summary(self.backend, self.document("summary"))
+        return self._metadata
+    
+    def load_dna(self) -> Optional[MonkeyDNA]:
+        if self._dna is None:
+            dna_dict = self.document("dna")
+            if dna_dict is None:
+                print("ℹ️  No DNA file found")
+                return None
+            self._dna = GeneticsEngine.dict_to_dna(dna_dict)
+        return self._dna
+    
+    def save_dna(self, dna: MonkeyDNA):
+        self._dna = dna
+        self.set_document("dna", GeneticsEngine.dna_to_dict(dna))
+    
+    def save_stats(self, dna: MonkeyDNA, age_days: Optional[int] = None):
+        """Stage stats.json; age defaults to the session's entry count"""
+        metadata = self.metadata
+        metadata.record_day(datetime.now())
+        if age_days is None:
+            age_days = metadata.age_days
+        
+        self.set_document("stats", MonkeyStorage.build_stats(dna, age_days, metadata.streak))
+        self.set_document("summary", metadata.model_dump())
+    
+    def add_history_entry(self, dna: MonkeyDNA, story: str = "", svg_filename: Optional[str] = None) -> dict:
+        entry = MonkeyStorage.build_history_entry(dna, story, svg_filename)
+        metadata = self.metadata
+        
+        self._pending_history.append(entry)
+        metadata.record_entry(entry)
+        self.set_document("summary", metadata.model_dump())
+        return entry
+    
+    def recent_history(self, limit: int) -> List[dict]:
+        """Last `limit` entries, including ones not yet committed"""
+        if limit <= 0:
+            return []
+        pending = self._pending_history[-limit:]
+        missing = limit - len(pending)
+        stored = self.backend.tail_history(missing) if missing > 0 else []
+        return stored + pending
+    
+    def get_streak(self) -> dict:
+        return self.metadata.streak
+    
+    def commit(self) -> bool:
+        """Flush all changed documents and new history in one transaction"""
+        try:
+            self._flush()
+        except Exception as e:
+            print(f"❌ Failed to save monkey data: {e}")
+            return False
+        return True
+    
+    def _flush(self):
+        """commit() without the error handling; raises if the transaction fails"""
+        if not self._dirty and not self._pending_history:
+            return
+        
+        with self.backend.transaction():
+            for name in sorted(self._dirty):
+                self.backend.write_document(name, self._documents[name])
+            for entry in self._pending_history:
+                self.backend.append_history(entry)
+        
+        saved = sorted(self._dirty)
+        if self._pending_history:
+            saved.append(f"history (+{len(self._pending_history)})")
+        print(f"✅ Saved {', '.join(saved)}")
+        
+        self._dirty.clear()
+        self._pending_history = []
+
+
 def main():
     """Test storage system"""
     from src.genetics import GeneticsEngine
@@ -0,0 +1,166 @@
+"""
+ForkMonkey History Summary
+
+A small rolling summary of the evolution history, stored as the
+``summary`` document next to ``dna`` and ``stats``:
+
+- entry count and first/last timestamp
+- a per-day activity bitmap (bit i = the monkey was active on
+  ``first_day + i``), stored as a hex string
+- streak state (current, best, last_date)
+- all-time aggregates: total mutations, rarity max/min
+
+It is updated incrementally on every history append (and every stats
+save), so age, streak and "active since" are O(1) reads instead of a
+scan over the whole history.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Iterator, Optional
+
+from pydantic import BaseModel, Field
+
+
+EMPTY_STREAK = {"current": 0, "best": 0, "last_date": None}
+
+
+def _day(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value)).date()
+    except ValueError:
+        return None
+
+
+def iter_days(first_day, days: str) -> Iterator[date]:
+    """Active days encoded in a bitmap relative to ``first_day``, oldest first"""
+    start = _day(first_day)
+    if start is None:
+        return
+    mask = int(days, 16)
+    offset = 0
+    while mask:
+        if mask & 1:
+            yield start + timedelta(days=offset)
+        mask >>= 1
+        offset += 1
+
+
+class HistorySummary(BaseModel):
+    """Rolling aggregates over the history, maintained on append"""
+    entry_count: int = 0
+    first_timestamp: Optional[str] = None
+    last_timestamp: Optional[str] = None
+    first_day: Optional[str] = None
+    days: str = "0"
+    streak: Dict = Field(default_factory=lambda: dict(EMPTY_STREAK))
+    # All-time aggregates, exact even after compaction drops entries
+    total_mutations: int = 0
+    rarity_max: Optional[float] = None
+    rarity_min: Optional[float] = None
+    last_mutation_count: Optional[int] = None
+
+    @property
+    def age_days(self) -> int:
+        """Age in days, one evolution per day"""
+        return self.entry_count
+
+    @property
+    def active_days(self) -> int:
+        """Number of distinct days with activity"""
+        return bin(int(self.days, 16)).count("1")
+
+    def is_active(self, day) -> bool:
+        day = _day(day)
+        if day is None or self.first_day is None:
+            return False
+        offset = (day - _day(self.first_day)).days
+        return offset >= 0 and bool(int(self.days, 16) >> offset & 1)
+
+    def record_day(self, day) -> None:
+        """Mark ``day`` active and advance the streak"""
+        day = _day(day)
+        if day is None:
+            return
+
+        # Bitmap: rebase if the day precedes the current start
+        mask = int(self.days, 16)
+        if self.first_day is None:
+            self.first_day = day.isoformat()
+        start = _day(self.first_day)
+        offset = (day - start).days
+        if offset < 0:
+            mask <<= -offset
+            self.first_day = day.isoformat()
+            offset = 0
+        self.days = format(mask | (1 << offset), "x")
+
+        # Streak: consecutive active days, same-day and older days are no-ops
+        streak = dict(self.streak)
+        last = _day(streak.get("last_date"))
+        if last is None:
+            streak = {"current": 1, "best": max(streak.get("best", 0), 1), "last_date": day.isoformat()}
+        else:
+            diff = (day - last).days
+            if diff == 1:
+                current = streak.get("current", 0) + 1
+                streak = {"current": current, "best": max(current, streak.get("best", 0)), "last_date": day.isoformat()}
+            elif diff > 1:
+                streak = {"current": 1, "best": streak.get("best", 0), "last_date": day.isoformat()}
+        self.streak = streak
+
+    def record_entry(self, entry: dict) -> None:
+        """
+        Fold one new history entry into the summary
+
+        Entries left by compaction carry a ``folded`` record describing
+        the entries merged into them, so a rebuild keeps exact counts.
+        """
+        timestamp = entry.get("timestamp")
+        folded = entry.get("folded") or {}
+
+        self.entry_count += 1 + folded.get("count", 0)
+        if self.first_timestamp is None:
+            self.first_timestamp = folded.get("first_timestamp") or timestamp
+        self.last_timestamp = timestamp
+        for day in iter_days(folded.get("first_day"), folded.get("days", "0")):
+            self.record_day(day)
+        self.record_day(timestamp)
+
+        # Mutation counts are cumulative per DNA; a drop means a new lineage
+        count = entry.get("mutation_count")
+        if count is not None:
+            previous = self.last_mutation_count
+            if previous is None or count < previous:
+                self.total_mutations += count
+            else:
+                self.total_mutations += count - previous
+            self.last_mutation_count = count
+
+        rarities = [r for r in (entry.get("rarity_score"), folded.get("rarity_min"), folded.get("rarity_max"))
+                    if r is not None]
+        if rarities:
+            self.rarity_max = max(rarities + ([self.rarity_max] if self.rarity_max is not None else []))
+            self.rarity_min = min(rarities + ([self.rarity_min] if self.rarity_min is not None else []))
+
+    @classmethod
+    def build(cls, entries: Iterable[dict], streak: Optional[dict] = None) -> "HistorySummary":
+        """
+        Full rebuild from history (one pass)
+
+        ``streak`` seeds the streak state, e.g. from a legacy stats.json
+        that already tracked it.
+        """
+        summary = cls()
+        for entry in entries:
+            summary.record_entry(entry)
+        seeded = _day(streak.get("last_date")) if streak else None
+        ours = _day(summary.streak.get("last_date"))
+        if seeded and (ours is None or seeded >= ours):
+            summary.streak = dict(streak)
+        return summary
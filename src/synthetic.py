@@ -0,0 +1,259 @@
+"""
+ForkMonkey Synthetic Data
+
+Deterministic fixture generators for tests and benchmarks:
+
+- ``synthetic_monkey``: a monkey with N days (or years) of daily
+  evolutions. History, DNA, stats and summary are stored in memory by
+  default, and snapshots can optionally go into an SVG archive.
+- ``synthetic_zoo``: many such monkeys as workspaces on disk, for
+  ``cli --all`` runs.
+- ``synthetic_community``: a fork network of PyGithub-shaped fake repos.
+  ``scan_community`` can crawl it without touching the network.
+
+The same seed always produces the same data. Generation is driven by the
+real genetics engine and visualizer.
+
+Usage:
+    python src/synthetic.py monkey --years 5 --output /tmp/old-monkey
+    python src/synthetic.py zoo --monkeys 1000 --days 90 --output /tmp/zoo
+"""
+
+import sys
+import json
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Add parent directory to path for imports when run as a script
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.archive import SvgArchive
+from src.backends import MemoryBackend
+from src.genetics import GeneticsEngine, MonkeyDNA
+from src.render_cache import git_blob_sha
+from src.storage import MonkeyStorage
+from src.summary import HistorySummary
+from src.visualizer import MonkeyVisualizer
+from src.workspace import Workspace
+
+
+DEFAULT_START = datetime(2024, 1, 1, 12, 0)
+
+
+@contextmanager
+def seeded(seed: int) -> Iterator[None]:
+    """Seed the global RNG the genetics engine uses, restoring it afterwards"""
+    state = random.getstate()
+    random.seed(seed)
+    try:
+        yield
+    finally:
+        random.setstate(state)
+
+
+def synthetic_evolutions(days: int, seed: int = 0, start: datetime = DEFAULT_START,
+                         breed_every: Optional[int] = None) -> Iterator[Tuple[datetime, MonkeyDNA]]:
+    """
+    (timestamp, dna) for ``days`` consecutive daily evolutions
+
+    With ``breed_every``, the monkey is replaced by its child every that
+    many days, so the history spans several generations.
+    """
+    with seeded(seed):
+        dna = GeneticsEngine.generate_random_dna()
+        for day in range(days):
+            if day and breed_every and day % breed_every == 0:
+                dna = GeneticsEngine.breed(dna)
+            elif day:
+                dna = GeneticsEngine.evolve(dna)
+            yield start + timedelta(days=day), dna
+
+
+def synthetic_monkey(days: int = 365, seed: int = 0, storage: Optional[MonkeyStorage] = None,
+                     archive: Optional[SvgArchive] = None, start: datetime = DEFAULT_START,
+                     breed_every: Optional[int] = None) -> MonkeyStorage:
+    """
+    A monkey with one evolution per day for ``days`` days
+
+    Writes history, dna, stats and summary to ``storage`` (a fresh
+    in-memory one by default) in a single transaction. With ``archive``,
+    every day's SVG is stored as a snapshot as well.
+    """
+    storage = storage or MonkeyStorage(backend=MemoryBackend(), offline=True)
+    summary = HistorySummary()
+    dna = None
+
+    with storage.backend.transaction():
+        for timestamp, dna in synthetic_evolutions(days, seed, start, breed_every):
+            svg_filename = None
+            if archive is not None:
+                svg_filename = archive.store(MonkeyVisualizer.generate_svg(dna), timestamp.strftime("%Y-%m-%d_%H-%M"))
+            entry = MonkeyStorage.build_history_entry(dna, f"Day {summary.entry_count + 1}", svg_filename)
+            entry["timestamp"] = timestamp.isoformat()
+            summary.record_entry(entry)
+            storage.backend.append_history(entry)
+
+        if dna is not None:
+            stats = MonkeyStorage.build_stats(dna, summary.age_days, summary.streak)
+            stats["last_updated"] = summary.last_timestamp
+            storage.backend.write_document("dna", GeneticsEngine.dna_to_dict(dna))
+            storage.backend.write_document("stats", stats)
+        storage.backend.write_document("summary", summary.model_dump())
+
+    return storage
+
+
+def synthetic_zoo(root: Path, monkeys: int, days: int = 30, seed: int = 0,
+                  snapshots: bool = False) -> List[Workspace]:
+    """``monkeys`` workspaces under ``root`` (monkey-0000, ...), each with ``days`` of history"""
+    workspaces = []
+    for i in range(monkeys):
+        ws = Workspace(Path(root) / f"monkey-{i:04d}")
+        synthetic_monkey(days, seed + i, storage=ws.storage(offline=True),
+                         archive=ws.archive() if snapshots else None)
+        workspaces.append(ws)
+    return workspaces
+
+
+class SyntheticNotFound(Exception):
+    """Raised like PyGithub's 404 for files a synthetic repo does not have"""
+    status = 404
+
+
+class SyntheticForks:
+    """The slice of PyGithub's PaginatedList that the scanner uses"""
+
+    per_page = 30
+
+    def __init__(self, repos: List["SyntheticRepo"]):
+        self.repos = repos
+
+    @property
+    def totalCount(self) -> int:
+        return len(self.repos)
+
+    def get_page(self, page: int) -> List["SyntheticRepo"]:
+        return self.repos[page * self.per_page:(page + 1) * self.per_page]
+
+    def __iter__(self):
+        return iter(self.repos)
+
+
+class SyntheticRepo:
+    """A fake GitHub repository with the attributes scan_community reads"""
+
+    def __init__(self, owner: str, name: str, created_at: datetime, parent: Optional["SyntheticRepo"] = None,
+                 files: Optional[Dict[str, str]] = None):
+        self.owner = SimpleNamespace(login=owner)
+        self.name = name
+        self.full_name = f"{owner}/{name}"
+        self.html_url = f"https://github.com/{self.full_name}"
+        self.parent = parent
+        self.fork = parent is not None
+        self.created_at = created_at
+        self.updated_at = created_at
+        self.pushed_at = created_at
+        self.files = files or {}
+        self.forks: List["SyntheticRepo"] = []
+
+    @property
+    def forks_count(self) -> int:
+        return len(self.forks)
+
+    def get_forks(self) -> SyntheticForks:
+        return SyntheticForks(self.forks)
+
+    def get_contents(self, path: str):
+        if path not in self.files:
+            # A directory lists its files, like the Contents API
+            listing = [self._file(name) for name in sorted(self.files) if name.startswith(path + "/")]
+            if not listing:
+                raise SyntheticNotFound(f"{self.full_name}: {path} not found")
+            return listing
+        return self._file(path)
+
+    def _file(self, path: str):
+        content = self.files[path].encode("utf-8")
+        return SimpleNamespace(path=path, name=path.rsplit("/", 1)[-1], decoded_content=content,
+                               size=len(content), sha=git_blob_sha(content))
+
+    def __repr__(self) -> str:
+        return f"SyntheticRepo({self.full_name!r})"
+
+
+def _monkey_files(dna: MonkeyDNA, age_days: int, updated: datetime) -> Dict[str, str]:
+    stats = MonkeyStorage.build_stats(dna, age_days, {})
+    stats["last_updated"] = updated.isoformat()
+    return {
+        "monkey_data/dna.json": json.dumps(GeneticsEngine.dna_to_dict(dna)),
+        "monkey_data/stats.json": json.dumps(stats),
+        "monkey_data/monkey.svg": MonkeyVisualizer.generate_svg(dna),
+    }
+
+
+def synthetic_community(forks: int, seed: int = 0, max_depth: int = 3, monkey_ratio: float = 0.9,
+                        now: Optional[datetime] = None) -> SyntheticRepo:
+    """
+    A fork network of ``forks`` repos below a root, returned as the root
+
+    Each fork picks a random parent no deeper than ``max_depth - 1`` and
+    breeds its monkey from the parent's. A ``1 - monkey_ratio`` share of
+    forks have no monkey files, like forks that never ran the workflow.
+    """
+    now = now or datetime(2025, 1, 1, tzinfo=timezone.utc)
+    with seeded(seed):
+        root_dna = GeneticsEngine.generate_random_dna()
+        root = SyntheticRepo("forkmonkey", "forkMonkey", now - timedelta(days=400), files=_monkey_files(root_dna, 400, now))
+        nodes = [(root, root_dna, 0)]
+
+        for i in range(forks):
+            parent, parent_dna, depth = random.choice([n for n in nodes if n[2] < max_depth] or nodes[:1])
+            age = random.randint(0, 365)
+            dna = GeneticsEngine.breed(parent_dna)
+            files = _monkey_files(dna, age, now) if random.random() < monkey_ratio else {}
+            repo = SyntheticRepo(f"user{i:05d}", "forkMonkey", now - timedelta(days=age), parent, files)
+            parent.forks.append(repo)
+            nodes.append((repo, dna, depth + 1))
+
+    return root
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate synthetic ForkMonkey data")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    monkey = sub.add_parser("monkey", help="One monkey with long history")
+    monkey.add_argument("--output", required=True, help="Workspace directory to create")
+    monkey.add_argument("--days", type=int, default=None, help="Days of history")
+    monkey.add_argument("--years", type=float, default=1, help="Years of history (if --days is not given)")
+    monkey.add_argument("--breed-every", type=int, default=None, help="Start a new generation every N days")
+    monkey.add_argument("--snapshots", action="store_true", help="Also archive an SVG per day")
+
+    zoo = sub.add_parser("zoo", help="Many monkeys side by side, for --all")
+    zoo.add_argument("--output", required=True, help="Zoo directory to create")
+    zoo.add_argument("--monkeys", type=int, default=100, help="Number of monkeys")
+    zoo.add_argument("--days", type=int, default=30, help="Days of history per monkey")
+    zoo.add_argument("--snapshots", action="store_true", help="Also archive an SVG per day")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "monkey":
+        ws = Workspace(Path(args.output))
+        days = args.days or int(args.years * 365)
+        synthetic_monkey(days, args.seed, storage=ws.storage(offline=True),
+                         archive=ws.archive() if args.snapshots else None, breed_every=args.breed_every)
+        print(f"✅ Generated {days} days of history in {ws.root}")
+    elif args.command == "zoo":
+        synthetic_zoo(Path(args.output), args.monkeys, args.days, args.seed, args.snapshots)
+        print(f"✅ Generated {args.monkeys} monkeys in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+ForkMonkey Workspaces
+
+A workspace is one monkey's directory: ``monkey_data/``,
+``monkey_evolution/`` and ``README.md`` under a common root. A fork is a
+single workspace rooted at the repository checkout. A zoo host keeps
+thousands of them side by side and runs commands across all of them with
+a worker pool.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from pydantic import BaseModel
+
+from src.archive import SvgArchive
+from src.storage import MonkeyStorage
+
+
+class Workspace:
+    """Paths for one monkey, relative to a configurable root"""
+
+    def __init__(self, root: Path = Path(".")):
+        self.root = Path(root)
+        self.data_dir = self.root / "monkey_data"
+        self.svg_path = self.data_dir / "monkey.svg"
+        self.archive_dir = self.root / "monkey_evolution"
+        self.readme_path = self.root / "README.md"
+
+    @classmethod
+    def from_env(cls) -> "Workspace":
+        """FORKMONKEY_WORKSPACE, or the current directory"""
+        return cls(Path(os.getenv("FORKMONKEY_WORKSPACE", ".")))
+
+    @property
+    def name(self) -> str:
+        return self.root.resolve().name
+
+    def is_monkey(self) -> bool:
+        return self.data_dir.is_dir()
+
+    def storage(self, **kwargs) -> MonkeyStorage:
+        return MonkeyStorage(data_dir=self.data_dir, **kwargs)
+
+    def archive(self) -> SvgArchive:
+        return SvgArchive(self.archive_dir)
+
+    def __repr__(self) -> str:
+        return f"Workspace({str(self.root)!r})"
+
+
+def discover_workspaces(zoo_root: Path) -> List[Workspace]:
+    """Every direct subdirectory of ``zoo_root`` that holds a monkey, sorted by name"""
+    zoo_root = Path(zoo_root)
+    found = []
+    with os.scandir(zoo_root) as entries:
+        for entry in entries:
+            if entry.is_dir() and os.path.isdir(os.path.join(entry.path, "monkey_data")):
+                found.append(Workspace(Path(entry.path)))
+    return sorted(found, key=lambda ws: ws.root.name)
+
+
+class WorkspaceResult(BaseModel):
+    """Outcome of running a command in one workspace"""
+    workspace: str
+    ok: bool
+    message: str = ""
+    seconds: float = 0.0
+
+
+def _run_one(task: Callable[[str], str], root: str) -> WorkspaceResult:
+    start = time.perf_counter()
+    try:
+        message = task(root)
+        ok = True
+    except Exception as e:
+        message = f"{type(e).__name__}: {e}"
+        ok = False
+    return WorkspaceResult(workspace=root, ok=ok, message=message or "", seconds=time.perf_counter() - start)
+
+
+def run_across(workspaces: List[Workspace], task: Callable[[str], str],
+               workers: Optional[int] = None) -> List[WorkspaceResult]:
+    """
+    Run ``task(root)`` for every workspace, in input order
+
+    ``task`` must be picklable (a module-level function or a partial of
+    one) and signal failure by raising. With ``workers=1`` everything runs
+    in this process; otherwise a process pool is used, with tasks handed
+    out in chunks to keep scheduling overhead low across thousands of
+    monkeys.
+    """
+    roots = [str(ws.root) for ws in workspaces]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(roots) <= 1:
+        return [_run_one(task, root) for root in roots]
+
+    chunksize = max(1, len(roots) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_run_one, [task] * len(roots), roots, chunksize=chunksize))
@@ -36,6 +36,14 @@ def temp_monkey_dir(temp_dir: Path) -> Path:
     return monkey_dir
 
 
+@pytest.fixture
+def memory_storage():
+    """MonkeyStorage on the in-memory backend, no disk or network access."""
+    from src.backends import MemoryBackend
+    from src.storage import MonkeyStorage
+    return MonkeyStorage(backend=MemoryBackend(), offline=True)
+
+
 # =============================================================================
 # DNA Fixtures
 # =============================================================================
@@ -0,0 +1,115 @@
+"""
+Tests for the content-addressed SVG archive
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+from src.archive import SvgArchive, content_hash, rewrite_svg_references
+from src.backends import create_backend
+
+
+SVG_A = "<svg>a</svg>"
+SVG_B = "<svg>b</svg>"
+
+
+class TestSvgArchive:
+    """Test storing and resolving snapshots"""
+
+    def test_identical_snapshots_stored_once(self, temp_dir):
+        """Test byte-identical SVGs share one object"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+
+        first = archive.store(SVG_A, "2025-01-01_00-00")
+        second = archive.store(SVG_A, "2025-01-02_00-00")
+        third = archive.store(SVG_B, "2025-01-03_00-00")
+
+        assert first == second == f"objects/{content_hash(SVG_A)}.svg"
+        assert third != first
+        assert len(list(archive.objects_dir.glob("*.svg"))) == 2
+        assert list(archive.load_manifest()) == ["2025-01-01_00-00", "2025-01-02_00-00", "2025-01-03_00-00"]
+        assert (archive.root / first).read_text() == SVG_A
+
+    def test_snapshots_include_legacy_files(self, temp_dir):
+        """Test snapshots() lists archived and unmigrated files in order"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        archive.store(SVG_B, "2025-01-02_00-00")
+        (archive.root / "2025-01-01_00-00_monkey.svg").write_text(SVG_A)
+
+        assert [ts for ts, _ in archive.snapshots()] == ["2025-01-01_00-00", "2025-01-02_00-00"]
+
+
+class TestMigration:
+    """Test moving legacy timestamped files into the object store"""
+
+    def test_migrate_dedupes_and_resolves(self, temp_dir):
+        """Test legacy files become objects and old names still resolve"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        archive.root.mkdir()
+        for name, svg in [("2025-01-01_00-00", SVG_A), ("2025-01-02_00-00", SVG_A), ("2025-01-03_00-00", SVG_B)]:
+            (archive.root / f"{name}_monkey.svg").write_text(svg)
+        (archive.root / "evolution.gif").write_bytes(b"GIF")
+
+        mapping = archive.migrate()
+
+        assert len(mapping) == 3
+        assert len(set(mapping.values())) == 2
+        assert not list(archive.root.glob("*_monkey.svg"))
+        assert (archive.root / "evolution.gif").exists()
+        assert archive.resolve("2025-01-02_00-00_monkey.svg").read_text() == SVG_A
+        assert archive.migrate() == {}
+
+    @pytest.mark.parametrize("kind", ["file", "sqlite"])
+    def test_history_references_rewritten(self, temp_dir, kind):
+        """Test history entries are pointed at the new object names"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        archive.root.mkdir()
+        (archive.root / "2025-01-01_00-00_monkey.svg").write_text(SVG_A)
+
+        backend = create_backend(kind, temp_dir / "monkey_data")
+        backend.append_history({"timestamp": "2025-01-01T00:00:00", "svg_filename": "2025-01-01_00-00_monkey.svg"})
+        backend.append_history({"timestamp": "2025-01-02T00:00:00"})
+
+        mapping = archive.migrate()
+        changed = backend.rewrite_history(lambda entry: rewrite_svg_references(entry, mapping))
+
+        assert changed == 1
+        assert backend.read_history()[0]["svg_filename"] == f"objects/{content_hash(SVG_A)}.svg"
+        assert "svg_filename" not in backend.read_history()[1]
+
+    def test_prune_unreferenced(self, temp_dir):
+        """Test prune() drops objects missing from the manifest"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        archive.store(SVG_A, "2025-01-01_00-00")
+        (archive.objects_dir / "deadbeef.svg").write_text(SVG_B)
+
+        assert archive.prune() == 1
+        assert len(list(archive.objects_dir.glob("*.svg"))) == 1
+
+    @pytest.mark.parametrize("packed", [False, True])
+    def test_same_minute_snapshots_survive_prune(self, temp_dir, packed):
+        """Test two snapshots stored in one minute both stay listed and on disk"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        if packed:
+            archive.pack_all()
+        first = archive.store(SVG_A, "2025-01-01_00-00")
+        second = archive.store(SVG_B, "2025-01-01_00-00")
+        assert archive.store(SVG_B, "2025-01-01_00-00") == second
+
+        assert archive.load_manifest() == {"2025-01-01_00-00": content_hash(SVG_A),
+                                           "2025-01-01_00-00.1": content_hash(SVG_B)}
+        assert archive.prune(keep=[first, second]) == 0
+        assert archive.read(first) == SVG_A
+        assert archive.read(second) == SVG_B
+        assert [svg for _, svg in archive.iter_svgs()] == [SVG_A, SVG_B]
+
+    def test_prune_keeps_history_references(self, temp_dir):
+        """Test an object history points at is kept even if the manifest lost it"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        archive.store(SVG_A, "2025-01-01_00-00")
+        orphan = archive.object_name("deadbeef")
+        (archive.root / orphan).write_text(SVG_B)
+
+        assert archive.prune(keep=[orphan]) == 0
+        assert (archive.root / orphan).exists()
@@ -0,0 +1,227 @@
+"""
+Tests for pluggable storage backends
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+from src.backends import FileBackend, HistoryReader, MemoryBackend, SQLiteBackend, create_backend, copy_backend
+from src.genetics import GeneticsEngine
+from src.storage import MonkeyStorage
+
+
+def _entry(i: int, generation: int = 1) -> dict:
+    return {"timestamp": f"2025-01-{i + 1:02d}T00:00:00", "generation": generation, "story": f"Day {i}"}
+
+
+@pytest.fixture(params=["file", "sqlite", "memory"])
+def backend(request, temp_dir):
+    """Each backend implementation in a fresh directory"""
+    return create_backend(request.param, temp_dir / "monkey_data")
+
+
+class TestBackendContract:
+    """Behaviour every backend must provide"""
+
+    def test_documents_roundtrip(self, backend):
+        """Test writing and reading documents"""
+        assert backend.read_document("dna") is None
+
+        backend.write_document("dna", {"dna_hash": "abc"})
+        backend.write_document("dna", {"dna_hash": "def"})
+
+        assert backend.read_document("dna") == {"dna_hash": "def"}
+
+    def test_history_order_and_tail(self, backend):
+        """Test history is kept in append order"""
+        for i in range(5):
+            backend.append_history(_entry(i))
+
+        assert [e["story"] for e in backend.read_history()] == [f"Day {i}" for i in range(5)]
+        assert [e["story"] for e in backend.tail_history(2)] == ["Day 3", "Day 4"]
+        assert backend.history_count() == 5
+
+    def test_history_range_and_iter(self, backend):
+        """Test index ranges and streaming iteration"""
+        for i in range(5):
+            backend.append_history(_entry(i))
+
+        assert [e["story"] for e in backend.history_range(1, 3)] == ["Day 1", "Day 2"]
+        assert [e["story"] for e in backend.history_range(3)] == ["Day 3", "Day 4"]
+        assert [e["story"] for e in backend.iter_history()] == [f"Day {i}" for i in range(5)]
+
+    def test_history_reader(self, backend, temp_dir):
+        """Test the reader facade and paged export"""
+        for i in range(5):
+            backend.append_history(_entry(i))
+
+        reader = HistoryReader(backend)
+        assert len(reader) == 5
+        assert [e["story"] for e in reader.tail(1)] == ["Day 4"]
+
+        manifest = reader.export_pages(temp_dir / "pages", page_size=2)
+        assert [p["count"] for p in manifest["pages"]] == [2, 2, 1]
+
+    def test_history_queries(self, backend):
+        """Test timestamp and generation queries"""
+        for i in range(6):
+            backend.append_history(_entry(i, generation=1 if i < 4 else 2))
+
+        between = backend.history_between("2025-01-02", "2025-01-04")
+        assert [e["story"] for e in between] == ["Day 1", "Day 2"]
+        assert len(backend.history_for_generation(2)) == 2
+
+    def test_replace_history_in_transaction(self, backend):
+        """Test a replaced history is staged with the transaction's documents"""
+        for i in range(3):
+            backend.append_history(_entry(i))
+
+        with pytest.raises(RuntimeError):
+            with backend.transaction():
+                backend.write_document("summary", {"entry_count": 3})
+                backend.replace_history([_entry(2)])
+                raise RuntimeError("boom")
+
+        assert backend.read_document("summary") is None
+        assert backend.history_count() == 3
+
+        with backend.transaction():
+            backend.write_document("summary", {"entry_count": 3})
+            backend.replace_history([_entry(0), _entry(2)])
+            backend.append_history(_entry(3))
+
+        assert backend.read_document("summary") == {"entry_count": 3}
+        assert [e["story"] for e in backend.read_history()] == ["Day 0", "Day 2", "Day 3"]
+
+    def test_export_json(self, backend, temp_dir):
+        """Test exporting the GitHub Pages layout"""
+        backend.write_document("stats", {"rarity_score": 10})
+        backend.append_history(_entry(0))
+
+        out = temp_dir / "export"
+        backend.export_json(out)
+
+        assert json.loads((out / "stats.json").read_text()) == {"rarity_score": 10}
+        assert json.loads((out / "history.json").read_text())["entries"][0]["story"] == "Day 0"
+        assert not (out / "dna.json").exists()
+
+
+class TestSQLiteBackend:
+    """SQLite-specific behaviour"""
+
+    def test_transaction_rolls_back(self, temp_dir):
+        """Test a failed transaction leaves no partial writes"""
+        backend = SQLiteBackend(temp_dir / "monkey.db")
+
+        with pytest.raises(RuntimeError):
+            with backend.transaction():
+                backend.write_document("dna", {"dna_hash": "abc"})
+                backend.append_history(_entry(0))
+                raise RuntimeError("boom")
+
+        assert backend.read_document("dna") is None
+        assert backend.history_count() == 0
+
+    def test_nested_transaction_commits_once(self, temp_dir):
+        """Test nested transactions commit with the outermost one"""
+        backend = SQLiteBackend(temp_dir / "monkey.db")
+
+        with backend.transaction():
+            with backend.transaction():
+                backend.write_document("dna", {"dna_hash": "abc"})
+
+        assert SQLiteBackend(temp_dir / "monkey.db").read_document("dna") == {"dna_hash": "abc"}
+
+    def test_indexes_exist(self, temp_dir):
+        """Test history is indexed by timestamp and generation"""
+        backend = SQLiteBackend(temp_dir / "monkey.db")
+        indexes = {row[1] for row in backend.conn.execute("PRAGMA index_list(history)")}
+        assert {"idx_history_timestamp", "idx_history_generation"} <= indexes
+
+
+class TestMemoryBackend:
+    """MemoryBackend-specific behaviour"""
+
+    def test_transaction_rolls_back(self):
+        """Test a failed transaction restores documents and history"""
+        backend = MemoryBackend()
+        backend.append_history(_entry(0))
+
+        with pytest.raises(RuntimeError):
+            with backend.transaction():
+                backend.write_document("dna", {"dna_hash": "abc"})
+                backend.replace_history([_entry(5), _entry(6)])
+                backend.append_history(_entry(7))
+                raise RuntimeError("boom")
+
+        assert backend.read_document("dna") is None
+        assert [e["story"] for e in backend.read_history()] == ["Day 0"]
+
+    def test_returns_copies(self):
+        """Test callers cannot mutate stored data through returned values"""
+        backend = MemoryBackend()
+        backend.write_document("stats", {"traits": {"body": "brown"}})
+        backend.read_document("stats")["traits"]["body"] = "gold"
+        assert backend.read_document("stats") == {"traits": {"body": "brown"}}
+
+    def test_storage_does_not_touch_disk(self, temp_dir, monkeypatch):
+        """Test MonkeyStorage on the memory backend creates no data directory"""
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.setenv("FORKMONKEY_STORAGE", "memory")
+        storage = MonkeyStorage(offline=True)
+        dna = GeneticsEngine.generate_random_dna()
+
+        storage.save_dna_locally(dna)
+        storage.save_history_entry(dna, "Born")
+
+        assert storage.load_dna().dna_hash == dna.dna_hash
+        assert not (temp_dir / "monkey_data").exists()
+
+
+class TestBackendSelection:
+    """Test backend factory and migration"""
+
+    def test_unknown_backend(self, temp_dir):
+        """Test an unknown backend name is rejected"""
+        with pytest.raises(ValueError):
+            create_backend("redis", temp_dir)
+
+    def test_autodetect_sqlite(self, temp_dir, monkeypatch):
+        """Test monkey.db is picked up automatically"""
+        monkeypatch.delenv("FORKMONKEY_STORAGE", raising=False)
+        assert isinstance(create_backend(None, temp_dir), FileBackend)
+
+        SQLiteBackend(temp_dir / "monkey.db")
+        assert isinstance(create_backend(None, temp_dir), SQLiteBackend)
+
+    def test_copy_backend(self, temp_dir):
+        """Test copying JSON files into SQLite"""
+        source = FileBackend(temp_dir / "files")
+        source.write_document("dna", {"dna_hash": "abc"})
+        for i in range(3):
+            source.append_history(_entry(i))
+
+        target = SQLiteBackend(temp_dir / "monkey.db")
+        copied = copy_backend(source, target)
+
+        assert copied == {"documents": 1, "history": 3}
+        assert target.read_document("dna") == {"dna_hash": "abc"}
+        assert target.read_history() == source.read_history()
+
+    def test_storage_with_sqlite_backend(self, temp_dir, monkeypatch):
+        """Test MonkeyStorage works unchanged on top of SQLite"""
+        monkeypatch.chdir(temp_dir)
+        storage = MonkeyStorage(backend=SQLiteBackend(temp_dir / "monkey.db"))
+        dna = GeneticsEngine.generate_random_dna()
+
+        storage.save_dna_locally(dna)
+        storage.save_stats(dna, age_days=3)
+        storage.save_history_entry(dna, "Born")
+        storage.save_achievements([{"key": "first_steps"}])
+
+        assert storage.load_dna().dna_hash == dna.dna_hash
+        assert storage.get_streak()["current"] == 1
+        assert storage.get_history()[0]["story"] == "Born"
+        assert storage.load_achievements() == [{"key": "first_steps"}]
+        assert not Path("monkey_data/dna.json").exists()
@@ -0,0 +1,143 @@
+"""
+Tests for deltas between community scans
+"""
+
+import json
+
+import pytest
+
+from src.community_delta import (
+    apply_delta, apply_patch, catch_up, diff, load_snapshot, make_delta, main, snapshot, version_id, write_delta,
+)
+
+
+def _monkey(name, rarity=50, age=10, parent="a/root"):
+    owner, _, repo = name.partition("/")
+    return {
+        "owner": owner,
+        "repo": repo,
+        "full_name": name,
+        "parent": parent,
+        "monkey_stats": {"rarity_score": rarity, "age_days": age, "traits": {"hat": "none"}},
+        "svg_hash": f"h-{owner}",
+    }
+
+
+def _scans():
+    old = snapshot([_monkey("a/root", 40, parent=None), _monkey("b/fork", 90), _monkey("c/fork", 60),
+                    _monkey("x/gone", 70)])
+    new = snapshot([_monkey("a/root", 40, age=11, parent=None), _monkey("b/fork", 90, age=11),
+                    _monkey("c/fork", 95, age=11), _monkey("d/new", 10)])
+    return old, new
+
+
+class TestDelta:
+    """Test deltas are small and reproduce the new scan exactly"""
+
+    def test_version_ignores_order(self):
+        old, _ = _scans()
+        assert version_id(old) == version_id(dict(reversed(list(old.items()))))
+        assert version_id(old) != version_id(_scans()[1])
+
+    def test_diff_is_member_level(self):
+        """Test a nested change is one op, and keys with '/' and '~' are escaped"""
+        ops = diff({"a/b": {"stats": {"age": 1, "x": 2}}, "t~": 1},
+                   {"a/b": {"stats": {"age": 2, "x": 2}}, "t~": True})
+        assert ops == [{"op": "replace", "path": "/a~1b/stats/age", "value": 2},
+                       {"op": "replace", "path": "/t~0", "value": True}]
+
+    def test_make_and_apply(self):
+        old, new = _scans()
+        delta = make_delta(old, new)
+
+        assert delta["from"] == version_id(old) and delta["to"] == version_id(new)
+        assert delta["summary"] == {"added": 1, "removed": 1, "changed": 3}
+        # c/fork overtook b/fork; d/new joined last, x/gone left. b/fork's shift is implied.
+        assert delta["ranks"] == {"c/fork": [3, 1], "d/new": [None, 4], "x/gone": [2, None]}
+        assert {"op": "replace", "path": "/a~1root/monkey_stats/age_days", "value": 11} in delta["ops"]
+
+        result = apply_delta(old, delta)
+        assert result == new
+        assert old["c/fork"]["monkey_stats"]["rarity_score"] == 60  # input left alone
+        assert result["a/root"]["svg_hash"] is old["a/root"]["svg_hash"]
+
+    def test_delta_is_smaller_than_snapshot(self):
+        old = snapshot(_monkey(f"o{i}/fork", i) for i in range(200))
+        new = {name: dict(record, monkey_stats=dict(record["monkey_stats"], age_days=11))
+               for name, record in old.items()}
+        new["o5/fork"] = _monkey("o5/fork", 500)
+        delta = make_delta(old, new)
+
+        assert len(json.dumps(delta)) < len(json.dumps(new)) / 2
+        assert apply_delta(old, delta) == new
+
+    def test_version_mismatch(self):
+        old, new = _scans()
+        delta = make_delta(old, new)
+        with pytest.raises(ValueError, match="applies to version"):
+            apply_delta(new, delta)
+        with pytest.raises(ValueError, match="does not exist"):
+            apply_patch({}, [{"op": "replace", "path": "/a~1b/x", "value": 1}])
+
+
+class TestDeltaFiles:
+    """Test the delta directory and catching up through it"""
+
+    def test_catch_up_through_chain(self, tmp_path):
+        old, middle = _scans()
+        new = dict(middle)
+        new["e/late"] = _monkey("e/late", 20)
+        write_delta(make_delta(old, middle), tmp_path)
+        index = write_delta(make_delta(middle, new), tmp_path, compact=True)
+
+        assert index["latest"] == version_id(new)
+        assert [entry["from"] for entry in index["deltas"]] == [version_id(old), version_id(middle)]
+        assert catch_up(old, tmp_path) == new
+        assert catch_up(new, tmp_path) == new
+
+    def test_old_deltas_pruned(self, tmp_path):
+        scans = [snapshot([_monkey("a/root", age=age)]) for age in range(5)]
+        for before, after in zip(scans, scans[1:]):
+            index = write_delta(make_delta(before, after), tmp_path, keep=2)
+
+        assert len(index["deltas"]) == 2
+        assert sorted(p.name for p in tmp_path.glob("*.json")) == sorted(
+            [entry["file"] for entry in index["deltas"]] + ["index.json"])
+        assert catch_up(scans[2], tmp_path) == scans[4]
+        assert catch_up(scans[0], tmp_path) == scans[0]
+
+    def test_index_written_before_stale_deltas_removed(self, tmp_path, monkeypatch):
+        """Test a failed index write leaves every delta the old index lists"""
+        import os
+        scans = [snapshot([_monkey("a/root", age=age)]) for age in range(3)]
+        write_delta(make_delta(scans[0], scans[1]), tmp_path, keep=1)
+
+        replace = os.replace
+
+        def crash_on_index(src, dst):
+            if str(dst).endswith("index.json"):
+                raise OSError("killed")
+            replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", crash_on_index)
+        with pytest.raises(OSError):
+            write_delta(make_delta(scans[1], scans[2]), tmp_path, keep=1)
+
+        index = json.loads((tmp_path / "index.json").read_text())
+        assert all((tmp_path / entry["file"]).exists() for entry in index["deltas"])
+        assert catch_up(scans[0], tmp_path) == scans[2]
+
+    def test_apply_command(self, tmp_path):
+        old, new = _scans()
+        data = tmp_path / "community_data.json"
+        data.write_text(json.dumps({"forks": list(old.values())}))
+        write_delta(make_delta(old, new), tmp_path / "deltas")
+
+        main(["apply", str(data), "--deltas", str(tmp_path / "deltas")])
+        assert load_snapshot(data) == new
+        assert json.loads(data.read_text())["data_version"] == version_id(new)
+
+    def test_load_snapshot_missing_or_bad(self, tmp_path):
+        assert load_snapshot(tmp_path / "none.json") is None
+        (tmp_path / "bad.json").write_text("{")
+        assert load_snapshot(tmp_path / "bad.json") is None
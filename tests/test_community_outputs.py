@@ -0,0 +1,228 @@
+"""
+Tests for the single-pass community output aggregation
+"""
+
+import json
+import pytest
+from datetime import datetime, timezone
+
+from src.community_outputs import CommunityAggregator, dumps, owner_shards, write_json, write_sharded
+from src.snapshot_pack import content_hash
+
+
+NOW = datetime(2024, 7, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _monkey(name, parent=None, rarity=50, generation=1, traits=None, updated="2024-06-01T00:00:00Z"):
+    owner, _, repo = name.partition("/")
+    return {
+        "owner": owner,
+        "repo": repo,
+        "full_name": name,
+        "url": f"https://github.com/{name}",
+        "is_root": parent is None,
+        "degree": 0 if parent is None else 1,
+        "degree_label": "root" if parent is None else "1st degree",
+        "parent": parent,
+        "updated_at": updated,
+        "monkey_stats": {"generation": generation, "rarity_score": rarity, "traits": traits or {}},
+        "svg_hash": f"h-{owner}",
+    }
+
+
+def _network():
+    return [
+        _monkey("a/root", rarity=40, traits={"body_color": {"value": "brown"}, "hat": {"value": "crown"}}),
+        _monkey("b/fork", "a/root", rarity=90, generation=2, updated="2024-07-01T06:00:00+00:00",
+                traits={"body_color": {"value": "brown"}, "hat": {"value": "none"}}),
+        _monkey("c/fork", "a/root", rarity=40, generation=2, traits={"body_color": "gold"}),
+        _monkey("d/fork", "b/fork", rarity=70, generation=3, traits={"eyes": {"value": "laser:red"}}),
+    ]
+
+
+class TestCommunityAggregator:
+    """Test every output comes from the one pass"""
+
+    def test_leaderboard_ranks_by_rarity(self):
+        """Test ranking is by rarity, ties in scan order"""
+        aggregate = CommunityAggregator(_network(), now=NOW)
+        board = aggregate.leaderboard()
+
+        assert board["total_ranked"] == 4
+        assert [e["full_name"] for e in board["rankings"]] == ["b/fork", "d/fork", "a/root", "c/fork"]
+        assert [e["rank"] for e in board["rankings"]] == [1, 2, 3, 4]
+        assert board["rankings"][0]["svg_hash"] == "h-b"
+        assert [m["full_name"] for m in aggregate.ranked(2)] == ["b/fork", "d/fork"]
+
+    def test_family_tree_adjacency(self):
+        """Test children are linked even when listed before their parent"""
+        monkeys = _network()
+        monkeys.insert(0, monkeys.pop())  # d/fork before b/fork
+        tree = CommunityAggregator(monkeys, now=NOW).family_tree("a/root")
+
+        nodes = {node["id"]: node for node in tree["nodes"]}
+        assert tree["total_nodes"] == 4
+        assert nodes["a/root"]["children"] == ["b/fork", "c/fork"]
+        assert nodes["b/fork"]["children"] == ["d/fork"]
+        assert nodes["d/fork"]["parent"] == "b/fork" and nodes["d/fork"]["generation"] == 3
+
+    def test_duplicate_repos_are_one_node(self):
+        monkeys = _network() + [_monkey("c/fork", "a/root", rarity=10)]
+        aggregate = CommunityAggregator(monkeys, now=NOW)
+        nodes = {node["id"]: node for node in aggregate.family_tree("a/root")["nodes"]}
+
+        assert len(nodes) == 4
+        assert nodes["a/root"]["children"] == ["b/fork", "c/fork"]
+        assert nodes["c/fork"]["rarity_score"] == 40
+
+    def test_network_stats(self):
+        """Test trait counts are keyed by (trait, value), so values may contain ':'"""
+        stats = CommunityAggregator(_network(), now=NOW).network_stats()
+
+        assert stats["total_monkeys"] == 4
+        assert stats["active_today"] == 1
+        assert stats["generations"] == {"1": 1, "2": 2, "3": 1}
+        assert stats["avg_rarity"] == 60.0
+        assert (stats["min_rarity"], stats["max_rarity"]) == (40, 90)
+        assert stats["trait_distribution"]["body_color"] == {"brown": 2, "gold": 1}
+        assert stats["trait_distribution"]["eyes"] == {"laser:red": 1}
+        assert stats["most_common_trait"] == {"trait": "body_color", "value": "brown", "count": 2}
+        assert stats["rarest_trait"] == {"trait": "eyes", "value": "laser:red", "count": 1}
+
+    def test_empty_network(self):
+        aggregate = CommunityAggregator(now=NOW)
+        assert aggregate.network_stats()["total_monkeys"] == 0
+        assert aggregate.leaderboard()["rankings"] == []
+        assert aggregate.family_tree("a/root")["nodes"] == []
+
+    def test_outputs_share_one_timestamp(self, tmp_path):
+        """Test every output carries the same last_updated, written by write_json"""
+        aggregate = CommunityAggregator(_network(), now=NOW)
+        write_json(tmp_path / "stats.json", aggregate.network_stats())
+
+        with open(tmp_path / "stats.json") as f:
+            written = json.load(f)
+        assert written["last_updated"] == NOW.isoformat()
+        assert aggregate.community_data("a/root")["last_updated"] == written["last_updated"]
+        assert aggregate.community_data("a/root")["forks"] is aggregate.monkeys
+
+    def test_compact_output(self, tmp_path):
+        """Test compact JSON has no whitespace, sorted keys and the same content"""
+        data = CommunityAggregator(_network(), now=NOW).leaderboard()
+        text = dumps(data, compact=True)
+
+        assert json.loads(text) == data
+        assert ": " not in text and "\n" not in text
+        assert text.startswith('{"last_updated":') and len(text) < len(dumps(data)) * 0.75
+        assert write_json(tmp_path / "a.json", data, compact=True) == content_hash(text)
+
+    def test_write_json_is_atomic(self, tmp_path, monkeypatch):
+        """Test a failed write keeps the previous file"""
+        import os
+        path = tmp_path / "community_data.json"
+        write_json(path, {"forks": ["ok"]})
+
+        def crash(*args):
+            raise OSError("killed")
+
+        monkeypatch.setattr(os, "replace", crash)
+        with pytest.raises(OSError):
+            write_json(path, {"forks": ["new"]})
+        assert json.loads(path.read_text(encoding="utf-8")) == {"forks": ["ok"]}
+        assert [p.name for p in tmp_path.iterdir()] == ["community_data.json"]
+
+
+def _big_network(count):
+    monkeys = [_monkey("root/monkey", rarity=0)]
+    for i in range(count):
+        owner = ["alice", "alfred", "bob", "carol"][i % 4] + str(i)
+        parent = "root/monkey" if i < 10 else f"{['alice', 'alfred', 'bob', 'carol'][i % 10 % 4]}{i % 10}/fork"
+        monkeys.append(_monkey(f"{owner}/fork", parent, rarity=i % 97))
+    return monkeys
+
+
+class TestShardedOutputs:
+    """Test the paged / sharded export and its manifest"""
+
+    def test_owner_shards_split_on_prefix(self):
+        """Test shards are runs of owner prefixes of at most shard_size forks"""
+        monkeys = _big_network(40)
+        shards = owner_shards(monkeys, shard_size=12)
+
+        assert sum(len(group) for _, group in shards) == len(monkeys)
+        assert all(len(group) <= 12 for _, group in shards)
+        starts = [start for start, _ in shards]
+        assert starts == sorted(starts) and len(set(starts)) == len(starts)
+        for start, group in shards:
+            for monkey in group:
+                owner = monkey["owner"].lower()
+                # A fork is found in the last shard starting at or before its owner
+                assert [s for s in starts if s <= owner][-1] == start
+
+    def test_one_owner_is_never_split(self):
+        monkeys = [_monkey(f"same/fork{i}", "same/root") for i in range(5)]
+        assert [(prefix, len(group)) for prefix, group in owner_shards(monkeys, 2)] == [("", 5)]
+
+    def test_write_sharded(self, tmp_path):
+        """Test pages, shards and parts cover everything, with hashes in their indexes"""
+        aggregate = CommunityAggregator(_big_network(40), now=NOW)
+        manifest = write_sharded(aggregate, "root/monkey", tmp_path, page_size=15, shard_size=12, part_size=12,
+                                 top_k=3)
+
+        assert manifest["counts"] == {"monkeys": 41, "nodes": 41}
+        assert [e["full_name"] for e in manifest["top"]] == [e["full_name"] for e in aggregate.leaderboard_entries(3)]
+
+        def files(kind):
+            index = manifest[kind]["index"]
+            text = (tmp_path / index["file"]).read_text()
+            assert index["hash"] == content_hash(text)
+            entries = json.loads(text)["files"]
+            assert manifest[kind]["first"] == entries[0] and manifest[kind]["count"] == len(entries)
+            for entry in entries:
+                text = (tmp_path / entry["file"]).read_text()
+                assert entry["hash"] == content_hash(text)
+                yield entry, json.loads(text)
+
+        rankings = []
+        for entry, page in files("leaderboard"):
+            assert entry["count"] == len(page["rankings"])
+            rankings += page["rankings"]
+        assert [page["count"] for page, _ in files("leaderboard")] == [15, 15, 11]
+        assert rankings == aggregate.leaderboard()["rankings"]
+
+        forks = [shard["forks"] for _, shard in files("forks")]
+        assert all(len(group) <= 12 for group in forks)
+        assert sorted(m["full_name"] for group in forks for m in group) == sorted(m["full_name"] for m in aggregate.monkeys)
+
+        nodes = []
+        for _, part in files("tree"):
+            assert len(part["nodes"]) <= 12
+            nodes += part["nodes"]
+        # Every node comes after its parent
+        assert nodes[0]["id"] == "root/monkey"
+        order = {node["id"]: i for i, node in enumerate(nodes)}
+        assert all(order[node["parent"]] < order[node["id"]] for node in nodes[1:])
+        assert sorted(order) == sorted(aggregate._first)
+        assert manifest["tree"]["degrees"] == {"0": 1, "1": 40}
+
+        with open(tmp_path / "manifest.json") as f:
+            assert json.load(f) == manifest
+
+    def test_manifest_size_is_constant(self, tmp_path):
+        """Test the manifest does not list every file"""
+        small = write_sharded(CommunityAggregator(_big_network(20), now=NOW), "root/monkey", tmp_path / "a",
+                              page_size=5, shard_size=5, part_size=5)
+        large = write_sharded(CommunityAggregator(_big_network(400), now=NOW), "root/monkey", tmp_path / "b",
+                              page_size=5, shard_size=5, part_size=5)
+
+        assert large["leaderboard"]["count"] == 81
+        assert abs(len(json.dumps(large)) - len(json.dumps(small))) < 200
+
+    def test_stale_files_removed(self, tmp_path):
+        """Test a smaller network leaves no pages from the previous export"""
+        write_sharded(CommunityAggregator(_big_network(40), now=NOW), "root/monkey", tmp_path, page_size=10)
+        manifest = write_sharded(CommunityAggregator(_big_network(5), now=NOW), "root/monkey", tmp_path,
+                                 page_size=10)
+
+        assert sorted(p.name for p in (tmp_path / "leaderboard").glob("*.json")) == ["index.json", "page-0000.json"]
+        assert len(list((tmp_path / "forks").glob("*.json"))) == manifest["forks"]["count"] + 1
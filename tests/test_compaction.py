@@ -0,0 +1,119 @@
+"""
+Tests for history compaction and retention
+"""
+
+import pytest
+from datetime import date, timedelta
+
+from src.archive import SvgArchive
+from src.compaction import RetentionPolicy, compact, plan_compaction
+from src.storage import MonkeyStorage
+from src.summary import HistorySummary
+
+
+TODAY = date(2025, 12, 31)
+
+
+def _history(days: int, generation_change: int = None) -> list:
+    """One entry per day ending today, mutation count growing daily"""
+    entries = []
+    for i in range(days):
+        day = TODAY - timedelta(days=days - 1 - i)
+        generation = 2 if generation_change is not None and i >= generation_change else 1
+        entries.append({
+            "timestamp": f"{day.isoformat()}T12:00:00",
+            "generation": generation,
+            "mutation_count": i,
+            "rarity_score": float(i % 37),
+            "story": f"day {i}",
+        })
+    return entries
+
+
+class TestPlanCompaction:
+    """Test which entries survive a policy"""
+
+    def test_recent_days_kept_in_full(self):
+        """Test everything within keep_days survives"""
+        entries = _history(30)
+        kept, removed = plan_compaction(entries, RetentionPolicy(keep_days=60), TODAY)
+        assert kept == entries
+        assert removed == []
+
+    def test_older_entries_downsampled(self):
+        """Test weekly then monthly resolution for older entries"""
+        entries = _history(400)
+        kept, removed = plan_compaction(entries, RetentionPolicy(keep_days=30, weekly_days=120), TODAY)
+
+        recent = [e for e in kept if e["timestamp"] >= (TODAY - timedelta(days=29)).isoformat()]
+        assert len(recent) == 30
+        assert len(kept) + len(removed) == 400
+        # ~13 weeks + ~10 months + first entry, instead of 370 daily entries
+        assert len(kept) - 30 < 30
+        assert kept[0] == entries[0]
+        assert kept[-1] == entries[-1]
+
+    def test_generation_boundaries_kept(self):
+        """Test the first and last entry of each generation survive"""
+        entries = _history(200, generation_change=50)
+        kept, _ = plan_compaction(entries, RetentionPolicy(keep_days=10, weekly_days=20), TODAY)
+        stories = [e["story"] for e in kept]
+        assert "day 49" in stories
+        assert "day 50" in stories
+
+    def test_folded_entries_rebuild_exact_summary(self):
+        """Test a summary rebuilt from compacted history equals the original"""
+        entries = _history(300, generation_change=100)
+        original = HistorySummary.build(entries)
+
+        kept, _ = plan_compaction(entries, RetentionPolicy(keep_days=30, weekly_days=90), TODAY)
+        assert HistorySummary.build(kept) == original
+
+        # Compacting again (weekly buckets aging into months) stays exact
+        later = TODAY + timedelta(days=60)
+        again, _ = plan_compaction(kept, RetentionPolicy(keep_days=30, weekly_days=90), later)
+        assert len(again) < len(kept)
+        assert HistorySummary.build(again) == original
+
+
+class TestCompact:
+    """Test compaction of a stored monkey"""
+
+    @pytest.fixture
+    def storage(self, temp_dir, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        return MonkeyStorage(offline=True)
+
+    def test_compact_rewrites_history_and_retires_snapshots(self, storage, temp_dir):
+        """Test history shrinks, the summary is kept and dropped SVGs are packed"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        entries = _history(120)
+        for i, entry in enumerate(entries):
+            entry["svg_filename"] = archive.store(f"<svg>{i}</svg>", entry["timestamp"][:10] + "_12-00")
+            storage.backend.append_history(entry)
+        summary = storage.load_summary()
+
+        result = compact(storage, archive, RetentionPolicy(keep_days=30, weekly_days=60), TODAY)
+
+        history = storage.backend.read_history()
+        assert result.entries_after == len(history) < 120
+        assert storage.load_summary() == summary
+        assert storage.load_summary().entry_count == 120
+
+        kept_files = {e["svg_filename"] for e in history}
+        assert result.snapshots_retired == 120 - len(kept_files)
+        assert len(list(archive.objects_dir.glob("*.svg"))) == len(kept_files)
+        assert len(archive.load_manifest()) == len(kept_files)
+        assert len(archive.retired.timestamps()) == result.snapshots_retired
+        assert all(archive.has(name) for name in kept_files)
+
+    def test_dry_run_changes_nothing(self, storage, temp_dir):
+        """Test --dry-run only reports"""
+        for entry in _history(100):
+            storage.backend.append_history(entry)
+
+        result = compact(storage, SvgArchive(temp_dir / "monkey_evolution"),
+                         RetentionPolicy(keep_days=10, weekly_days=30), TODAY, dry_run=True)
+
+        assert result.entries_removed > 0
+        assert storage.backend.history_count() == 100
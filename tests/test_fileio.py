@@ -0,0 +1,119 @@
+"""
+Tests for crash-safe writes and file locking
+"""
+
+import json
+import os
+import multiprocessing
+import pytest
+from pathlib import Path
+
+from src.fileio import atomic_write_json, atomic_write_text, file_lock, HAS_FCNTL
+from src.history_log import HistoryLog
+
+
+def _append_entries(path: str, worker: int, count: int):
+    log = HistoryLog(Path(path))
+    for i in range(count):
+        log.append({"worker": worker, "i": i, "story": "x" * 500})
+
+
+def _increment_counter(directory: str, count: int):
+    path = Path(directory) / "counter.json"
+    for _ in range(count):
+        with file_lock(directory):
+            value = json.loads(path.read_text())["value"] if path.exists() else 0
+            atomic_write_json(path, {"value": value + 1})
+
+
+class TestAtomicWrite:
+    """Test temp-file + rename writes"""
+
+    def test_write_and_replace(self, temp_dir):
+        """Test the target is replaced and no temp files remain"""
+        path = temp_dir / "stats.json"
+        atomic_write_json(path, {"v": 1})
+        atomic_write_json(path, {"v": 2})
+
+        assert json.loads(path.read_text()) == {"v": 2}
+        assert [p.name for p in temp_dir.iterdir()] == ["stats.json"]
+
+    def test_failed_rename_keeps_old_file(self, temp_dir, monkeypatch):
+        """Test a crash before the rename leaves the previous content intact"""
+        path = temp_dir / "history.json"
+        atomic_write_text(path, "old")
+
+        def crash(*args):
+            raise OSError("killed")
+
+        monkeypatch.setattr(os, "replace", crash)
+        with pytest.raises(OSError):
+            atomic_write_text(path, "new")
+
+        assert path.read_text() == "old"
+        assert [p.name for p in temp_dir.iterdir()] == ["history.json"]
+
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+    def test_keeps_file_mode(self, temp_dir):
+        """Test a replaced file keeps its mode and a new one follows the umask"""
+        path = temp_dir / "index.html"
+        atomic_write_text(path, "old")
+        umask = os.umask(0)
+        os.umask(umask)
+        assert path.stat().st_mode & 0o777 == 0o666 & ~umask
+
+        path.chmod(0o640)
+        atomic_write_text(path, "new")
+        assert path.stat().st_mode & 0o777 == 0o640
+
+class TestFileLock:
+    """Test cross-process locking"""
+
+    def test_reentrant(self, temp_dir):
+        """Test nested locks on the same directory do not deadlock"""
+        with file_lock(temp_dir):
+            with file_lock(temp_dir):
+                atomic_write_text(temp_dir / "a.txt", "ok")
+        assert (temp_dir / "a.txt").read_text() == "ok"
+
+    @pytest.mark.skipif(not HAS_FCNTL, reason="fcntl not available")
+    def test_lock_serializes_processes(self, temp_dir):
+        """Test read-modify-write under the lock never loses updates"""
+        procs = [multiprocessing.Process(target=_increment_counter, args=(str(temp_dir), 25)) for _ in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        assert json.loads((temp_dir / "counter.json").read_text()) == {"value": 100}
+
+    @pytest.mark.skipif(not HAS_FCNTL, reason="fcntl not available")
+    def test_concurrent_history_appends(self, temp_dir):
+        """Test parallel appends keep every entry intact"""
+        path = temp_dir / "history.jsonl"
+        procs = [multiprocessing.Process(target=_append_entries, args=(str(path), w, 30)) for w in range(4)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+
+        entries = HistoryLog(path).read_all()
+        assert len(entries) == 120
+        assert len(path.read_text().splitlines()) == 120
+
+
+class TestTornAppend:
+    """Test recovery from an interrupted append"""
+
+    def test_append_after_torn_line(self, temp_dir):
+        """Test a new entry is not glued onto a partial line"""
+        path = temp_dir / "history.jsonl"
+        log = HistoryLog(path)
+        log.append({"story": "one"})
+        with open(path, "a") as f:
+            f.write('{"story": "tw')
+
+        log.append({"story": "three"})
+
+        assert [e["story"] for e in log.read_all()] == ["one", "three"]
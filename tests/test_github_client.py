@@ -0,0 +1,196 @@
+"""
+Tests for the shared, rate-limit-aware GitHub access layer
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+from src.github_client import (
+    BACKGROUND,
+    INTERACTIVE,
+    GitHubClient,
+    RateLimitScheduler,
+    resource_for,
+    scheduler_for,
+    secondary_limit_delay,
+)
+
+
+class FakeTime:
+    """Shared fake wall clock / monotonic clock / sleep"""
+
+    def __init__(self, start=1000.0):
+        self.t = start
+        self.sleeps = []
+
+    def now(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.t += seconds
+
+
+def _scheduler(reserve=10, rps=None):
+    fake = FakeTime()
+    return RateLimitScheduler(reserve=reserve, max_background_rps=rps, clock=fake.now,
+                              sleep=fake.sleep, now=fake.now), fake
+
+
+def _headers(remaining, limit=5000, reset=2000, resource="core"):
+    return {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Reset": str(reset), "X-RateLimit-Resource": resource}
+
+
+def _response(status=200, headers=None, text=""):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.text = text
+    return response
+
+
+class TestRateLimitScheduler:
+    """Test the token bucket and priorities"""
+
+    def test_unknown_budget_does_not_wait(self):
+        """Test requests flow freely before any headers are seen"""
+        scheduler, fake = _scheduler()
+        for _ in range(5):
+            scheduler.acquire(BACKGROUND)
+        assert fake.sleeps == []
+
+    def test_headers_fill_the_bucket(self):
+        """Test each acquire takes a token and headers resync the count"""
+        scheduler, _ = _scheduler()
+        scheduler.update(_headers(500))
+        scheduler.acquire(INTERACTIVE)
+        assert scheduler.bucket().remaining == 499
+
+        # A stale response from the same window cannot raise the count
+        scheduler.update(_headers(600))
+        assert scheduler.bucket().remaining == 499
+        # A new window can
+        scheduler.update(_headers(5000, reset=5600))
+        assert scheduler.bucket().remaining == 5000
+
+    def test_background_keeps_the_reserve(self):
+        """Test background callers wait for the reset once only the reserve is left"""
+        scheduler, fake = _scheduler(reserve=10)
+        scheduler.update(_headers(10, reset=1030))
+
+        scheduler.acquire(BACKGROUND)
+        assert fake.sleeps == [31]
+        assert scheduler.bucket().remaining == 4999
+
+    def test_interactive_uses_the_reserve(self):
+        """Test interactive callers spend the reserve without waiting"""
+        scheduler, fake = _scheduler(reserve=10)
+        scheduler.update(_headers(3, reset=1030))
+
+        for _ in range(3):
+            scheduler.acquire(INTERACTIVE)
+        assert fake.sleeps == []
+
+        scheduler.acquire(INTERACTIVE)
+        assert fake.sleeps == [31]
+
+    def test_resources_are_separate(self):
+        """Test an empty graphql bucket does not hold up core requests"""
+        scheduler, fake = _scheduler(reserve=0)
+        scheduler.update(_headers(0, resource="graphql", reset=1030))
+        scheduler.acquire(BACKGROUND, "core")
+        assert fake.sleeps == []
+        scheduler.acquire(BACKGROUND, "graphql")
+        assert fake.sleeps == [31]
+
+    def test_background_yields_to_interactive(self):
+        """Test background callers poll while an interactive request is waiting"""
+        scheduler, fake = _scheduler()
+        scheduler._interactive_waiting = 1
+        original = fake.sleep
+
+        def sleep(seconds):
+            original(seconds)
+            if len(fake.sleeps) == 3:
+                scheduler._interactive_waiting = 0
+        scheduler.sleep = sleep
+
+        scheduler.acquire(BACKGROUND)
+        assert len(fake.sleeps) == 3
+
+    def test_background_pacing(self):
+        """Test background requests are spaced by 1 / max_background_rps"""
+        scheduler, fake = _scheduler(rps=4)
+        for _ in range(5):
+            scheduler.acquire(BACKGROUND)
+        assert sum(fake.sleeps) == pytest.approx(1.0)
+
+        # Interactive requests are not paced
+        fake.sleeps.clear()
+        scheduler.acquire(INTERACTIVE)
+        assert fake.sleeps == []
+
+    def test_backoff_pauses_everyone(self):
+        """Test a secondary rate limit blocks all priorities until it expires"""
+        scheduler, fake = _scheduler()
+        scheduler.backoff(60)
+        scheduler.acquire(INTERACTIVE)
+        assert fake.sleeps == [60]
+        scheduler.acquire(BACKGROUND)
+        assert fake.sleeps == [60]
+
+    def test_shared_per_token(self):
+        """Test clients of one token share a scheduler"""
+        assert scheduler_for("a") is scheduler_for("a")
+        assert scheduler_for("a") is not scheduler_for("b")
+        assert GitHubClient("a").scheduler is scheduler_for("a")
+
+
+class TestGitHubClient:
+    """Test scheduled requests and secondary-limit retries"""
+
+    def test_resource_for(self):
+        assert resource_for("https://api.github.com/graphql") == "graphql"
+        assert resource_for("https://api.github.com/search/repositories?q=x") == "search"
+        assert resource_for("https://api.github.com/repos/o/r/contents/x") == "core"
+
+    def test_secondary_limit_delay(self):
+        """Test which responses count as secondary rate limits"""
+        assert secondary_limit_delay(_response(200), 0) is None
+        assert secondary_limit_delay(_response(403, text="Resource not accessible"), 0) is None
+        assert secondary_limit_delay(_response(403, {"Retry-After": "7"}), 0) == 7
+        assert secondary_limit_delay(_response(429), 1) == 120
+        assert secondary_limit_delay(_response(403, text="You have exceeded a secondary rate limit"), 0) == 60
+
+    def test_request_updates_bucket(self):
+        """Test response headers feed the scheduler"""
+        scheduler, _ = _scheduler()
+        session = MagicMock()
+        session.request.return_value = _response(200, _headers(42))
+
+        client = GitHubClient("t", scheduler=scheduler, session=session)
+        assert client.get("https://api.github.com/repos/o/r", headers={"A": "b"}).status_code == 200
+        session.request.assert_called_once_with("GET", "https://api.github.com/repos/o/r", headers={"A": "b"})
+        assert scheduler.bucket().remaining == 42
+
+    def test_retries_secondary_limit(self):
+        """Test a secondary rate limit backs off, then retries"""
+        scheduler, fake = _scheduler()
+        session = MagicMock()
+        session.request.side_effect = [_response(429, {"Retry-After": "5"}), _response(200)]
+
+        client = GitHubClient("t", scheduler=scheduler, session=session)
+        assert client.post("https://api.github.com/graphql", json={}).status_code == 200
+        assert session.request.call_count == 2
+        assert fake.sleeps == [5]
+
+    def test_gives_up_after_retries(self):
+        """Test the last rate-limited response is returned, not raised"""
+        scheduler, _ = _scheduler()
+        session = MagicMock()
+        session.request.return_value = _response(429, {"Retry-After": "1"})
+
+        client = GitHubClient("t", scheduler=scheduler, session=session, retries=2)
+        assert client.get("https://api.github.com/x").status_code == 429
+        assert session.request.call_count == 3
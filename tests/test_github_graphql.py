@@ -0,0 +1,305 @@
+"""
+Tests for batched GraphQL fetching
+"""
+
+import re
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from src.github_graphql import (
+    GraphQLClient,
+    GraphQLError,
+    build_batch_query,
+    parse_repo,
+)
+from src.scan_community import scan_network_graphql
+
+
+def _node(full_name, forks=(), cursor=None, total=None, stats=None, parent=None):
+    owner = full_name.split("/")[0]
+    return {
+        "nameWithOwner": full_name,
+        "url": f"https://github.com/{full_name}",
+        "isFork": parent is not None,
+        "createdAt": "2024-01-01T00:00:00Z",
+        "updatedAt": "2024-06-01T00:00:00Z",
+        "pushedAt": "2024-06-01T00:00:00Z",
+        "owner": {"login": owner},
+        "parent": {"nameWithOwner": parent} if parent else None,
+        "defaultBranchRef": {"target": {"oid": "abc123"}},
+        "stats": {"oid": "s1", "text": json.dumps(stats), "isBinary": False} if stats else None,
+        "dna": None,
+        "svg": {"oid": "v1", "text": f"<svg>{full_name}</svg>", "isBinary": False},
+        "forks": {
+            "totalCount": total if total is not None else len(forks),
+            "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+            "nodes": [{"nameWithOwner": f} for f in forks],
+        },
+    }
+
+
+class FakeGraphQL:
+    """Answers batch queries from a dict of repository nodes"""
+
+    def __init__(self, nodes, fork_pages=None):
+        self.nodes = nodes
+        self.fork_pages = fork_pages or {}
+        self.queries = []
+
+    def post(self, url, json=None, headers=None, timeout=None):
+        query = json["query"]
+        self.queries.append(query)
+        data = {"rateLimit": {"cost": 1, "remaining": 4999 - len(self.queries), "limit": 5000, "resetAt": "x"}}
+        if "after:" in query:
+            cursor = query.split('after: "')[1].split('"')[0]
+            data["repository"] = {"forks": self.fork_pages[cursor]}
+        else:
+            oid_only = "... on Blob { oid }" in query
+            for alias, owner, name in re.findall(r'(r\d+): repository\(owner: "([^"]+)", name: "([^"]+)"\)', query):
+                node = self.nodes.get(f"{owner}/{name}")
+                if node and oid_only and node.get("svg"):
+                    node = dict(node, svg={"oid": node["svg"]["oid"]})
+                data[alias] = node
+        response = MagicMock()
+        response.status_code = 200
+        response.headers = {}
+        response.json.return_value = {"data": data}
+        return response
+
+
+class TestBatchQuery:
+    """Test query construction"""
+
+    def test_aliases_and_files(self):
+        """Test one aliased repository field per repo with HEAD: blob expressions"""
+        query, aliases = build_batch_query(["a/one", "b/two"])
+
+        assert aliases == {"r0": "a/one", "r1": "b/two"}
+        assert 'r1: repository(owner: "b", name: "two")' in query
+        assert 'object(expression: "HEAD:monkey_data/stats.json")' in query
+        assert "rateLimit" in query
+
+    def test_parse_repo(self):
+        """Test a repository node becomes a RepoRecord"""
+        record = parse_repo(_node("u/f", forks=["x/y"], stats={"generation": 2}, parent="o/r"))
+
+        assert record.fork and record.parent == "o/r"
+        assert json.loads(record.files["stats"]) == {"generation": 2}
+        assert record.files["dna"] is None
+        assert record.forks == ["x/y"]
+        assert record.head_oid == "abc123"
+
+
+class TestGraphQLClient:
+    """Test batching, pagination and cost accounting"""
+
+    def test_batches_and_cost(self):
+        """Test repos are split into batch_size queries and cost is summed"""
+        nodes = {f"u{i}/m": _node(f"u{i}/m") for i in range(120)}
+        session = FakeGraphQL(nodes)
+        client = GraphQLClient("token", session=session, batch_size=50)
+
+        records = client.fetch_repos(list(nodes))
+
+        assert len(records) == 120
+        assert len(session.queries) == 3
+        assert client.cost.queries == 3
+        assert client.cost.cost == 3
+        assert client.cost.remaining == 4996
+
+    def test_missing_repos_skipped(self):
+        """Test null aliases (deleted or private forks) are left out"""
+        client = GraphQLClient("token", session=FakeGraphQL({"a/b": _node("a/b")}))
+        assert list(client.fetch_repos(["a/b", "gone/repo"])) == ["a/b"]
+
+    def test_fork_pagination(self):
+        """Test forks beyond the first page are fetched with follow-up queries"""
+        nodes = {"o/r": _node("o/r", forks=["f/1"], cursor="c1", total=3)}
+        pages = {
+            "c1": {"pageInfo": {"hasNextPage": True, "endCursor": "c2"}, "nodes": [{"nameWithOwner": "f/2"}]},
+            "c2": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": [{"nameWithOwner": "f/3"}]},
+        }
+        client = GraphQLClient("token", session=FakeGraphQL(nodes, pages))
+
+        assert client.fetch_repos(["o/r"])["o/r"].forks == ["f/1", "f/2", "f/3"]
+
+    def test_errors_without_data_raise(self):
+        """Test a response with only errors raises GraphQLError"""
+        session = MagicMock()
+        session.post.return_value.status_code = 200
+        session.post.return_value.json.return_value = {"errors": [{"message": "Bad query"}]}
+
+        with pytest.raises(GraphQLError, match="Bad query"):
+            GraphQLClient("token", session=session).execute("query { x }")
+
+    def test_rate_limits_left_to_client(self):
+        """Test a secondary limit is retried once by the client and a plain 403 not at all"""
+        from src.github_client import GitHubClient, RateLimitScheduler
+        ok = MagicMock(status_code=200, headers={})
+        ok.json.return_value = {"data": {"viewer": {"login": "me"}}}
+        limited = MagicMock(status_code=403, headers={"Retry-After": "5"}, text="")
+        forbidden = MagicMock(status_code=403, headers={}, text="Resource not accessible")
+        session = MagicMock()
+        scheduler = RateLimitScheduler(sleep=lambda seconds: None)
+        client = GraphQLClient("token", session=GitHubClient("token", scheduler=scheduler, session=session))
+
+        session.request.side_effect = [limited, ok]
+        assert client.execute("query { viewer { login } }") == {"viewer": {"login": "me"}}
+        assert session.request.call_count == 2
+
+        session.request.reset_mock(side_effect=True)
+        session.request.return_value = forbidden
+        with pytest.raises(GraphQLError, match="HTTP 403"):
+            client.execute("query { viewer { login } }")
+        assert session.request.call_count == 1
+
+    def test_requires_token(self):
+        """Test GraphQL is not attempted anonymously"""
+        with pytest.raises(ValueError):
+            GraphQLClient("")
+
+
+class TestScanNetworkGraphQL:
+    """Test the scanner's GraphQL path"""
+
+    def test_bfs_over_network(self):
+        """Test levels are fetched in batches and monkeys come back in BFS order"""
+        nodes = {
+            "o/r": _node("o/r", forks=["a/f", "b/f"], stats={"generation": 1}),
+            "a/f": _node("a/f", forks=["c/f"], stats={"generation": 2}, parent="o/r"),
+            "b/f": _node("b/f", parent="o/r"),
+            "c/f": _node("c/f", stats={"generation": 3}, parent="a/f"),
+        }
+        session = FakeGraphQL(nodes)
+        client = GraphQLClient("token", session=session)
+
+        monkeys, scanned = scan_network_graphql(client, "o/r", max_depth=3)
+
+        assert scanned == ["o/r", "a/f", "b/f", "c/f"]
+        assert len(session.queries) == 3  # one per level
+        assert [m["full_name"] for m in monkeys] == ["o/r", "a/f", "b/f", "c/f"]
+        assert [m["degree"] for m in monkeys] == [0, 1, 1, 2]
+        assert monkeys[3]["parent"] == "a/f"
+        assert monkeys[1]["monkey_stats"]["generation"] == 2
+        assert monkeys[2]["monkey_stats"]["generation"] == 1  # SVG only: default stats
+
+    def test_render_mode_fetches_only_custom_svgs(self):
+        """Test SVG text is skipped and fetched only where the blob oid differs from the render"""
+        from src.genetics import GeneticsEngine
+        from src.render_cache import RenderCache, git_blob_sha
+        from src.visualizer import MonkeyVisualizer
+        nodes = {"o/r": _node("o/r", forks=["a/f", "b/f"], stats={"generation": 1})}
+        for name in ("a/f", "b/f"):
+            dna = GeneticsEngine.generate_random_dna()
+            svg = MonkeyVisualizer.generate_svg(dna)
+            nodes[name] = _node(name, stats={"generation": 1}, parent="o/r")
+            nodes[name]["dna"] = {"oid": "d", "text": json.dumps(GeneticsEngine.dna_to_dict(dna)), "isBinary": False}
+            nodes[name]["svg"] = {"oid": git_blob_sha(svg), "text": svg, "isBinary": False}
+        session = FakeGraphQL(nodes)
+
+        monkeys, _ = scan_network_graphql(GraphQLClient("token", session=session), "o/r",
+                                          renderer=RenderCache(persist=False))
+        assert "oid text isBinary" not in session.queries[0].split("svg:")[1].split("}")[0]
+        custom = session.queries[-1]
+        assert '"r"' in custom and '"f"' not in custom  # only o/r has non-standard art
+        assert [m["monkey_svg"] for m in monkeys] == [nodes[n]["svg"]["text"] for n in ("o/r", "a/f", "b/f")]
+
+    def test_incremental_fetches_only_changed_files(self):
+        """Test repos with the same pushedAt / HEAD oid are carried forward from the state"""
+        from src.scan_state import ScanState
+        nodes = {
+            "o/r": _node("o/r", forks=["a/f", "b/f"], stats={"generation": 1}),
+            "a/f": _node("a/f", stats={"generation": 2}, parent="o/r"),
+            "b/f": _node("b/f", stats={"generation": 2}, parent="o/r"),
+        }
+        state = ScanState()
+        first, _ = scan_network_graphql(GraphQLClient("token", session=FakeGraphQL(nodes)), "o/r", state=state)
+
+        session = FakeGraphQL(nodes)
+        second, _ = scan_network_graphql(GraphQLClient("token", session=session), "o/r", state=state)
+        assert len(session.queries) == 2  # metadata per level, no file fetches
+        assert all("HEAD:" not in q for q in session.queries)
+        assert [m["full_name"] for m in second] == [m["full_name"] for m in first]
+
+        nodes["b/f"] = _node("b/f", stats={"generation": 5}, parent="o/r")
+        nodes["b/f"]["pushedAt"] = "2024-07-01T00:00:00Z"
+        session = FakeGraphQL(nodes)
+        third, scanned = scan_network_graphql(GraphQLClient("token", session=session), "o/r", state=state)
+        file_queries = [q for q in session.queries if "HEAD:" in q]
+        assert len(file_queries) == 1 and '"b"' in file_queries[0] and '"a"' not in file_queries[0]
+        assert third[2]["monkey_stats"]["generation"] == 5
+        assert state.repos["b/f"].pushed_at.startswith("2024-07-01")
+
+    def _paged_network(self):
+        nodes = {
+            "o/r": _node("o/r", forks=["a/f", "b/f"], cursor="c1", total=3, stats={"generation": 1}),
+            "a/f": _node("a/f", forks=["d/f"], stats={"generation": 2}, parent="o/r"),
+            "b/f": _node("b/f", stats={"generation": 2}, parent="o/r"),
+            "c/f": _node("c/f", stats={"generation": 2}, parent="o/r"),
+            "d/f": _node("d/f", stats={"generation": 3}, parent="a/f"),
+        }
+        pages = {"c1": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": [{"nameWithOwner": "c/f"}]}}
+        return nodes, pages
+
+    def test_budget_checkpoints_and_resumes(self, tmp_path):
+        """Test a spent query budget saves the frontier, and resuming matches a full crawl"""
+        from src.scan_community import CrawlBudget
+        from src.scan_state import CrawlCheckpoint, ScanState
+        nodes, pages = self._paged_network()
+        full, _ = scan_network_graphql(GraphQLClient("token", session=FakeGraphQL(nodes, pages), batch_size=1),
+                                       "o/r", state=ScanState())
+
+        path = tmp_path / "checkpoint.json"
+        state = ScanState()
+        checkpoint = CrawlCheckpoint(mode="graphql")
+        session = FakeGraphQL(nodes, pages)
+        budget = CrawlBudget(max_calls=2)
+        partial, scanned = scan_network_graphql(GraphQLClient("token", session=session, batch_size=1), "o/r",
+                                                state=state, budget=budget, checkpoint=checkpoint,
+                                                checkpoint_path=path)
+        # Metadata + files for o/r, then the budget is spent before its second fork page
+        assert budget.calls == 2 and len(session.queries) == 2
+        assert scanned == ["o/r"] and [m["full_name"] for m in partial] == ["o/r"]
+        assert not checkpoint.complete and path.exists()
+        assert checkpoint.cursors == {"o/r": "c1"}
+
+        resumed = CrawlCheckpoint.load(path, root="o/r", mode="graphql")
+        assert resumed.queue == checkpoint.queue
+        assert CrawlCheckpoint.load(path, root="o/r").complete  # a REST crawl does not pick it up
+        monkeys, scanned = scan_network_graphql(GraphQLClient("token", session=FakeGraphQL(nodes, pages),
+                                                              batch_size=1),
+                                                "o/r", state=state, budget=CrawlBudget(), checkpoint=resumed,
+                                                checkpoint_path=path)
+        assert resumed.complete and not path.exists()
+        assert sorted(scanned) == ["a/f", "b/f", "c/f", "d/f", "o/r"]
+        assert [(m["full_name"], m["degree"]) for m in monkeys] == [(m["full_name"], m["degree"]) for m in full]
+
+    def test_rate_limit_checkpoints(self, tmp_path):
+        """Test a failing query stops the crawl with a checkpoint instead of raising"""
+        from src.scan_state import CrawlCheckpoint, ScanState
+        nodes, pages = self._paged_network()
+        session = FakeGraphQL(nodes, pages)
+        post = session.post
+
+        def limited(url, json=None, headers=None, timeout=None):
+            if len(session.queries) >= 3:
+                return MagicMock(status_code=403, headers={})
+            return post(url, json=json, headers=headers, timeout=timeout)
+
+        session.post = limited
+        state = ScanState()
+        checkpoint = CrawlCheckpoint(mode="graphql")
+        path = tmp_path / "checkpoint.json"
+        monkeys, scanned = scan_network_graphql(GraphQLClient("token", session=session, retries=0), "o/r",
+                                                state=state, checkpoint=checkpoint, checkpoint_path=path)
+
+        # o/r and its second fork page were fetched; the first-degree batch was not
+        assert checkpoint.queue == [("a/f", 1, 0), ("b/f", 1, 0), ("c/f", 1, 0)]
+        assert scanned == ["o/r"] and [m["full_name"] for m in monkeys] == ["o/r"]
+
+        monkeys, _ = scan_network_graphql(GraphQLClient("token", session=FakeGraphQL(nodes, pages)), "o/r",
+                                          state=state, checkpoint=CrawlCheckpoint.load(path, "o/r", "graphql"),
+                                          checkpoint_path=path)
+        assert [m["full_name"] for m in monkeys] == ["o/r", "a/f", "b/f", "c/f", "d/f"]
+        assert not path.exists()
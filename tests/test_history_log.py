@@ -0,0 +1,240 @@
+"""
+Tests for the append-only history log
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+from src.history_log import (
+    HistoryLog,
+    encode_history_log,
+    export_history_json,
+    export_history_pages,
+    migrate_history_json,
+    reconstruct,
+)
+
+
+def _entry(i: int) -> dict:
+    return {"timestamp": f"2025-01-{i % 28 + 1:02d}T00:00:00", "generation": 1, "story": f"Day {i}"}
+
+
+class TestHistoryLog:
+    """Test JSONL history log"""
+
+    def test_append_and_read_all(self, temp_dir):
+        """Test entries are read back in append order"""
+        log = HistoryLog(temp_dir / "history.jsonl")
+        for i in range(3):
+            log.append(_entry(i))
+
+        entries = log.read_all()
+        assert [e["story"] for e in entries] == ["Day 0", "Day 1", "Day 2"]
+
+    def test_append_writes_one_line_per_entry(self, temp_dir):
+        """Test append only adds a line instead of rewriting the file"""
+        path = temp_dir / "history.jsonl"
+        log = HistoryLog(path)
+        log.append(_entry(0))
+        first = path.read_bytes()
+        log.append(_entry(1))
+
+        assert path.read_bytes().startswith(first)
+        assert len(path.read_text().splitlines()) == 2
+
+    def test_read_missing_log(self, temp_dir):
+        """Test reading a log that does not exist"""
+        log = HistoryLog(temp_dir / "history.jsonl")
+        assert log.read_all() == []
+        assert log.tail(5) == []
+
+    @pytest.mark.parametrize("count,n", [(1, 1), (5, 3), (5, 10), (500, 7), (500, 500)])
+    def test_tail(self, temp_dir, count, n):
+        """Test tail returns the last n entries in order"""
+        log = HistoryLog(temp_dir / "history.jsonl")
+        log.BLOCK_SIZE = 64  # Force several backwards reads
+        for i in range(count):
+            log.append(_entry(i))
+
+        expected = [f"Day {i}" for i in range(count)][-n:]
+        assert [e["story"] for e in log.tail(n)] == expected
+
+    def test_tail_zero(self, temp_dir):
+        """Test tail(0) returns nothing"""
+        log = HistoryLog(temp_dir / "history.jsonl")
+        log.append(_entry(0))
+        assert log.tail(0) == []
+
+    def test_torn_trailing_line_is_skipped(self, temp_dir):
+        """Test a partially written last line does not break reads"""
+        path = temp_dir / "history.jsonl"
+        log = HistoryLog(path)
+        log.append(_entry(0))
+        with open(path, "a") as f:
+            f.write('{"timestamp": "2025-')
+
+        assert len(log.read_all()) == 1
+        assert log.tail(1)[0]["story"] == "Day 0"
+
+    @pytest.mark.parametrize("interval", [0, 4])
+    def test_count_ignores_torn_line(self, temp_dir, interval):
+        """Test count() agrees with iter() around a torn write, before and after the next append"""
+        path = temp_dir / "history.jsonl"
+        log = HistoryLog(path, keyframe_interval=interval)
+        log.append_many([_entry(i) for i in range(3)])
+        with open(path, "a") as f:
+            f.write('{"_k": {"timestamp": "2025-')
+
+        assert log.count() == len(list(log.iter())) == 3
+        log.append(_entry(3))
+        assert log.count() == len(list(log.iter())) == 4
+        assert [e["story"] for e in log.range(2, 4)] == ["Day 2", "Day 3"]
+
+
+class TestPaging:
+    """Test streaming ranges and paged export"""
+
+    def test_iter_and_range(self, temp_dir):
+        """Test iter() streams in order and range() slices by index"""
+        log = HistoryLog(temp_dir / "history.jsonl")
+        log.append_many([_entry(i) for i in range(10)])
+
+        assert [e["story"] for e in log.iter()] == [f"Day {i}" for i in range(10)]
+        assert [e["story"] for e in log.range(3, 6)] == ["Day 3", "Day 4", "Day 5"]
+        assert [e["story"] for e in log.range(8)] == ["Day 8", "Day 9"]
+        assert log.range(5, 5) == []
+
+    def test_export_pages(self, temp_dir):
+        """Test pages are fixed-size and the manifest describes them"""
+        out = temp_dir / "history"
+        manifest = export_history_pages((_entry(i) for i in range(25)), out, page_size=10)
+
+        assert manifest["total"] == 25
+        assert [p["count"] for p in manifest["pages"]] == [10, 10, 5]
+        assert json.loads((out / "manifest.json").read_text())["pages"] == manifest["pages"]
+
+        last = json.loads((out / "page-0002.json").read_text())
+        assert [e["story"] for e in last["entries"]] == ["Day 20", "Day 21", "Day 22", "Day 23", "Day 24"]
+        assert manifest["pages"][2]["last_timestamp"] == _entry(24)["timestamp"]
+
+    def test_export_pages_removes_stale(self, temp_dir):
+        """Test a shorter re-export drops pages that no longer exist"""
+        out = temp_dir / "history"
+        export_history_pages((_entry(i) for i in range(25)), out, page_size=10)
+        export_history_pages((_entry(i) for i in range(5)), out, page_size=10)
+
+        assert sorted(p.name for p in out.glob("page-*.json")) == ["page-0000.json"]
+
+
+def _evolving(i: int) -> dict:
+    """An entry where only one trait changes per day, like real evolution"""
+    traits = {f"trait_{t}": "base" for t in range(12)}
+    traits[f"trait_{i % 12}"] = f"mutated_{i}"
+    return {**_entry(i), "dna_hash": f"hash{i}", "rarity_score": 40.0, "traits": traits}
+
+
+class TestDeltaEncoding:
+    """Test keyframe + delta encoded logs"""
+
+    def test_roundtrip(self, temp_dir):
+        """Test encoded entries decode back exactly"""
+        log = HistoryLog(temp_dir / "history.jsonl", keyframe_interval=4)
+        entries = [_evolving(i) for i in range(10)]
+        for entry in entries:
+            log.append(entry)
+
+        assert log.read_all() == entries
+        assert list(log.iter()) == entries
+        assert log.head(3) == entries[:3]
+        assert log.count() == 10
+
+        lines = [json.loads(l) for l in log.path.read_text().splitlines()]
+        assert [("_k" in r) for r in lines] == [True, False, False, False] * 2 + [True, False]
+
+    def test_tail_and_get_read_back_to_keyframe(self, temp_dir):
+        """Test tail() and get() reconstruct from the nearest keyframe"""
+        log = HistoryLog(temp_dir / "history.jsonl", keyframe_interval=5)
+        log.BLOCK_SIZE = 64
+        entries = [_evolving(i) for i in range(23)]
+        log.append_many(entries)
+
+        assert log.tail(1) == entries[-1:]
+        assert log.tail(7) == entries[-7:]
+        assert log.get(0) == entries[0]
+        assert log.get(13) == entries[13]
+        assert log.get(-2) == entries[-2]
+        with pytest.raises(IndexError):
+            log.get(23)
+
+    def test_reconstruct(self, temp_dir):
+        """Test random access over stored records"""
+        log = HistoryLog(temp_dir / "history.jsonl", keyframe_interval=3)
+        entries = [_evolving(i) for i in range(8)]
+        log.append_many(entries)
+
+        records = [json.loads(l) for l in log.path.read_text().splitlines()]
+        assert [reconstruct(records, i) for i in range(8)] == entries
+
+    def test_removed_fields(self, temp_dir):
+        """Test fields and traits dropped between entries stay dropped"""
+        log = HistoryLog(temp_dir / "history.jsonl", keyframe_interval=10)
+        first = {**_evolving(0), "svg_filename": "a.svg"}
+        second = _evolving(1)
+        del second["traits"]["trait_5"]
+        log.append_many([first, second])
+
+        assert log.read_all() == [first, second]
+
+    def test_convert_and_keep_encoding(self, temp_dir):
+        """Test converting a plain log shrinks it and later appends stay encoded"""
+        path = temp_dir / "history.jsonl"
+        entries = [_evolving(i) for i in range(40)]
+        HistoryLog(path).append_many(entries)
+
+        result = encode_history_log(path, keyframe_interval=8)
+        assert result["entries"] == 40
+        assert result["bytes_after"] * 2 < result["bytes_before"]
+
+        log = HistoryLog(path)
+        log.append(_evolving(40))
+        assert log.read_all() == entries + [_evolving(40)]
+        assert '"_d"' in path.read_text().splitlines()[-1]
+
+        encode_history_log(path, keyframe_interval=0)
+        assert '"_' not in path.read_text()
+        assert HistoryLog(path).read_all() == entries + [_evolving(40)]
+
+
+class TestMigration:
+    """Test history.json <-> history.jsonl conversion"""
+
+    def test_migrate_and_export_roundtrip(self, temp_dir):
+        """Test migrating then exporting preserves entries"""
+        legacy = temp_dir / "history.json"
+        entries = [_entry(i) for i in range(4)]
+        legacy.write_text(json.dumps({"entries": entries}))
+
+        count = migrate_history_json(legacy, temp_dir / "history.jsonl")
+        assert count == 4
+        assert not legacy.exists()
+
+        export_history_json(temp_dir / "history.jsonl", legacy)
+        assert json.loads(legacy.read_text()) == {"entries": entries}
+
+    def test_migrate_is_one_time(self, temp_dir):
+        """Test migration does nothing once the log exists"""
+        legacy = temp_dir / "history.json"
+        legacy.write_text(json.dumps({"entries": [_entry(0)]}))
+        HistoryLog(temp_dir / "history.jsonl").append(_entry(1))
+
+        assert migrate_history_json(legacy, temp_dir / "history.jsonl") == 0
+        assert legacy.exists()
+
+    def test_migrate_keep_legacy(self, temp_dir):
+        """Test migration can leave history.json in place"""
+        legacy = temp_dir / "history.json"
+        legacy.write_text(json.dumps({"entries": [_entry(0)]}))
+
+        migrate_history_json(legacy, temp_dir / "history.jsonl", remove_legacy=False)
+        assert legacy.exists()
@@ -0,0 +1,106 @@
+"""
+Tests for the ETag-revalidating HTTP cache
+"""
+
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from src.http_cache import HttpCache, fetch_repo_file
+
+
+def _response(status: int, body: bytes = b"", etag: str = None):
+    response = MagicMock()
+    response.status_code = status
+    response.content = body
+    response.headers = {"ETag": etag} if etag else {}
+    return response
+
+
+@pytest.fixture
+def session():
+    return MagicMock()
+
+
+class TestHttpCache:
+    """Test caching and revalidation"""
+
+    def test_revalidates_with_etag(self, temp_dir, session):
+        """Test a 304 is served from disk and sends If-None-Match"""
+        cache = HttpCache(temp_dir, session=session)
+        session.get.return_value = _response(200, b'{"v": 1}', etag='"abc"')
+        first = cache.get("https://api.github.com/x")
+
+        session.get.return_value = _response(304)
+        second = cache.get("https://api.github.com/x")
+
+        assert not first.from_cache
+        assert second.from_cache
+        assert second.json() == {"v": 1}
+        assert session.get.call_args.kwargs["headers"]["If-None-Match"] == '"abc"'
+
+    def test_changed_content_replaces_cache(self, temp_dir, session):
+        """Test a new 200 overwrites the cached body"""
+        cache = HttpCache(temp_dir, session=session)
+        session.get.return_value = _response(200, b"old", etag='"1"')
+        cache.get("https://api.github.com/x")
+        session.get.return_value = _response(200, b"new", etag='"2"')
+        cache.get("https://api.github.com/x")
+
+        session.get.return_value = _response(304)
+        assert cache.get("https://api.github.com/x").body == b"new"
+
+    def test_stale_copy_on_network_error(self, temp_dir, session):
+        """Test a cached body is used when the request fails"""
+        cache = HttpCache(temp_dir, session=session)
+        session.get.return_value = _response(200, b"cached", etag='"1"')
+        cache.get("https://api.github.com/x")
+
+        session.get.side_effect = ConnectionError("down")
+        assert cache.get("https://api.github.com/x").body == b"cached"
+
+        with pytest.raises(ConnectionError):
+            cache.get("https://api.github.com/other")
+
+    def test_errors_not_cached(self, temp_dir, session):
+        """Test non-200 responses are never stored"""
+        cache = HttpCache(temp_dir, session=session)
+        session.get.return_value = _response(404, b"missing", etag='"1"')
+        cache.get("https://api.github.com/x")
+
+        assert cache.clear() == 0
+
+
+    def test_keyed_by_credential(self, temp_dir, session):
+        """Test a response cached for one token is not revalidated or served for another"""
+        cache = HttpCache(temp_dir, session=session)
+        session.get.return_value = _response(200, b"private", etag='"1"')
+        cache.get("https://api.github.com/x", headers={"Authorization": "Bearer a"})
+
+        session.get.return_value = _response(404)
+        for headers in ({"Authorization": "Bearer b"}, None):
+            assert cache.get("https://api.github.com/x", headers=headers).status == 404
+            assert "If-None-Match" not in session.get.call_args.kwargs["headers"]
+
+        session.get.side_effect = ConnectionError("down")
+        with pytest.raises(ConnectionError):
+            cache.get("https://api.github.com/x")
+        assert cache.get("https://api.github.com/x", headers={"Authorization": "Bearer a"}).body == b"private"
+        assert not any(b"Bearer a" in path.read_bytes() for path in temp_dir.iterdir())
+
+class TestFetchRepoFile:
+    """Test the Contents API helper"""
+
+    def test_fetch_and_missing(self, temp_dir, session):
+        """Test raw contents are returned and 404 maps to None"""
+        cache = HttpCache(temp_dir, session=session)
+        session.get.return_value = _response(200, json.dumps({"dna_hash": "abc"}).encode(), etag='"1"')
+
+        body = fetch_repo_file("owner/parent", "monkey_data/dna.json", token="t", cache=cache)
+        assert json.loads(body) == {"dna_hash": "abc"}
+        url = session.get.call_args.args[0]
+        assert url == "https://api.github.com/repos/owner/parent/contents/monkey_data/dna.json"
+        assert session.get.call_args.kwargs["headers"]["Authorization"] == "Bearer t"
+
+        session.get.return_value = _response(404)
+        assert fetch_repo_file("owner/gone", "monkey_data/dna.json", cache=cache) is None
@@ -0,0 +1,67 @@
+"""
+Tests for the gzip/brotli sibling writer
+"""
+
+import gzip
+import json
+import os
+
+import pytest
+
+from src.precompress import HAS_BROTLI, precompress_dir, precompress_file, sibling_path
+
+
+def _write(path, size=4000):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"values": list(range(size))}, indent=2))
+    return path
+
+
+class TestPrecompress:
+    """Test siblings are written once, kept in sync and cleaned up"""
+
+    def test_writes_gzip_sibling(self, tmp_path):
+        source = _write(tmp_path / "data.json")
+        assert precompress_file(source, use_brotli=False) == 1
+
+        packed = sibling_path(source, ".gz")
+        assert gzip.decompress(packed.read_bytes()) == source.read_bytes()
+        assert packed.stat().st_size < source.stat().st_size / 3
+        assert packed.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+    def test_up_to_date_siblings_are_skipped(self, tmp_path):
+        source = _write(tmp_path / "data.json")
+        precompress_file(source, use_brotli=False)
+        assert precompress_file(source, use_brotli=False) == 0
+
+        # A rewritten source gets a new sibling
+        _write(source, size=10)
+        os.utime(source, ns=(source.stat().st_mtime_ns + 10**9,) * 2)
+        assert precompress_file(source, use_brotli=False) == 1
+        assert gzip.decompress(sibling_path(source, ".gz").read_bytes()) == source.read_bytes()
+
+    def test_incompressible_files_get_no_sibling(self, tmp_path):
+        source = tmp_path / "tiny.svg"
+        source.write_text("<svg/>")
+        assert precompress_file(source, use_brotli=False) == 0
+        assert not sibling_path(source, ".gz").exists()
+
+    def test_precompress_dir(self, tmp_path):
+        """Test JSON and SVG files are covered, other files and orphans are not"""
+        _write(tmp_path / "a.json")
+        _write(tmp_path / "svg" / "abc.svg")
+        _write(tmp_path / "notes.txt")
+        (tmp_path / "gone.json.gz").write_bytes(b"stale")
+
+        written, removed = precompress_dir(tmp_path, use_brotli=False)
+
+        assert (written, removed) == (2, 1)
+        assert sorted(p.relative_to(tmp_path).as_posix() for p in tmp_path.rglob("*.gz")) == \
+            ["a.json.gz", "svg/abc.svg.gz"]
+
+    @pytest.mark.skipif(not HAS_BROTLI, reason="brotli not installed")
+    def test_writes_brotli_sibling(self, tmp_path):
+        import brotli
+        source = _write(tmp_path / "data.json")
+        assert precompress_file(source) == 2
+        assert brotli.decompress(sibling_path(source, ".br").read_bytes()) == source.read_bytes()
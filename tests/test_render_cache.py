@@ -0,0 +1,65 @@
+"""
+Tests for local SVG rendering from DNA
+"""
+
+import json
+
+from src.genetics import GeneticsEngine
+from src.render_cache import RenderCache, git_blob_sha, render_key
+from src.visualizer import MonkeyVisualizer
+
+
+def _dna(seed=0):
+    import random
+    random.seed(seed)
+    return GeneticsEngine.dna_to_dict(GeneticsEngine.generate_random_dna())
+
+
+class TestRenderCache:
+    """Test renders, cache keys and blob shas"""
+
+    def test_git_blob_sha(self):
+        """Test the sha matches `git hash-object`"""
+        assert git_blob_sha("hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+        assert git_blob_sha(b"hello\n") == git_blob_sha("hello\n")
+
+    def test_render_matches_visualizer(self, tmp_path):
+        """Test a render is byte-identical to the visualizer's output"""
+        dna = _dna()
+        cache = RenderCache(tmp_path)
+        expected = MonkeyVisualizer.generate_svg(GeneticsEngine.dict_to_dna(dna))
+        assert cache.render(dna) == expected
+
+    def test_cached_by_dna_hash(self, tmp_path):
+        """Test identical DNAs render once, in memory and across instances"""
+        dna = _dna()
+        cache = RenderCache(tmp_path)
+        svgs = cache.render_many([dna, None, dict(dna), _dna(1)])
+        assert svgs[0] == svgs[2] and svgs[1] is None and svgs[3] != svgs[0]
+        assert cache.renders == 2
+
+        again = RenderCache(tmp_path)
+        assert again.render(dna) == svgs[0]
+        assert again.renders == 0 and again.hits == 1
+
+    def test_generation_is_part_of_the_key(self):
+        """Test the Gen badge keeps generations apart"""
+        dna = _dna()
+        older = dict(dna, generation=dna["generation"] + 1)
+        assert render_key(dna) != render_key(older)
+        cache = RenderCache(persist=False)
+        assert cache.render(dna) != cache.render(older)
+
+    def test_unusable_dna(self):
+        """Test broken DNA renders as None instead of raising"""
+        cache = RenderCache(persist=False)
+        assert cache.render({"dna_hash": "x", "traits": {"bogus": {}}}) is None
+        assert cache.render(None) is None
+
+    def test_repo_monkey_matches_its_svg(self):
+        """Test this repo's own monkey.svg is recognised as a standard render"""
+        with open("monkey_data/dna.json") as f:
+            dna = json.load(f)
+        with open("monkey_data/monkey.svg", "rb") as f:
+            committed = f.read()
+        assert git_blob_sha(RenderCache(persist=False).render(dna)) == git_blob_sha(committed)
@@ -3,20 +3,34 @@ Tests for scan_community - Community Scanner
 Tests nested fork scanning (1st, 2nd, 3rd degree siblings)
 """
 
+import json
+import time
+import random
+import threading
 import pytest
 from unittest.mock import MagicMock, patch
 from datetime import datetime, timezone
 
 # Import the functions we're testing
 from src.scan_community import (
+    CrawlBudget,
+    RequestThrottle,
+    carry_forward,
     collect_repos,
+    externalize_state,
+    externalize_svgs,
     get_degree_label,
+    prune_svgs,
     scan_repo,
+    scan_repos,
     generate_community_data,
     generate_leaderboard,
     generate_family_tree,
-    generate_network_stats
+    generate_network_stats,
+    generate_sharded,
+    generate_delta
 )
+from src.community_outputs import CommunityAggregator
 
 
 class TestGetDegreeLabel:
@@ -179,6 +193,83 @@ class TestCollectRepos:
         assert names.count("user1/fork1") == 1
 
 
+class TestCollectReposAtScale:
+    """Test pagination, budgets and checkpoint/resume on synthetic networks"""
+    
+    def _network(self, forks, max_depth=3, seed=7):
+        from src.synthetic import synthetic_community
+        root = synthetic_community(forks, seed=seed, max_depth=max_depth)
+        index = {}
+        stack = [root]
+        while stack:
+            repo = stack.pop()
+            index[repo.full_name] = repo
+            stack.extend(repo.forks)
+        return root, index
+    
+    def test_reads_every_fork_page(self):
+        """Test repos with more forks than one page are fully collected"""
+        root, _ = self._network(75, max_depth=1)
+        
+        repos = collect_repos(root, max_depth=1, page_size=30)
+        
+        assert len(repos) == 76
+        assert [r.full_name for r, _ in repos[1:]] == [f.full_name for f in root.forks]
+    
+    def test_no_default_cap(self):
+        """Test big networks are not truncated at 200 repos"""
+        root, index = self._network(260)
+        
+        repos = collect_repos(root, max_depth=3)
+        
+        assert len(repos) == len(index) == 261
+    
+    def test_budget_stops_and_resumes(self, tmp_path):
+        """Test a spent call budget checkpoints, and resuming matches a full crawl"""
+        from src.scan_state import CrawlCheckpoint
+        root, index = self._network(120)
+        expected = [(r.full_name, d) for r, d in collect_repos(root, page_size=30)]
+        path = tmp_path / "checkpoint.json"
+        
+        checkpoint = CrawlCheckpoint()
+        partial = collect_repos(root, budget=CrawlBudget(max_calls=3), checkpoint=checkpoint,
+                                checkpoint_path=path, page_size=30)
+        assert not checkpoint.complete and path.exists()
+        assert len(partial) < len(expected)
+        
+        resumed_checkpoint = CrawlCheckpoint.load(path, root=root.full_name)
+        repos = collect_repos(root, checkpoint=resumed_checkpoint, checkpoint_path=path,
+                              resolve=index.__getitem__, page_size=30)
+        assert [(r.full_name, d) for r, d in repos] == expected
+        assert resumed_checkpoint.complete and not path.exists()
+    
+    def test_rate_limit_checkpoints(self):
+        """Test a rate-limit error stops the crawl with the current repo still queued"""
+        from github import GithubException
+        from src.scan_state import CrawlCheckpoint
+        root, index = self._network(10, max_depth=1)
+        original = root.get_forks
+        root.get_forks = MagicMock(side_effect=GithubException(403, {"message": "rate limit"}, {}))
+        
+        checkpoint = CrawlCheckpoint()
+        repos = collect_repos(root, checkpoint=checkpoint)
+        assert len(repos) == 1
+        assert checkpoint.queue == [(root.full_name, 0, 0)]
+        
+        root.get_forks = original
+        repos = collect_repos(root, checkpoint=checkpoint, resolve=index.__getitem__)
+        assert len(repos) == 11 and checkpoint.complete
+    
+    def test_wall_time_budget(self):
+        """Test the time budget uses the injected clock"""
+        now = [0.0]
+        budget = CrawlBudget(max_seconds=10, clock=lambda: now[0])
+        assert not budget.exhausted
+        now[0] = 10
+        assert budget.exhausted
+        assert not CrawlBudget().exhausted
+
+
 class TestScanRepo:
     """Test individual repo scanning"""
     
@@ -241,6 +332,169 @@ class TestScanRepo:
         assert result is None
 
 
+class TestScanRepos:
+    """Test concurrent scanning"""
+    
+    def _network(self, forks=30):
+        from src.synthetic import synthetic_community
+        root = synthetic_community(forks, seed=4)
+        return collect_repos(root, max_depth=3, max_total=100), root.full_name
+    
+    def test_order_is_deterministic(self):
+        """Test results keep collection order however requests finish"""
+        repos, root_name = self._network()
+        expected = [m["full_name"] for m in scan_repos(repos, root_name, workers=1)]
+        
+        for repo, _ in repos:
+            original = repo.get_contents
+            def slow(path, original=original):
+                time.sleep(random.random() / 500)
+                return original(path)
+            repo.get_contents = slow
+        
+        assert [m["full_name"] for m in scan_repos(repos, root_name, workers=8)] == expected
+    
+    def test_concurrency_is_bounded(self):
+        """Test no more than `workers` repos are scanned at once"""
+        repos, root_name = self._network()
+        active, peak, lock = [0], [0], threading.Lock()
+        
+        for repo, _ in repos:
+            original = repo.get_contents
+            def tracked(path, original=original):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                time.sleep(0.002)
+                with lock:
+                    active[0] -= 1
+                return original(path)
+            repo.get_contents = tracked
+        
+        scan_repos(repos, root_name, workers=4)
+        assert 1 < peak[0] <= 4
+    
+    def test_render_mode_skips_standard_svgs(self):
+        """Test SVGs are rendered from DNA and only custom ones downloaded"""
+        from src.render_cache import RenderCache
+        repos, root_name = self._network()
+        custom = next(repo for repo, _ in repos[1:] if "monkey_data/monkey.svg" in repo.files)
+        custom.files["monkey_data/monkey.svg"] = "<svg>hand drawn</svg>"
+        expected = scan_repos(repos, root_name, workers=1)
+        
+        fetched = []
+        for repo, _ in repos:
+            original = repo.get_contents
+            def tracked(path, original=original):
+                fetched.append(path)
+                return original(path)
+            repo.get_contents = tracked
+        
+        renderer = RenderCache(persist=False)
+        monkeys = scan_repos(repos, root_name, workers=4, renderer=renderer)
+        assert monkeys == expected
+        assert fetched.count("monkey_data/monkey.svg") == 1
+        assert renderer.renders == len(expected)  # the custom one is rendered too, then rejected
+        assert all("_svg_sha" not in m for m in monkeys)
+    
+    def test_unchanged_repos_are_not_fetched(self):
+        """Test repos not pushed since the saved scan state are carried forward"""
+        from src.scan_state import ScanState
+        repos, root_name = self._network()
+        state = ScanState()
+        first = scan_repos(repos, root_name, workers=4, state=state)
+        
+        fetched = []
+        for repo, _ in repos:
+            original = repo.get_contents
+            def tracked(path, repo=repo, original=original):
+                fetched.append(repo.full_name)
+                return original(path)
+            repo.get_contents = tracked
+        changed = repos[3][0]
+        changed.pushed_at = datetime(2025, 2, 1, tzinfo=timezone.utc)
+        
+        second = scan_repos(repos, root_name, workers=4, state=state)
+        assert set(fetched) == {changed.full_name}
+        assert [m["full_name"] for m in second] == [m["full_name"] for m in first]
+        assert second == first
+
+    
+    def test_render_mode_reuses_unchanged_files(self):
+        """Test a pushed repo only re-fetches the monkey files whose blob sha changed"""
+        from src.render_cache import RenderCache
+        from src.scan_state import ScanState
+        repos, root_name = self._network()
+        state = ScanState()
+        first = scan_repos(repos, root_name, workers=4, state=state, renderer=RenderCache(persist=False))
+        
+        fetched = []
+        for repo, _ in repos:
+            original = repo.get_contents
+            def tracked(path, repo=repo, original=original):
+                fetched.append((repo.full_name, path))
+                return original(path)
+            repo.get_contents = tracked
+        pushed, evolved = [repo for repo, _ in repos if "monkey_data/stats.json" in repo.files][1:3]
+        for repo in (pushed, evolved):
+            repo.pushed_at = datetime(2025, 2, 1, tzinfo=timezone.utc)
+        stats = json.loads(evolved.files["monkey_data/stats.json"])
+        evolved.files["monkey_data/stats.json"] = json.dumps(dict(stats, rarity_score=99))
+        
+        second = scan_repos(repos, root_name, workers=4, state=state, renderer=RenderCache(persist=False))
+        assert sorted(fetched) == sorted([(pushed.full_name, "monkey_data"), (evolved.full_name, "monkey_data"),
+                                          (evolved.full_name, "monkey_data/stats.json")])
+        by_name = {m["full_name"]: m for m in second}
+        assert by_name[evolved.full_name]["monkey_stats"]["rarity_score"] == 99
+        assert by_name[pushed.full_name] == {m["full_name"]: m for m in first}[pushed.full_name]
+        assert state.file_shas(pushed.full_name) and all("_file_shas" not in m for m in second)
+
+class TestRequestThrottle:
+    """Test request pacing and rate-limit backoff"""
+    
+    def _clock(self):
+        now = [0.0]
+        return now, (lambda: now[0]), (lambda seconds: now.__setitem__(0, now[0] + seconds))
+    
+    def test_spacing(self):
+        """Test requests are spaced by 1 / max_per_second"""
+        now, clock, sleep = self._clock()
+        throttle = RequestThrottle(max_per_second=4, clock=clock, sleep=sleep)
+        
+        for _ in range(5):
+            throttle.wait()
+        
+        assert now[0] == pytest.approx(1.0)
+    
+    def test_pauses_when_rate_limit_low(self):
+        """Test the throttle waits for the reset when few requests remain"""
+        client = MagicMock()
+        client.rate_limiting = (10, 5000)
+        client.rate_limiting_resettime = time.time() + 30
+        sleeps = []
+        
+        throttle = RequestThrottle(max_per_second=0, client=client, reserve=50, sleep=sleeps.append)
+        throttle.wait()
+        assert len(sleeps) == 1 and 29 <= sleeps[0] <= 32
+        
+        client.rate_limiting = (4000, 5000)
+        throttle.wait()
+        assert len(sleeps) == 1
+
+    
+    def test_shared_scheduler_left_alone(self):
+        """Test the scanner's pacing and reserve do not leak into a shared scheduler"""
+        from src.github_client import RateLimitScheduler
+        now, clock, sleep = self._clock()
+        scheduler = RateLimitScheduler(reserve=100, clock=clock, sleep=sleep)
+        throttle = RequestThrottle(max_per_second=4, reserve=500, scheduler=scheduler)
+        
+        for _ in range(5):
+            throttle.wait()
+        
+        assert now[0] == pytest.approx(1.0)
+        assert scheduler.reserve == 100 and scheduler.max_background_rps is None
+
 class TestGenerators:
     """Test output file generators include degree info"""
     
@@ -294,39 +548,96 @@ class TestGenerators:
             }
         ]
     
+    def test_svgs_stored_once_by_hash(self, tmp_path):
+        """Test SVGs move out of the records into content-addressed files"""
+        monkeys = self._create_sample_monkeys()
+        monkeys.append(dict(monkeys[1], full_name="user9/fork9"))  # same SVG twice
+        
+        published = externalize_svgs(monkeys, tmp_path)
+        
+        assert all("monkey_svg" not in m for m in published)
+        assert monkeys[0]["monkey_svg"] == "<svg></svg>"  # input untouched
+        hashes = [m["svg_hash"] for m in published]
+        assert hashes[1] == hashes[3] and len(set(hashes)) == 3
+        assert sorted(p.stem for p in tmp_path.glob("*.svg")) == sorted(set(hashes))
+        assert (tmp_path / f"{hashes[2]}.svg").read_text() == "<svg>fork_of_fork</svg>"
+    
+    def test_state_keeps_svg_hashes(self, tmp_path):
+        """Test the saved scan state references SVGs by hash and carry_forward reads them back"""
+        from src.scan_state import ScanState
+        state = ScanState()
+        for monkey in self._create_sample_monkeys():
+            state.record(monkey["full_name"], dict(monkey, created_at="2024-01-01T00:00:00"))
+        
+        hashes = externalize_state(state, tmp_path)
+        state.save(tmp_path / "state.json")
+        
+        assert "<svg" not in (tmp_path / "state.json").read_text()
+        assert hashes == {p.stem for p in tmp_path.glob("*.svg")} and len(hashes) == 3
+        previous = ScanState.load(tmp_path / "state.json").previous("user2/fork_of_fork")
+        monkey = carry_forward(previous, "owner/root", 2, svg_dir=tmp_path)
+        assert monkey["monkey_svg"] == "<svg>fork_of_fork</svg>" and "svg_hash" not in monkey
+        # Still published under the same hash; pruning keeps what the state uses
+        assert externalize_svgs([monkey], tmp_path)[0]["svg_hash"] == previous["svg_hash"]
+        assert prune_svgs(hashes, tmp_path) == 0
+    
+    def test_prune_unreferenced_svgs(self, tmp_path):
+        """Test SVGs no longer referenced are deleted"""
+        published = externalize_svgs(self._create_sample_monkeys(), tmp_path)
+        keep = {published[0]["svg_hash"]}
+        
+        assert prune_svgs(keep, tmp_path) == 2
+        assert [p.stem for p in tmp_path.glob("*.svg")] == list(keep)
+    
+    def test_generate_sharded(self, tmp_path):
+        """Test the sharded outputs and manifest are written for the scanned monkeys"""
+        published = externalize_svgs(self._create_sample_monkeys(), tmp_path / "svg")
+        generate_sharded("owner/root", CommunityAggregator(published), tmp_path / "community", compact=True)
+        
+        manifest = json.loads((tmp_path / "community" / "manifest.json").read_text())
+        assert manifest["counts"] == {"monkeys": 3, "nodes": 3}
+        assert manifest["top"][0]["full_name"] == "owner/root"
+        assert (tmp_path / "community" / manifest["forks"]["first"]["file"]).exists()
+    
+    def test_generate_delta(self, tmp_path):
+        """Test the delta from the previous community_data.json is written under its version"""
+        published = externalize_svgs(self._create_sample_monkeys(), tmp_path / "svg")
+        previous = tmp_path / "community_data.json"
+        first = generate_delta(published, previous, tmp_path / "deltas")
+        assert not (tmp_path / "deltas").exists()
+        
+        previous.write_text(json.dumps({"forks": published}))
+        changed = [dict(published[0], updated_at="2024-07-01T00:00:00Z")] + published[1:]
+        second = generate_delta(changed, previous, tmp_path / "deltas")
+        
+        delta = json.loads((tmp_path / "deltas" / f"{first}.json").read_text())
+        assert (delta["from"], delta["to"]) == (first, second)
+        assert delta["ops"] == [{"op": "replace", "path": "/owner~1root/updated_at", "value": "2024-07-01T00:00:00Z"}]
+    
     @patch("src.scan_community.Path")
     def test_generate_leaderboard_includes_degree(self, mock_path):
         """Test leaderboard includes degree info"""
-        mock_file = MagicMock()
         mock_path.return_value.parent.mkdir = MagicMock()
         
         monkeys = self._create_sample_monkeys()
         
-        import json
-        with patch("builtins.open", MagicMock()) as mock_open:
-            mock_open.return_value.__enter__ = MagicMock(return_value=mock_file)
-            mock_open.return_value.__exit__ = MagicMock(return_value=False)
-            
+        with patch("src.community_outputs.atomic_write_text") as mock_write:
             generate_leaderboard(monkeys)
             
-            # Check that json.dump was called
-            assert mock_file.write.called or mock_open.called
+            # Check that the JSON was written
+            assert mock_write.called
     
     @patch("src.scan_community.Path")
     def test_generate_family_tree_includes_degree(self, mock_path):
         """Test family tree includes degree info"""
-        mock_file = MagicMock()
         mock_path.return_value.parent.mkdir = MagicMock()
         
         monkeys = self._create_sample_monkeys()
         
-        with patch("builtins.open", MagicMock()) as mock_open:
-            mock_open.return_value.__enter__ = MagicMock(return_value=mock_file)
-            mock_open.return_value.__exit__ = MagicMock(return_value=False)
-            
+        with patch("src.community_outputs.atomic_write_text") as mock_write:
             generate_family_tree("owner/root", monkeys)
             
-            assert mock_file.write.called or mock_open.called
+            assert mock_write.called
 
 
 if __name__ == "__main__":
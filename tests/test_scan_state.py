@@ -0,0 +1,76 @@
+"""
+Tests for the persisted community scan state
+"""
+
+import json
+from datetime import datetime, timezone
+
+from src.scan_state import STATE_VERSION, ScanState
+
+
+PUSHED = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class TestScanState:
+    """Test change detection and persistence"""
+
+    def test_unknown_repo_is_changed(self):
+        """Test a repo missing from the state always needs a fetch"""
+        assert not ScanState().is_unchanged("a/b", PUSHED)
+
+    def test_same_push_is_unchanged(self):
+        """Test pushed_at matching means unchanged, a new push does not"""
+        state = ScanState()
+        state.record("a/b", {"full_name": "a/b"}, PUSHED)
+        assert state.is_unchanged("a/b", PUSHED)
+        assert not state.is_unchanged("a/b", datetime(2025, 1, 2, tzinfo=timezone.utc))
+        assert not state.is_unchanged("a/b", None)
+        assert state.previous("a/b") == {"full_name": "a/b"}
+
+    def test_head_oid_is_compared_when_known(self):
+        """Test a different HEAD oid counts as a change even with the same pushed_at"""
+        state = ScanState()
+        state.record("a/b", None, PUSHED, head_oid="abc")
+        assert state.is_unchanged("a/b", PUSHED, "abc")
+        assert state.is_unchanged("a/b", PUSHED)
+        assert not state.is_unchanged("a/b", PUSHED, "def")
+
+    def test_naive_and_aware_timestamps_match(self):
+        """Test PyGithub's naive UTC datetimes compare equal to aware ones"""
+        state = ScanState()
+        state.record("a/b", None, PUSHED.replace(tzinfo=None))
+        assert state.is_unchanged("a/b", PUSHED)
+
+    def test_retain_drops_missing_repos(self):
+        """Test repos no longer in the network are removed"""
+        state = ScanState()
+        for name in ("a/b", "c/d", "e/f"):
+            state.record(name, None, PUSHED)
+        assert state.retain(["a/b", "e/f"]) == 1
+        assert set(state.repos) == {"a/b", "e/f"}
+
+    def test_round_trip(self, tmp_path):
+        """Test save then load keeps every repo"""
+        path = tmp_path / "state" / "scan_state.json"
+        state = ScanState(root="o/r")
+        state.record("a/b", {"full_name": "a/b", "degree": 1}, PUSHED, "abc")
+        state.save(path)
+
+        loaded = ScanState.load(path)
+        assert loaded.root == "o/r"
+        assert loaded.last_scan is not None
+        assert loaded.is_unchanged("a/b", PUSHED, "abc")
+        assert loaded.previous("a/b")["degree"] == 1
+
+    def test_bad_or_old_state_starts_fresh(self, tmp_path):
+        """Test unreadable files and other versions load as an empty state"""
+        missing = ScanState.load(tmp_path / "missing.json")
+        assert missing.repos == {}
+
+        broken = tmp_path / "broken.json"
+        broken.write_text("{not json")
+        assert ScanState.load(broken).repos == {}
+
+        old = tmp_path / "old.json"
+        old.write_text(json.dumps({"version": STATE_VERSION + 1, "repos": {"a/b": {"pushed_at": "x"}}}))
+        assert ScanState.load(old).repos == {}
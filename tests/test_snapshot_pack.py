@@ -0,0 +1,147 @@
+"""
+Tests for the single-file snapshot pack
+"""
+
+import json
+import pytest
+from pathlib import Path
+
+from src.archive import SvgArchive
+from src.snapshot_pack import SnapshotPack, HAS_ZSTD, compress, decompress
+
+
+def _svg(i: int) -> str:
+    return f"<svg><!-- monkey {i} -->{'<g/>' * 50}</svg>"
+
+
+class TestSnapshotPack:
+    """Test appending and random access"""
+
+    def test_append_and_read(self, temp_dir):
+        """Test snapshots round-trip by timestamp and by hash"""
+        pack = SnapshotPack(temp_dir)
+        entries = [pack.append(_svg(i), f"2025-01-0{i + 1}_00-00") for i in range(3)]
+
+        assert pack.read("2025-01-02_00-00") == _svg(1)
+        assert pack.read_hash(entries[2]["hash"]) == _svg(2)
+        assert pack.read("2025-02-01_00-00") is None
+        assert [ts for ts, _ in pack.iter()] == ["2025-01-01_00-00", "2025-01-02_00-00", "2025-01-03_00-00"]
+        pack.close()
+
+        # A fresh reader sees the same index
+        with SnapshotPack(temp_dir) as reopened:
+            assert reopened.read("2025-01-03_00-00") == _svg(2)
+
+    def test_duplicate_content_shares_blob(self, temp_dir):
+        """Test identical snapshots only add an index line"""
+        pack = SnapshotPack(temp_dir)
+        first = pack.append(_svg(1), "2025-01-01_00-00")
+        size = pack.pack_path.stat().st_size
+        second = pack.append(_svg(1), "2025-01-02_00-00")
+
+        assert pack.pack_path.stat().st_size == size
+        assert second["offset"] == first["offset"]
+        assert pack.read("2025-01-02_00-00") == _svg(1)
+
+    def test_blobs_are_compressed(self, temp_dir):
+        """Test the pack is smaller than the raw SVGs"""
+        pack = SnapshotPack(temp_dir)
+        pack.append(_svg(1), "2025-01-01_00-00")
+        assert pack.pack_path.stat().st_size < len(_svg(1))
+
+    @pytest.mark.parametrize("codec", ["gzip", "none"] + (["zstd"] if HAS_ZSTD else []))
+    def test_codecs(self, codec):
+        """Test each codec round-trips"""
+        assert decompress(compress(b"<svg/>", codec), codec) == b"<svg/>"
+
+    def test_extract_objects_layout(self, temp_dir):
+        """Test extracting the web layout (objects + manifest)"""
+        pack = SnapshotPack(temp_dir / "pack")
+        a = pack.append(_svg(1), "2025-01-01_00-00")
+        pack.append(_svg(1), "2025-01-02_00-00")
+
+        out = temp_dir / "web"
+        assert pack.extract(out, objects=True) == 1
+        manifest = json.loads((out / "manifest.json").read_text())
+        assert manifest["snapshots"] == {"2025-01-01_00-00": a["hash"], "2025-01-02_00-00": a["hash"]}
+        assert (out / "objects" / f"{a['hash']}.svg").read_text() == _svg(1)
+
+
+class TestArchiveWithPack:
+    """Test SvgArchive switching to the pack"""
+
+    def test_pack_all_and_store(self, temp_dir):
+        """Test loose snapshots are packed and later snapshots append to the pack"""
+        archive = SvgArchive(temp_dir)
+        archive.store(_svg(1), "2025-01-01_00-00")
+        (temp_dir / "2025-01-02_00-00_monkey.svg").write_text(_svg(2))
+
+        assert archive.pack_all(prune=True) == 2
+        assert not list(temp_dir.glob("*_monkey.svg"))
+        assert not list(archive.objects_dir.glob("*.svg"))
+
+        name = archive.store(_svg(3), "2025-01-03_00-00")
+        assert not (temp_dir / name).exists()
+        assert archive.read(name) == _svg(3)
+        assert archive.read("2025-01-02_00-00_monkey.svg") == _svg(2)
+        assert archive.has(name)
+        assert [svg for _, svg in archive.iter_svgs()] == [_svg(1), _svg(2), _svg(3)]
+
+    def test_retire_shrinks_pack(self, temp_dir):
+        """Test retiring packed snapshots moves their blobs out of the live pack"""
+        archive = SvgArchive(temp_dir)
+        names = [archive.store(_svg(i), f"2025-01-0{i}_00-00") for i in range(1, 6)]
+        archive.pack_all(prune=True)
+        size = archive.pack.pack_path.stat().st_size
+
+        assert archive.retire(names[:3], keep=names[3:]) == 3
+
+        assert archive.pack.pack_path.stat().st_size < size
+        assert archive.retired.timestamps() == ["2025-01-01_00-00", "2025-01-02_00-00", "2025-01-03_00-00"]
+        assert archive.retired.read("2025-01-02_00-00") == _svg(2)
+        assert archive.pack.timestamps() == ["2025-01-04_00-00", "2025-01-05_00-00"]
+        assert [svg for _, svg in archive.iter_svgs()] == [_svg(4), _svg(5)]
+        assert archive.read(names[4]) == _svg(5)
+
+        # New snapshots still append to the rewritten pack
+        name = archive.store(_svg(6), "2025-01-06_00-00")
+        assert SvgArchive(temp_dir).read(name) == _svg(6)
+
+    @pytest.mark.parametrize("packed", [False, True])
+    def test_retire_unlisted_snapshot(self, temp_dir, packed):
+        """Test a snapshot history references but the manifest lost is retired, not deleted"""
+        archive = SvgArchive(temp_dir)
+        names = [archive.store(_svg(i), f"2025-01-0{i}_00-00") for i in range(1, 3)]
+        if packed:
+            archive.pack_all(prune=True)
+        # An older manifest overwrote this snapshot's timestamp
+        manifest = archive.load_manifest()
+        del manifest["2025-01-01_00-00"]
+        archive._save_manifest(manifest)
+
+        assert archive.retire(names[:1], keep=names[1:], timestamps={names[0]: "2025-01-01T00:00:30"}) == 1
+
+        assert archive.retired.read("2025-01-01_00-00") == _svg(1)
+        assert not (archive.root / names[0]).exists()
+        assert archive.read(names[0]) is None
+        assert archive.read(names[1]) == _svg(2)
+
+    def test_extract_only_live_snapshots(self, temp_dir):
+        """Test the web extract lists what the archive manifest lists"""
+        from src.snapshot_pack import main
+
+        archive = SvgArchive(temp_dir / "archive")
+        names = [archive.store(_svg(i), f"2025-01-0{i}_00-00") for i in range(1, 4)]
+        archive.pack_all(prune=True)
+        # A snapshot the pack still holds but the archive no longer lists
+        manifest = archive.load_manifest()
+        del manifest["2025-01-01_00-00"]
+        archive._save_manifest(manifest)
+
+        out = temp_dir / "web"
+        main(["--data-dir", str(archive.root), "extract", "--objects", "--output", str(out)])
+
+        written = json.loads((out / "manifest.json").read_text())["snapshots"]
+        assert sorted(written) == ["2025-01-02_00-00", "2025-01-03_00-00"]
+        assert not (out / names[0]).exists()
+        assert (out / names[2]).read_text() == _svg(3)
@@ -7,6 +7,7 @@ import json
 import tempfile
 import shutil
 from pathlib import Path
+from unittest.mock import MagicMock
 from src.genetics import GeneticsEngine
 from src.storage import MonkeyStorage
 
@@ -102,6 +103,161 @@ class TestMonkeyStorage:
         """Test getting history when empty"""
         history = temp_storage.get_history()
         assert history == []
+    
+    def test_legacy_history_migrated_on_save(self, temp_storage):
+        """Test an existing history.json is moved to history.jsonl on first save"""
+        legacy = Path("monkey_data/history.json")
+        legacy.write_text(json.dumps({"entries": [{"story": "Legacy"}]}))
+        
+        assert temp_storage.get_history()[0]["story"] == "Legacy"
+        
+        temp_storage.save_history_entry(GeneticsEngine.generate_random_dna(), "New")
+        
+        assert not legacy.exists()
+        assert Path("monkey_data/history.jsonl").exists()
+        assert [e["story"] for e in temp_storage.get_history()] == ["Legacy", "New"]
+    
+    def test_get_recent_history(self, temp_storage):
+        """Test reading only the latest entries"""
+        dna = GeneticsEngine.generate_random_dna()
+        for i in range(5):
+            temp_storage.save_history_entry(dna, f"Entry {i}")
+        
+        recent = temp_storage.get_recent_history(2)
+        assert [e["story"] for e in recent] == ["Entry 3", "Entry 4"]
+    
+    def test_export_history_json(self, temp_storage):
+        """Test exporting the compatibility history.json"""
+        dna = GeneticsEngine.generate_random_dna()
+        temp_storage.save_history_entry(dna, "Exported")
+        
+        assert temp_storage.export_history_json()
+        
+        with open("monkey_data/history.json") as f:
+            exported = json.load(f)
+        assert exported["entries"][0]["story"] == "Exported"
+
+
+class TestStorageSession:
+    """Test the single-load storage session"""
+    
+    def test_documents_loaded_once(self, temp_storage, monkeypatch):
+        """Test each document is read from the backend at most once"""
+        dna = GeneticsEngine.generate_random_dna()
+        temp_storage.save_dna_locally(dna)
+        temp_storage.save_stats(dna)
+        
+        reads = []
+        original = temp_storage.backend.read_document
+        monkeypatch.setattr(temp_storage.backend, "read_document",
+                            lambda name: reads.append(name) or original(name))
+        
+        session = temp_storage.session()
+        session.load_dna()
+        session.load_dna()
+        session.get_streak()
+        session.save_stats(dna)
+        session.metadata
+        
+        assert sorted(reads) == ["dna", "summary"]
+    
+    def test_commit_on_exit(self, temp_storage):
+        """Test staged changes are flushed together when the session closes"""
+        dna = GeneticsEngine.generate_random_dna()
+        
+        with temp_storage.session() as session:
+            session.save_dna(dna)
+            session.add_history_entry(dna, "Born")
+            session.save_stats(dna)
+            
+            # Nothing is written until the session commits
+            assert not Path("monkey_data/dna.json").exists()
+            assert temp_storage.get_history() == []
+        
+        assert temp_storage.load_dna().dna_hash == dna.dna_hash
+        assert temp_storage.get_history()[0]["story"] == "Born"
+        with open("monkey_data/stats.json") as f:
+            assert json.load(f)["age_days"] == 1
+    
+    def test_exception_discards_changes(self, temp_storage):
+        """Test an error inside the session writes nothing"""
+        dna = GeneticsEngine.generate_random_dna()
+        
+        with pytest.raises(RuntimeError):
+            with temp_storage.session() as session:
+                session.save_dna(dna)
+                session.add_history_entry(dna, "Born")
+                raise RuntimeError("runner killed")
+        
+        assert temp_storage.load_dna() is None
+        assert temp_storage.get_history() == []
+    
+    def test_failed_commit_raises_on_exit(self, temp_storage, monkeypatch):
+        """Test a flush that fails on exit is not swallowed"""
+        dna = GeneticsEngine.generate_random_dna()
+        
+        def fail(name, data):
+            raise OSError("No space left on device")
+        
+        monkeypatch.setattr(temp_storage.backend, "write_document", fail)
+        with pytest.raises(OSError, match="No space left"):
+            with temp_storage.session() as session:
+                session.save_dna(dna)
+        
+        session = temp_storage.session()
+        session.save_dna(dna)
+        assert session.commit() is False
+    
+    def test_metadata(self, temp_storage):
+        """Test derived age, entry count and first timestamp"""
+        dna = GeneticsEngine.generate_random_dna()
+        for story in ("First", "Second", "Third"):
+            temp_storage.save_history_entry(dna, story)
+        
+        session = temp_storage.session()
+        first = temp_storage.get_history()[0]["timestamp"]
+        
+        assert session.metadata.entry_count == 3
+        assert session.metadata.age_days == 3
+        assert session.metadata.first_timestamp == first
+        
+        session.add_history_entry(dna, "Fourth")
+        assert session.metadata.entry_count == 4
+        assert [e["story"] for e in session.recent_history(2)] == ["Third", "Fourth"]
+
+
+class TestGitHubAccess:
+    """Test the GitHub client is created lazily"""
+    
+    def test_no_client_until_needed(self, temp_dir, monkeypatch):
+        """Test constructing storage and local reads never touch GitHub"""
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.delenv("FORKMONKEY_OFFLINE", raising=False)
+        client = MagicMock()
+        monkeypatch.setattr("github.Github", MagicMock(return_value=client))
+        
+        storage = MonkeyStorage(repo_name="owner/repo", github_token="token")
+        storage.load_dna()
+        storage.get_streak()
+        assert storage._github is None
+        client.get_repo.assert_not_called()
+        
+        client.get_repo.return_value.fork = False
+        assert storage.detect_fork() is None
+        client.get_repo.assert_called_once_with("owner/repo")
+    
+    def test_offline_mode(self, temp_dir, monkeypatch):
+        """Test FORKMONKEY_OFFLINE disables GitHub access"""
+        monkeypatch.chdir(temp_dir)
+        monkeypatch.setenv("FORKMONKEY_OFFLINE", "1")
+        github = MagicMock()
+        monkeypatch.setattr("github.Github", github)
+        
+        storage = MonkeyStorage(repo_name="owner/repo", github_token="token")
+        
+        assert storage.detect_fork() is None
+        assert storage.get_parent_dna("owner/parent") is None
+        github.assert_not_called()
 
 
 class TestStreakSystem:
@@ -0,0 +1,117 @@
+"""
+Tests for the rolling history summary
+"""
+
+import pytest
+from datetime import date
+
+from src.genetics import GeneticsEngine
+from src.storage import MonkeyStorage
+from src.summary import HistorySummary
+
+
+def _entry(day: str) -> dict:
+    return {"timestamp": f"{day}T12:00:00", "story": day}
+
+
+class TestHistorySummary:
+    """Test incremental updates"""
+
+    def test_counts_and_timestamps(self):
+        """Test count and first/last timestamp follow appends"""
+        summary = HistorySummary()
+        for day in ["2025-01-01", "2025-01-02", "2025-01-02"]:
+            summary.record_entry(_entry(day))
+
+        assert summary.entry_count == 3
+        assert summary.age_days == 3
+        assert summary.first_timestamp == "2025-01-01T12:00:00"
+        assert summary.last_timestamp == "2025-01-02T12:00:00"
+        assert summary.active_days == 2
+
+    def test_day_bitmap(self):
+        """Test active days are tracked, including days before the first one"""
+        summary = HistorySummary()
+        summary.record_day(date(2025, 1, 10))
+        summary.record_day(date(2025, 1, 12))
+        summary.record_day(date(2025, 1, 5))
+
+        assert summary.first_day == "2025-01-05"
+        assert [d for d in range(1, 15) if summary.is_active(date(2025, 1, d))] == [5, 10, 12]
+
+    def test_streak(self):
+        """Test consecutive days extend the streak and gaps reset it"""
+        summary = HistorySummary()
+        for day in ["2025-01-01", "2025-01-02", "2025-01-03", "2025-01-03", "2025-01-06", "2025-01-07"]:
+            summary.record_entry(_entry(day))
+
+        assert summary.streak == {"current": 2, "best": 3, "last_date": "2025-01-07"}
+
+    def test_build_matches_incremental(self):
+        """Test a full rebuild equals the incrementally maintained summary"""
+        entries = [_entry(f"2025-02-{d:02d}") for d in (1, 2, 4, 5, 6)]
+        incremental = HistorySummary()
+        for entry in entries:
+            incremental.record_entry(entry)
+
+        assert HistorySummary.build(entries) == incremental
+
+    def test_aggregates(self):
+        """Test total mutations and rarity range, including a lineage reset"""
+        summary = HistorySummary()
+        for count, rarity in [(0, 10.0), (2, 30.0), (5, 20.0), (1, 5.0), (3, 12.0)]:
+            summary.record_entry({**_entry("2025-01-01"), "mutation_count": count, "rarity_score": rarity})
+
+        assert summary.total_mutations == 5 + 3
+        assert summary.rarity_max == 30.0
+        assert summary.rarity_min == 5.0
+
+
+class TestStorageSummary:
+    """Test the summary document kept by MonkeyStorage"""
+
+    @pytest.fixture
+    def storage(self, temp_dir, monkeypatch):
+        monkeypatch.chdir(temp_dir)
+        return MonkeyStorage(offline=True)
+
+    def test_maintained_on_append(self, storage):
+        """Test appends keep the stored summary current"""
+        dna = GeneticsEngine.generate_random_dna()
+        with storage.session() as session:
+            session.add_history_entry(dna, "Born")
+            session.save_stats(dna)
+        storage.save_history_entry(dna, "Again")
+
+        summary = storage.backend.read_document("summary")
+        assert summary["entry_count"] == 2
+        assert storage.backend.read_document("stats")["streak"]["current"] == 1
+
+    def test_reads_do_not_scan_history(self, storage, monkeypatch):
+        """Test a fresh summary is used without counting or iterating history"""
+        dna = GeneticsEngine.generate_random_dna()
+        for story in ["a", "b", "c"]:
+            storage.save_history_entry(dna, story)
+
+        def fail(*args):
+            raise AssertionError("history scanned")
+
+        monkeypatch.setattr(storage.backend, "iter_history", fail)
+        monkeypatch.setattr(storage.backend, "history_count", fail)
+
+        assert storage.session().metadata.entry_count == 3
+        assert storage.get_streak()["current"] == 1
+
+    def test_rebuilt_when_missing_or_stale(self, storage):
+        """Test legacy data without a summary, or appended behind its back, is rebuilt"""
+        for i in range(3):
+            storage.backend.append_history(_entry(f"2025-03-0{i + 1}"))
+        storage.backend.write_document("stats", {"streak": {"current": 9, "best": 9, "last_date": "2025-03-03"}})
+
+        summary = storage.load_summary()
+        assert summary.entry_count == 3
+        assert summary.streak["current"] == 9
+
+        storage.backend.write_document("summary", summary.model_dump())
+        storage.backend.append_history(_entry("2025-03-04"))
+        assert storage.load_summary().entry_count == 4
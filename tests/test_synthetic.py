@@ -0,0 +1,65 @@
+"""
+Tests for the synthetic data generators
+"""
+
+import pytest
+
+from src.archive import SvgArchive
+from src.scan_community import collect_repos, scan_repo
+from src.synthetic import synthetic_community, synthetic_monkey, synthetic_zoo
+from src.workspace import discover_workspaces
+
+
+class TestSyntheticMonkey:
+    """Test generated monkeys"""
+
+    def test_years_of_history_in_memory(self):
+        """Test a multi-year monkey with consistent summary, stats and DNA"""
+        storage = synthetic_monkey(3 * 365, seed=1, breed_every=200)
+
+        summary = storage.load_summary()
+        assert storage.backend.history_count() == 3 * 365
+        assert summary.entry_count == 3 * 365
+        assert summary.streak["best"] == 3 * 365
+        assert storage.load_dna().generation == 6
+        assert storage.backend.read_document("stats")["age_days"] == 3 * 365
+
+    def test_deterministic(self):
+        """Test the same seed gives the same history"""
+        a = synthetic_monkey(20, seed=7).backend.read_history()
+        b = synthetic_monkey(20, seed=7).backend.read_history()
+        c = synthetic_monkey(20, seed=8).backend.read_history()
+        assert a == b
+        assert a != c
+
+    def test_existing_storage_and_archive(self, memory_storage, temp_dir):
+        """Test writing into a given storage with snapshots"""
+        archive = SvgArchive(temp_dir / "monkey_evolution")
+        synthetic_monkey(10, storage=memory_storage, archive=archive)
+
+        history = memory_storage.backend.read_history()
+        assert len(archive.load_manifest()) == 10
+        assert all(archive.has(entry["svg_filename"]) for entry in history)
+
+    def test_zoo(self, temp_dir):
+        """Test a zoo of workspaces on disk"""
+        synthetic_zoo(temp_dir, monkeys=3, days=5)
+        workspaces = discover_workspaces(temp_dir)
+        assert [ws.name for ws in workspaces] == ["monkey-0000", "monkey-0001", "monkey-0002"]
+        assert workspaces[0].storage(offline=True).backend.history_count() == 5
+
+
+class TestSyntheticCommunity:
+    """Test the fake fork network"""
+
+    def test_scanner_crawls_network(self):
+        """Test collect_repos and scan_repo run against synthetic repos"""
+        root = synthetic_community(40, seed=2, monkey_ratio=0.5)
+        repos = collect_repos(root, max_depth=3, max_total=100)
+
+        assert len(repos) == 41
+        assert max(degree for _, degree in repos) <= 3
+
+        monkeys = [m for m in (scan_repo(repo, root.full_name, degree) for repo, degree in repos) if m]
+        assert 0 < len(monkeys) < 41
+        assert all(m["monkey_svg"].startswith("<svg") for m in monkeys)
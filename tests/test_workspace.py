@@ -0,0 +1,61 @@
+"""
+Tests for workspaces and running commands across many monkeys
+"""
+
+import functools
+import pytest
+from pathlib import Path
+
+from src.genetics import GeneticsEngine
+from src.workspace import Workspace, discover_workspaces, run_across
+
+
+def _touch_dna(suffix: str, root: str) -> str:
+    storage = Workspace(Path(root)).storage(offline=True)
+    if storage.load_dna() is None:
+        raise RuntimeError("no monkey")
+    return f"{Path(root).name}{suffix}"
+
+
+@pytest.fixture
+def zoo(temp_dir):
+    """Three monkeys and one directory that is not a monkey"""
+    for name in ["b", "a", "c"]:
+        Workspace(temp_dir / name).storage(offline=True).save_dna_locally(GeneticsEngine.generate_random_dna())
+    (temp_dir / "not_a_monkey").mkdir()
+    return temp_dir
+
+
+class TestWorkspace:
+    """Test per-monkey paths"""
+
+    def test_paths_are_rooted(self, temp_dir):
+        """Test every path hangs off the workspace root"""
+        ws = Workspace(temp_dir / "monkey1")
+        assert ws.svg_path == temp_dir / "monkey1" / "monkey_data" / "monkey.svg"
+        assert ws.archive().root == temp_dir / "monkey1" / "monkey_evolution"
+        assert ws.storage(offline=True).data_dir == ws.data_dir
+        assert ws.is_monkey()
+
+    def test_discover(self, zoo):
+        """Test only monkey directories are found, sorted by name"""
+        assert [ws.root.name for ws in discover_workspaces(zoo)] == ["a", "b", "c"]
+
+
+class TestRunAcross:
+    """Test fan-out over workspaces"""
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_results_in_order(self, zoo, workers):
+        """Test serial and pooled runs return one result per workspace, in order"""
+        results = run_across(discover_workspaces(zoo), functools.partial(_touch_dna, "!"), workers)
+        assert [r.message for r in results] == ["a!", "b!", "c!"]
+        assert all(r.ok for r in results)
+
+    def test_failures_are_collected(self, zoo):
+        """Test one failing monkey does not stop the others"""
+        workspaces = discover_workspaces(zoo) + [Workspace(zoo / "not_a_monkey")]
+        results = run_across(workspaces, functools.partial(_touch_dna, ""), workers=1)
+
+        assert [r.ok for r in results] == [True, True, True, False]
+        assert "no monkey" in results[-1].message
@@ -15,9 +15,13 @@ const ForkMonkey = {
         community: null,
         leaderboard: null,
         familyTree: null,
-        networkStats: null
+        networkStats: null,
+        historyManifest: null
     },
 
+    // Index of the next (older) history page to load, -1 when all are loaded
+    historyNextPage: -1,
+
     currentTab: 'dashboard',
     treeZoom: 1,
 
@@ -153,6 +157,20 @@ const ForkMonkey = {
         return this.getDevMode() ? '/../' : '';
     },
 
+    /**
+     * Monkey picture for a community / leaderboard / tree entry
+     * Scanned data references web/svg/<hash>.svg, loaded lazily as an <img>;
+     * older data (and the live /api/forks) still embed the SVG inline
+     */
+    monkeyImage(entry, emojiSize = '1.5rem') {
+        if (entry.svg_hash) {
+            const name = `${entry.owner}/${entry.repo}`;
+            return `<img src="svg/${entry.svg_hash}.svg" alt="${name}'s monkey" loading="lazy" decoding="async">`;
+        }
+        if (entry.monkey_svg) return entry.monkey_svg;
+        return `<div style="font-size: ${emojiSize};">🐵</div>`;
+    },
+
     /**
      * Load all static JSON data files
      */
@@ -163,14 +181,22 @@ const ForkMonkey = {
             // Files in monkey_data/ (outside web/ in dev, inside web/ in prod)
             ['dna', `${basePath}monkey_data/dna.json`],
             ['stats', `${basePath}monkey_data/stats.json`],
-            ['history', `${basePath}monkey_data/history.json`],
             // Files in web/ (same folder as index.html)
-            ['community', 'community_data.json'],
-            ['leaderboard', 'leaderboard.json'],
-            ['familyTree', 'family_tree.json'],
             ['networkStats', 'network_stats.json']
         ];
 
+        await Promise.all([this.loadJsonFiles(files), this.loadCommunity()]);
+
+        await this.loadHistory();
+
+        // Update nav stats
+        this.updateNavStats();
+    },
+
+    /**
+     * Fetch [key, url] pairs into this.data, skipping files that fail
+     */
+    async loadJsonFiles(files) {
         const results = await Promise.allSettled(
             files.map(async ([key, url]) => {
                 const response = await fetch(url);
@@ -184,9 +210,181 @@ const ForkMonkey = {
                 this.data[result.value.key] = result.value.data;
             }
         });
+    },
 
-        // Update nav stats
-        this.updateNavStats();
+    /**
+     * Load community, leaderboard and family tree data
+     * Prefers the sharded export (manifest + first page of each) so the
+     * download does not grow with the network, and falls back to the
+     * single JSON files for older deployments
+     */
+    async loadCommunity() {
+        this.data.communityManifest = null;
+
+        try {
+            const response = await fetch('community/manifest.json');
+            if (response.ok) {
+                const manifest = await response.json();
+                this.data.communityManifest = manifest;
+                this.communityNextPage = { leaderboard: 0, forks: 0, tree: 0 };
+                this.communityIndex = {};
+                this.data.leaderboard = { total_ranked: manifest.counts.monkeys, rankings: [] };
+                this.data.community = { total_forks: manifest.counts.monkeys, forks: [] };
+                this.data.familyTree = {
+                    root: manifest.tree.root,
+                    total_nodes: manifest.counts.nodes,
+                    degrees: manifest.tree.degrees,
+                    nodes: []
+                };
+                await Promise.all(['leaderboard', 'forks', 'tree'].map(kind => this.loadCommunityPage(kind)));
+                return;
+            }
+        } catch (error) {
+            console.warn('Community manifest unavailable, using single JSON files', error);
+        }
+
+        await this.loadJsonFiles([
+            ['community', 'community_data.json'],
+            ['leaderboard', 'leaderboard.json'],
+            ['familyTree', 'family_tree.json']
+        ]);
+    },
+
+    /**
+     * Whether a sharded community output has files left to load
+     */
+    hasMoreCommunity(kind) {
+        const manifest = this.data.communityManifest;
+        return Boolean(manifest) && this.communityNextPage[kind] < manifest[kind].count;
+    },
+
+    /**
+     * Entry of file `number` of a sharded community output ('leaderboard',
+     * 'forks' or 'tree'): the first is in the manifest, the rest in that
+     * output's index, fetched once when needed
+     */
+    async communityFile(kind, number) {
+        const entry = this.data.communityManifest[kind];
+        if (number === 0) return entry.first;
+
+        if (!this.communityIndex[kind]) {
+            this.communityIndex[kind] = fetch(`community/${entry.index.file}?v=${entry.index.hash}`)
+                .then(response => response.ok ? response.json() : { files: [] });
+        }
+        const index = await this.communityIndex[kind];
+        return index.files[number];
+    },
+
+    /**
+     * Append the next file of a sharded community output, returns false when none is left
+     */
+    async loadCommunityPage(kind) {
+        if (!this.hasMoreCommunity(kind)) return false;
+
+        const number = this.communityNextPage[kind];
+        this.communityNextPage[kind] += 1;
+        const file = await this.communityFile(kind, number);
+        if (!file) return false;
+        const response = await fetch(`community/${file.file}?v=${file.hash}`);
+        if (!response.ok) return false;
+
+        const data = await response.json();
+        if (kind === 'leaderboard') {
+            this.data.leaderboard.rankings.push(...data.rankings);
+        } else if (kind === 'forks') {
+            this.data.community.forks.push(...data.forks);
+        } else {
+            this.data.familyTree.nodes.push(...data.nodes);
+        }
+        return true;
+    },
+
+    /**
+     * Load the next page of a community output and re-render its view
+     */
+    async loadMoreCommunity(kind) {
+        if (!(await this.loadCommunityPage(kind))) return;
+
+        if (kind === 'leaderboard') {
+            const sortBy = document.getElementById('leaderboard-sort')?.value || 'rarity';
+            const searchQuery = document.getElementById('leaderboard-search')?.value || '';
+            this.renderLeaderboard(sortBy, searchQuery);
+        } else if (kind === 'forks') {
+            this.sortCommunity();
+        } else {
+            this.renderFamilyTree();
+        }
+    },
+
+    /**
+     * "Load more" button for a sharded community output, or '' when all is loaded
+     */
+    loadMoreButton(kind, label, style = '') {
+        if (!this.hasMoreCommunity(kind)) return '';
+        return `
+            <button class="wizard-btn primary" style="${style}" onclick="ForkMonkey.loadMoreCommunity('${kind}')">
+                ${label}
+            </button>
+        `;
+    },
+
+    /**
+     * Load evolution history
+     * Prefers the paged export (manifest + most recent page) and falls back
+     * to the single history.json for older deployments and dev mode
+     */
+    async loadHistory() {
+        const basePath = this.getBasePath();
+        this.data.history = { entries: [] };
+        this.data.historyManifest = null;
+        this.historyNextPage = -1;
+
+        try {
+            const response = await fetch(`${basePath}monkey_data/history/manifest.json`);
+            if (response.ok) {
+                this.data.historyManifest = await response.json();
+                this.historyNextPage = this.data.historyManifest.pages.length - 1;
+                await this.loadOlderHistoryPage();
+                return;
+            }
+        } catch (error) {
+            console.warn('History manifest unavailable, using history.json', error);
+        }
+
+        try {
+            const response = await fetch(`${basePath}monkey_data/history.json`);
+            if (response.ok) {
+                this.data.history = await response.json();
+            }
+        } catch (error) {
+            console.warn('Failed to load history', error);
+        }
+    },
+
+    /**
+     * Prepend the next older history page, returns false when none is left
+     */
+    async loadOlderHistoryPage() {
+        const manifest = this.data.historyManifest;
+        if (!manifest || this.historyNextPage < 0) return false;
+
+        const page = manifest.pages[this.historyNextPage];
+        const response = await fetch(`${this.getBasePath()}monkey_data/history/${page.file}`);
+        if (!response.ok) return false;
+
+        const data = await response.json();
+        this.data.history.entries = data.entries.concat(this.data.history.entries);
+        this.historyNextPage -= 1;
+        return true;
+    },
+
+    /**
+     * Load older evolutions and re-render the timeline
+     */
+    async loadMoreEvolution() {
+        if (await this.loadOlderHistoryPage()) {
+            await this.renderEvolution();
+        }
     },
 
     /**
@@ -524,7 +722,8 @@ const ForkMonkey = {
         }
 
         const entries = history.entries.slice().reverse(); // Most recent first
-        document.getElementById('evolution-count').textContent = entries.length;
+        const manifest = this.data.historyManifest;
+        document.getElementById('evolution-count').textContent = manifest ? manifest.total : entries.length;
 
         // Show loading state
         timeline.innerHTML = `
@@ -576,7 +775,30 @@ const ForkMonkey = {
                     </div>
                 </div>
             `;
-        }).join('');
+        }).join('') + (this.historyNextPage >= 0 ? `
+            <button class="wizard-btn primary" onclick="ForkMonkey.loadMoreEvolution()">
+                Load older evolutions
+            </button>
+        ` : '');
+    },
+
+    /**
+     * Map a legacy <timestamp>_monkey.svg name to objects/<hash>.svg
+     * using monkey_evolution/manifest.json (loaded once)
+     */
+    async resolveArchiveFilename(filename) {
+        const match = filename.match(/^(\d{4}-\d{2}-\d{2}_\d{2}-\d{2})_monkey\.svg$/);
+        if (!match) return filename;
+
+        if (!this.archiveManifest) {
+            this.archiveManifest = fetch(`${this.getBasePath()}monkey_evolution/manifest.json`)
+                .then(response => response.ok ? response.json() : { snapshots: {} })
+                .catch(() => ({ snapshots: {} }));
+        }
+
+        const manifest = await this.archiveManifest;
+        const hash = manifest.snapshots && manifest.snapshots[match[1]];
+        return hash ? `objects/${hash}.svg` : filename;
     },
 
     /**
@@ -607,6 +829,9 @@ const ForkMonkey = {
             filename = `${year}-${month}-${day}_${hours}-${minutes}_monkey.svg`;
         }
 
+        // Legacy snapshot names map to content-addressed objects via the archive manifest
+        filename = await this.resolveArchiveFilename(filename);
+
         // Check cache
         if (this.svgCache[filename]) {
             return this.svgCache[filename];
@@ -729,7 +954,7 @@ const ForkMonkey = {
             return;
         }
 
-        document.getElementById('community-total').textContent = community.forks.length;
+        document.getElementById('community-total').textContent = community.total_forks ?? community.forks.length;
 
         this.renderCommunityGrid(community.forks);
     },
@@ -742,9 +967,7 @@ const ForkMonkey = {
 
         grid.innerHTML = forks.map(fork => {
             const stats = fork.monkey_stats || {};
-            const svgContent = fork.monkey_svg
-                ? fork.monkey_svg
-                : '<div style="font-size: 3rem;">🐵</div>';
+            const svgContent = this.monkeyImage(fork, '3rem');
 
             return `
                 <a href="${fork.url}" target="_blank" class="community-card ${fork.is_root ? 'root' : ''}">
@@ -771,7 +994,7 @@ const ForkMonkey = {
                     </div>
                 </a>
             `;
-        }).join('');
+        }).join('') + this.loadMoreButton('forks', 'Load more monkeys', 'grid-column: 1 / -1;');
     },
 
     /**
@@ -859,7 +1082,7 @@ const ForkMonkey = {
 
         // Update count display
         if (countEl) {
-            const total = leaderboard.rankings.length;
+            const total = leaderboard.total_ranked ?? leaderboard.rankings.length;
             const showing = sortedRankings.length;
             countEl.textContent = searchQuery ? `Showing ${showing} of ${total}` : `${total} monkeys`;
         }
@@ -868,9 +1091,7 @@ const ForkMonkey = {
         tbody.innerHTML = sortedRankings.map((entry, index) => {
             const rank = index + 1;
             const rankDisplay = this.getRankDisplay(rank);
-            const svgContent = entry.monkey_svg
-                ? entry.monkey_svg
-                : '<div style="font-size: 1.5rem;">🐵</div>';
+            const svgContent = this.monkeyImage(entry);
 
             // Check if this is the current user's monkey
             const isCurrentUser = currentRepo &&
@@ -905,6 +1126,11 @@ const ForkMonkey = {
             `;
         }).join('');
 
+        const more = this.loadMoreButton('leaderboard', 'Load more rankings');
+        if (more) {
+            tbody.innerHTML += `<tr><td colspan="6" class="loading-cell">${more}</td></tr>`;
+        }
+
         // Setup search listener (only once)
         this.setupLeaderboardSearch();
     },
@@ -1016,6 +1242,10 @@ const ForkMonkey = {
             }
         });
 
+        // Sharded trees load in parts, the manifest has the full counts
+        const total = degree => tree.degrees?.[degree] ?? nodesByDegree[degree].length;
+        const hidden = (degree, shown) => total(degree) - Math.min(nodesByDegree[degree].length, shown);
+
         let html = '<div class="tree-hierarchy">';
 
         // Root node (degree 0)
@@ -1030,63 +1260,64 @@ const ForkMonkey = {
         }
 
         // Connector line
-        if (nodesByDegree[1].length > 0) {
+        if (total(1) > 0) {
             html += '<div class="tree-connector"></div>';
         }
 
         // 1st degree forks
-        if (nodesByDegree[1].length > 0) {
+        if (total(1) > 0) {
             html += '<div class="tree-level level-1">';
-            html += `<div class="level-label">🍴 1st Degree <span class="level-count">(${nodesByDegree[1].length})</span></div>`;
+            html += `<div class="level-label">🍴 1st Degree <span class="level-count">(${total(1)})</span></div>`;
             html += '<div class="level-nodes">';
             nodesByDegree[1].slice(0, 15).forEach(node => {
                 html += this.createTreeNode(node, 'fork', 1);
             });
-            if (nodesByDegree[1].length > 15) {
-                html += `<div class="tree-node-more">+${nodesByDegree[1].length - 15} more</div>`;
+            if (hidden(1, 15) > 0) {
+                html += `<div class="tree-node-more">+${hidden(1, 15)} more</div>`;
             }
             html += '</div></div>';
         }
 
         // Connector line
-        if (nodesByDegree[2].length > 0) {
+        if (total(2) > 0) {
             html += '<div class="tree-connector"></div>';
         }
 
         // 2nd degree forks (forks of forks)
-        if (nodesByDegree[2].length > 0) {
+        if (total(2) > 0) {
             html += '<div class="tree-level level-2">';
-            html += `<div class="level-label">🌿 2nd Degree <span class="level-count">(${nodesByDegree[2].length})</span></div>`;
+            html += `<div class="level-label">🌿 2nd Degree <span class="level-count">(${total(2)})</span></div>`;
             html += '<div class="level-nodes">';
             nodesByDegree[2].slice(0, 12).forEach(node => {
                 html += this.createTreeNode(node, 'fork', 2);
             });
-            if (nodesByDegree[2].length > 12) {
-                html += `<div class="tree-node-more">+${nodesByDegree[2].length - 12} more</div>`;
+            if (hidden(2, 12) > 0) {
+                html += `<div class="tree-node-more">+${hidden(2, 12)} more</div>`;
             }
             html += '</div></div>';
         }
 
         // Connector line
-        if (nodesByDegree[3].length > 0) {
+        if (total(3) > 0) {
             html += '<div class="tree-connector"></div>';
         }
 
         // 3rd degree forks
-        if (nodesByDegree[3].length > 0) {
+        if (total(3) > 0) {
             html += '<div class="tree-level level-3">';
-            html += `<div class="level-label">🌱 3rd Degree <span class="level-count">(${nodesByDegree[3].length})</span></div>`;
+            html += `<div class="level-label">🌱 3rd Degree <span class="level-count">(${total(3)})</span></div>`;
             html += '<div class="level-nodes">';
             nodesByDegree[3].slice(0, 10).forEach(node => {
                 html += this.createTreeNode(node, 'fork', 3);
             });
-            if (nodesByDegree[3].length > 10) {
-                html += `<div class="tree-node-more">+${nodesByDegree[3].length - 10} more</div>`;
+            if (hidden(3, 10) > 0) {
+                html += `<div class="tree-node-more">+${hidden(3, 10)} more</div>`;
             }
             html += '</div></div>';
         }
 
         html += '</div>';
+        html += this.loadMoreButton('tree', 'Load more of the tree');
         canvas.innerHTML = html;
     },
 
@@ -1094,9 +1325,7 @@ const ForkMonkey = {
      * Create a tree node element
      */
     createTreeNode(node, type, degree) {
-        const svgContent = node.monkey_svg
-            ? node.monkey_svg
-            : '<div style="font-size: 1.5rem;">🐵</div>';
+        const svgContent = this.monkeyImage(node);
 
         const degreeClass = degree !== undefined ? `degree-${degree}` : '';
 
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Extended HTTP server for ForkMonkey web interface
-Handles API requests for fork data
+Handles API requests for fork data, and serves precompressed .br/.gz
+siblings (see src/precompress.py) with Content-Encoding when accepted
 """
 
 import http.server
@@ -18,9 +19,12 @@ from datetime import datetime, timedelta
 # Add parent directory to path to allow importing src
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from src.precompress import SIBLINGS
+
 # Try to import PyGithub, but don't fail if not present
 try:
-    from github import Github, GithubException
+    from github import GithubException
+    from src.github_client import INTERACTIVE, GitHubClient
     HAS_GITHUB = True
 except ImportError:
     HAS_GITHUB = False
@@ -33,6 +37,25 @@ PORT = 8000
 FORK_CACHE = {}
 CACHE_DURATION = timedelta(minutes=15)
 
+
+def accepted_encodings(header):
+    """Content codings an Accept-Encoding header allows (q=0 excluded)"""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
 class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
     def end_headers(self):
         # Add CORS headers for local development
@@ -49,10 +72,61 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         if parsed_url.path == '/api/forks':
             self.handle_forks_request()
             return
+        
+        # history.json is only exported at deploy time; build it on the fly
+        if parsed_url.path.endswith('monkey_data/history.json'):
+            if self.handle_history_request():
+                return
+            
+        # Precompressed sibling of a static file, if the client takes it
+        if self.handle_precompressed():
+            return
             
         # Default behavior (serve files)
         super().do_GET()
 
+    def handle_precompressed(self):
+        """Serve file.br / file.gz for a static file when accepted and up to date"""
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+        if not accepted:
+            return False
+        source = Path(self.translate_path(self.path))
+        if not source.is_file():
+            return False
+        
+        for encoding, suffix in SIBLINGS:
+            sibling = source.with_name(source.name + suffix)
+            if encoding not in accepted and '*' not in accepted:
+                continue
+            if not sibling.is_file() or sibling.stat().st_mtime < source.stat().st_mtime:
+                continue
+            body = sibling.read_bytes()
+            self.send_response(200)
+            self.send_header('Content-type', self.guess_type(str(source)))
+            self.send_header('Content-Encoding', encoding)
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return True
+        return False
+
+    def handle_history_request(self):
+        """Serve history.jsonl in the legacy history.json format (dev only)"""
+        log_path = Path('monkey_data/history.jsonl')
+        if Path('monkey_data/history.json').exists() or not log_path.exists():
+            return False
+        
+        from src.history_log import HistoryLog
+        body = json.dumps({"entries": HistoryLog(log_path).read_all()}).encode()
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return True
+
     def handle_forks_request(self):
         """Handle request for all monkey forks"""
         self.send_response(200)
@@ -117,8 +191,9 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 print("Using cached fork data")
                 return cached['data']
         
-        # Determine root repo
-        g = Github(token)
+        # Determine root repo (scheduled with the rate limit, ahead of any background scan)
+        access = GitHubClient(token, priority=INTERACTIVE)
+        g = access.pygithub()
         repo_name = os.getenv("GITHUB_REPOSITORY")
         
         if not repo_name:
@@ -129,6 +204,7 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             repo_name = "forkZoo/forkMonkey" 
 
         try:
+            access.wait()
             repo = g.get_repo(repo_name)
             
             # If we are a fork, find the parent to get siblings
@@ -139,11 +215,12 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 
             print(f"Fetching forks for {root_repo.full_name}...")
             forks = root_repo.get_forks()
+            access.wait()
             
             results = []
             
             # Add root repo itself
-            root_data = self._fetch_single_repo_data(root_repo)
+            root_data = self._fetch_single_repo_data(root_repo, access)
             if root_data:
                 root_data['is_root'] = True
                 results.append(root_data)
@@ -156,7 +233,7 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 # Skip if it's the root (already added)
                 if fork.full_name == root_repo.full_name: continue
                 
-                data = self._fetch_single_repo_data(fork)
+                data = self._fetch_single_repo_data(fork, access)
                 if data:
                     results.append(data)
                     count += 1
@@ -173,11 +250,12 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             print(f"Error fetching from GitHub: {e}")
             return []
 
-    def _fetch_single_repo_data(self, repo):
+    def _fetch_single_repo_data(self, repo, access):
         """Fetch monkey data from a single repo"""
         try:
             # Try to get stats.json
             try:
+                access.wait()
                 stats_content = repo.get_contents("monkey_data/stats.json")
                 stats = json.loads(stats_content.decoded_content.decode())
             except:
@@ -185,6 +263,7 @@ class MyHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
             
             # Try to get SVG
             try:
+                access.wait()
                 svg_content = repo.get_contents("monkey_data/monkey.svg")
                 svg = svg_content.decoded_content.decode()
             except: